@@ -3,16 +3,23 @@ from .exceptions import HTTPStatus, HTTPBadRequest, HTTPUnauthorized, \
     HTTPRedirect, HTTPMovedPermanently, HTTPFound, HTTPInternalServerError, \
     HTTPNotModified, HTTPBadGatewayError, HTTPCreated, HTTPAccepted,\
     HTTPNonAuthoritativeInformation, HTTPNoContent, HTTPResetContent,\
-    HTTPPartialContent, HTTPKnownStatus
+    HTTPPartialContent, HTTPKnownStatus, HTTPRangeNotSatisfiable, \
+    HTTPRequestEntityTooLarge, HTTPValidationErrors
 from .controllers import Controller, RestController, Static, \
     RegexRouteController
 from .decorators import action, html, json, xml, binary, text, chunked
+from .compression import compressed
+from .caching import cached, MemoryCache, FileCache
+from .profiling import Profiler, ProfilerController, Histogram
+from .metrics import MetricsRegistry, MetricsController
+from .diagnostics import DiagnosticController
 from .helpers import quickstart, LazyAttribute
 from .cli import main
 from .contexts import context, ContextIsNotInitializedError
 from .configuration import settings, configure
 from .application import Application
-from .validation import validate, RequestValidator
+from .asgi import AsyncApplication
+from .validation import validate, validate_all, RequestValidator
 from .helpers import int_or_notfound
 
 
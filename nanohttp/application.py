@@ -2,18 +2,92 @@
 import sys
 import types
 import logging
+import functools
 import traceback
-from collections import Iterable
+from collections.abc import Iterable
 
 from nanohttp.contexts import Context, context
 from nanohttp.exceptions import HTTPStatus
 from nanohttp.configuration import settings
 from nanohttp.constants import NO_CONTENT_STATUSES
+from nanohttp.routing import DispatchTree
+from nanohttp.controllers import is_profilable
+from nanohttp.profiling import RequestProfile
 
 
 logger = logging.getLogger('nanohttp')
 
 
+class ClosingFileWrapper:
+    """Mixin of the server's ``wsgi.file_wrapper``, which calls the
+    ``on_close`` callback after closing the response.
+    """
+
+    __slots__ = ()
+
+    @property
+    def close(self):
+        return self._close
+
+    @close.setter
+    def close(self, close):
+        # Some wrappers, such as the wsgiref's one, set the file's close on
+        # the instance
+        self.file_close = close
+
+    def _close(self):
+        try:
+            close = getattr(self, 'file_close', None) or \
+                getattr(super(), 'close', None)
+            if close is not None:
+                close()
+        finally:
+            on_close = getattr(self, 'on_close', None)
+            if on_close is not None:
+                self.on_close = None
+                on_close()
+
+
+class FileResponse:
+    """The ``wsgi.file_wrapper`` response, when the wrapper could not be
+    subclassed, it's iterated by the server then.
+    """
+
+    __slots__ = ('response', 'on_close')
+
+    def __init__(self, response, on_close):
+        self.response = response
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.response)
+
+    def close(self):
+        try:
+            close = getattr(self.response, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self.on_close()
+
+
+@functools.lru_cache(maxsize=None)
+def closing_file_wrapper(file_wrapper):
+    """Subclass the ``wsgi.file_wrapper`` with the
+    :class:`.ClosingFileWrapper`
+
+    :return: ``None`` if the wrapper could not be subclassed
+    """
+    try:
+        return type(
+            file_wrapper.__name__,
+            (ClosingFileWrapper, file_wrapper),
+            dict(__slots__=('on_close', 'file_close'))
+        )
+    except TypeError:
+        return None
+
+
 class Application:
     """Application main handler
     """
@@ -24,18 +98,49 @@ class Application:
     #: The root controller
     __root__ = None
 
-    def __init__(self, root=None):
+    #: Compile the controllers graph into a :class:`.DispatchTree` after
+    #: the ``app_init`` hook.
+    __compile_routes__ = False
+
+    #: The compiled :class:`.DispatchTree`, if ``__compile_routes__`` is set
+    __dispatch_tree__ = None
+
+    #: A :class:`.Profiler` to record the timings of the requests, disabled
+    #: by default.
+    __profiler__ = None
+
+    #: A :class:`.MetricsRegistry` to collect the metrics of the requests,
+    #: disabled by default.
+    __metrics__ = None
+
+    def __init__(self, root=None, compile_routes=None, profiler=None,
+                 metrics=None):
         """Initialize application and calling ``app_init`` hook.
 
         .. note:: ``__root__`` attribute will set by ``root`` parameter.
 
         :param root: The root controller
+        :param compile_routes: Overrides the ``__compile_routes__`` attribute
+        :param profiler: Overrides the ``__profiler__`` attribute
+        :param metrics: Overrides the ``__metrics__`` attribute
         """
         if root is not None:
             self.__root__ = root
 
+        if compile_routes is not None:
+            self.__compile_routes__ = compile_routes
+
+        if profiler is not None:
+            self.__profiler__ = profiler
+
+        if metrics is not None:
+            self.__metrics__ = metrics
+
         self._hook('app_init')
 
+        if self.__compile_routes__:
+            self.__dispatch_tree__ = DispatchTree(self.__root__)
+
     def _hook(self, name, *args, **kwargs):
         """Call the hook
 
@@ -48,6 +153,7 @@ class Application:
 
     def _handle_exception(self, ex, start_response):
 
+        head = context.method == 'head'
         response_headers = [("content-type", "text/plain")]
         if isinstance(ex, HTTPStatus):
             exc_info=None
@@ -67,49 +173,188 @@ class Application:
             else:
                 response_body = status
 
-        start_response(
-            status,
-            response_headers,
-            exc_info
-        )
-        self._hook('end_response')
-        context.__exit__(*sys.exc_info())
+        try:
+            # The start_response may re-raise the exception if exc_info given
+            start_response(
+                status,
+                response_headers,
+                exc_info
+            )
+        finally:
+            self._finish_profile(context, status)
+            self._hook('end_response')
+            context.__exit__(*sys.exc_info())
 
         # Sometimes don't need to transfer any body, for example the 304 case.
-        if status[:3] in NO_CONTENT_STATUSES:
+        if head or status[:3] in NO_CONTENT_STATUSES:
             return []
 
         return [response_body.encode()]
 
+    def _dispatch(self, context_):
+        """Find and call the handler of the current request
+
+        :return: The handler's response
+        """
+        # Removing the trailing slash in-place, if exists
+        context_.path = context_.path.rstrip('/')
+
+        # Removing the heading slash, and query string anyway
+        path = context_.path[1:].split('?')[0]
+
+        # Splitting the path by slash(es) if any
+        remaining_paths = path.split('/') if path else []
+
+        # The profiled dispatcher is chosen once per request, so the
+        # controllers do not check the profile
+        profile = context_.profile
+        if self.__dispatch_tree__ is not None:
+            if profile is not None:
+                return self.__dispatch_tree__._call_profiled(
+                    profile,
+                    remaining_paths
+                )
+
+            return self.__dispatch_tree__(remaining_paths)
+
+        if profile is not None and is_profilable(self.__root__):
+            return self.__root__._call_profiled(profile, remaining_paths)
+
+        # Calling the controller, actually this will be serve our request
+        return self.__root__(*remaining_paths)
+
+    @staticmethod
+    def _set_cookies(context_):
+        """Setting cookies in response headers, if any
+        """
+        cookie = context_.cookies.output()
+        if cookie:
+            for line in cookie.split('\r\n'):
+                context_.response_headers.add_header(*line.split(': ', 1))
+
+    @staticmethod
+    def _encode_body(context_, response_body):
+        """Encode the ``str`` or ``bytes`` body, and set the
+        ``Content-Length`` header, if it's not already set.
+        """
+        body = context_.encode_response(response_body)
+        headers = context_.response_headers
+        if isinstance(body, bytes) and 'Content-Length' not in headers and \
+                'Transfer-Encoding' not in headers and \
+                context_.response_status[:3] not in NO_CONTENT_STATUSES:
+            headers['Content-Length'] = str(len(body))
+
+        return body
+
+    def _discard_body(self, context_, response_body):
+        """Discard the body of the ``HEAD`` request, without iterating or
+        encoding it.
+
+        The ``Content-Length`` is set for the ``str`` and ``bytes`` bodies.
+        Generators are run till their first ``yield``, as the ``GET``
+        requests do, to set the same headers, then they are closed as the
+        files are.
+        """
+        if isinstance(response_body, (str, bytes)):
+            if response_body:
+                self._encode_body(context_, response_body)
+            return
+
+        if isinstance(response_body, types.GeneratorType):
+            try:
+                next(response_body)
+            except StopIteration:
+                return
+
+        close = getattr(response_body, 'close', None)
+        if close is not None:
+            close()
+
+    @staticmethod
+    def _is_file_wrapper(environ, response_body):
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        return isinstance(file_wrapper, type) and \
+            isinstance(response_body, file_wrapper)
+
+    def _begin_profile(self, context_):
+        """Create the :class:`.RequestProfile` of the request, if the
+        profiler or the metrics are enabled.
+        """
+        if self.__profiler__ is None and self.__metrics__ is None:
+            return None
+
+        if self.__metrics__ is not None:
+            self.__metrics__.begin()
+
+        context_.profile = RequestProfile()
+        return context_.profile
+
+    def _finish_profile(self, context_, status):
+        profile = context_.profile
+        if profile is None:
+            return
+
+        if self.__profiler__ is not None:
+            self.__profiler__.finish(profile)
+
+        if self.__metrics__ is not None:
+            self.__metrics__.finish(
+                profile,
+                context_.environ['REQUEST_METHOD'],
+                status
+            )
+
+    def _wrap_file_response(self, file_response, context_):
+        """Calling the ``end_response`` hook and exiting the context, when
+        the server closes the ``wsgi.file_wrapper`` response.
+        """
+        def on_close():
+            self._finish_profile(context_, context_.response_status)
+            self._hook('end_response')
+            context_.__exit__(None, None, None)
+
+        if isinstance(file_response, ClosingFileWrapper):
+            file_response.on_close = on_close
+            return file_response
+
+        return FileResponse(file_response, on_close)
+
     def __call__(self, environ, start_response):
         """Method that
         `WSGI <https://www.python.org/dev/peps/pep-0333/#id15>`_ server calls
         """
+        # The file responses should be closed by the application too
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if isinstance(file_wrapper, type):
+            file_wrapper = closing_file_wrapper(file_wrapper)
+            if file_wrapper is not None:
+                environ['wsgi.file_wrapper'] = file_wrapper
+
         # Entering the context
         context_ = Context(environ, self)
         context_.__enter__()
 
         # Preparing some variables
-        status = '200 OK'
         buffer = None
         response_iterable = None
+        file_response = None
+        profile = self._begin_profile(context_)
 
         try:
             self._hook('begin_request')
+            response_body = self._dispatch(context_)
+            if profile is not None:
+                profile.dispatched()
 
-            # Removing the trailing slash in-place, if exists
-            context_.path = context_.path.rstrip('/')
-
-            # Removing the heading slash, and query string anyway
-            path = context_.path[1:].split('?')[0]
-
-            # Splitting the path by slash(es) if any
-            remaining_paths = path.split('/') if path else []
+            if context_.method == 'head':
+                # The headers are ready, skipping the body generation
+                self._discard_body(context_, response_body)
 
-            # Calling the controller, actually this will be serve our request
-            response_body = self.__root__(*remaining_paths)
+            elif self._is_file_wrapper(environ, response_body):
+                # Passing the file wrapper to the server as-is
+                file_response = response_body
 
-            if response_body:
+            elif response_body:
                 # The goal is to yield an iterable, to encode and iter over it
                 # at the end of this method.
 
@@ -118,7 +363,9 @@ class Application:
                     # the iteration over the str character by character
                     # For more info check the pull-request
                     # #34, https://github.com/pylover/nanohttp/pull/34
-                    response_iterable = (response_body, )
+                    response_iterable = (
+                        self._encode_body(context_, response_body),
+                    )
 
                 elif isinstance(response_body, types.GeneratorType):
                     # Generators are iterable !
@@ -140,21 +387,24 @@ class Application:
                     )
 
         except Exception as ex:
+            if profile is not None:
+                profile.dispatched()
+
             return self._handle_exception(ex, start_response)
 
         self._hook('begin_response')
-
-        # Setting cookies in response headers, if any
-        cookie = context_.cookies.output()
-        if cookie:
-            for line in cookie.split('\r\n'):
-                context_.response_headers.add_header(*line.split(': ', 1))
+        self._set_cookies(context_)
+        if profile is not None:
+            profile.responding()
 
         start_response(
-            status,
+            context_.response_status,
             context_.response_headers.items(),
         )
 
+        if file_response is not None:
+            return self._wrap_file_response(file_response, context_)
+
         # It seems we have to transfer a body, so this function should yield
         # a generator of the body chunks.
         def _response():
@@ -177,6 +427,7 @@ class Application:
                 raise ex_
 
             finally:
+                self._finish_profile(context_, context_.response_status)
                 self._hook('end_response')
                 context.__exit__(*sys.exc_info())
 
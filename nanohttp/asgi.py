@@ -0,0 +1,306 @@
+import io
+import sys
+import types
+import inspect
+from collections.abc import Iterable
+
+from nanohttp.application import Application
+from nanohttp.contexts import Context, context
+from nanohttp.configuration import settings
+from nanohttp.exceptions import HTTPBadRequest, HTTPRequestEntityTooLarge
+
+
+class AsyncApplication(Application):
+    """`ASGI 3 <https://asgi.readthedocs.io/>`_ application
+
+    Uses the same controllers and actions as the :class:`.Application`,
+    additionally ``async def`` actions and async generators could be used to
+    serve the requests.
+
+    .. code-block:: python
+
+       class Root(Controller):
+           @json
+           async def index(self):
+               await asyncio.sleep(1)
+               return dict(foo='bar')
+
+       app = AsyncApplication(Root())
+
+    .. note:: The request body will be read entirely, before dispatching the
+              request. It's limited by the ``json.max_body_size`` for the
+              ``application/json`` requests, and by the
+              ``form.max_body_size`` for the others.
+    """
+
+    @staticmethod
+    def _get_max_body_size(environ):
+        """The ``json.max_body_size`` or the ``form.max_body_size``, by the
+        request's content type
+        """
+        content_type = environ.get('CONTENT_TYPE', '').split(';', 1)[0]
+        if content_type.strip().lower() == 'application/json':
+            return settings.json.max_body_size
+
+        return settings.form.max_body_size
+
+    @staticmethod
+    async def _read_body(receive, body, content_length=None, max_size=None):
+        """Read the whole request body into the ``body``
+
+        :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if exceeded
+        :return: ``False`` if the client is disconnected
+        """
+        if max_size is not None and content_length is not None and \
+                content_length > max_size:
+            raise HTTPRequestEntityTooLarge()
+
+        total = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return False
+
+            chunk = message.get('body', b'')
+            total += len(chunk)
+            if max_size is not None and total > max_size:
+                raise HTTPRequestEntityTooLarge()
+
+            body.write(chunk)
+            if not message.get('more_body', False):
+                body.seek(0)
+                return True
+
+    @staticmethod
+    def _create_environ(scope, body):
+        """Create a WSGI environ from the ASGI connection scope
+        """
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '')
+                .encode('utf8').decode('latin1'),
+            'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+            'QUERY_STRING': scope['query_string'].decode('latin1'),
+            'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'asgi.scope': scope,
+        }
+
+        server = scope.get('server')
+        if server:
+            environ['SERVER_NAME'], environ['SERVER_PORT'] = \
+                server[0], str(server[1])
+
+        client = scope.get('client')
+        if client:
+            environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = \
+                client[0], str(client[1])
+
+        for name, value in scope['headers']:
+            name = name.decode('latin1').upper().replace('-', '_')
+            value = value.decode('latin1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+
+            if name == 'CONTENT_LENGTH':
+                environ['CONTENT_LENGTH'] = value
+                continue
+
+            key = f'HTTP_{name}'
+            if key in environ:
+                value = f'{environ[key]},{value}'
+
+            environ[key] = value
+
+        return environ
+
+    @staticmethod
+    async def _start_response(send, status, headers):
+        await send({
+            'type': 'http.response.start',
+            'status': int(status[:3]),
+            'headers': [
+                (k.lower().encode('latin1'), v.encode('latin1'))
+                for k, v in headers
+            ]
+        })
+
+    async def _send_exception(self, ex, send):
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response.extend((status, headers))
+
+        body = self._handle_exception(ex, start_response)
+        await self._start_response(send, *response)
+        await send({
+            'type': 'http.response.body',
+            'body': b''.join(body),
+        })
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        """Method that
+        `ASGI <https://asgi.readthedocs.io/en/latest/specs/main.html>`_
+        server calls
+        """
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] != 'http':
+            raise ValueError(f'Unsupported scope type: {scope["type"]}')
+
+        # Entering the context
+        body = io.BytesIO()
+        environ = self._create_environ(scope, body)
+        context_ = Context(environ, self)
+        context_.__enter__()
+
+        # Preparing some variables
+        buffer = None
+        response_iterable = None
+        profile = self._begin_profile(context_)
+
+        try:
+            # The hook is called before reading the body, so the rejected
+            # requests get the ``end_response`` hook too
+            self._hook('begin_request')
+            content_length = environ.get('CONTENT_LENGTH')
+            try:
+                content_length = \
+                    int(content_length) if content_length else None
+            except ValueError:
+                raise HTTPBadRequest('Invalid Content-Length')
+
+            received = await self._read_body(
+                receive,
+                body,
+                content_length,
+                self._get_max_body_size(environ)
+            )
+            if not received:
+                # The client is gone, there is no one to respond to
+                self._finish_profile(context_, '499 Client Closed Request')
+                self._hook('end_response')
+                context_.__exit__(None, None, None)
+                return
+
+            response_body = self._dispatch(context_)
+
+            # Async actions
+            if inspect.isawaitable(response_body):
+                response_body = await response_body
+
+            if profile is not None:
+                profile.dispatched()
+
+            if context_.method == 'head':
+                # The headers are ready, skipping the body generation
+                if isinstance(response_body, types.AsyncGeneratorType):
+                    # Running till the first `yield`, as the GET does
+                    try:
+                        await response_body.__anext__()
+                    except StopAsyncIteration:
+                        pass
+                    else:
+                        await response_body.aclose()
+                else:
+                    self._discard_body(context_, response_body)
+
+            elif response_body:
+                if isinstance(response_body, (str, bytes)):
+                    response_iterable = (
+                        self._encode_body(context_, response_body),
+                    )
+
+                elif isinstance(response_body, types.AsyncGeneratorType):
+                    response_iterable = response_body
+
+                    # Forcing the generator to run till the first `yield`
+                    buffer = await response_iterable.__anext__()
+
+                elif isinstance(response_body, types.GeneratorType):
+                    response_iterable = response_body
+                    buffer = next(response_iterable)
+
+                elif isinstance(response_body, Iterable):
+                    response_iterable = iter(response_body)
+
+                else:
+                    raise ValueError(
+                        'Controller\'s action/handler response must be '
+                        'generator and or iterable'
+                    )
+
+        except Exception as ex:
+            if profile is not None:
+                profile.dispatched()
+
+            return await self._send_exception(ex, send)
+
+        self._hook('begin_response')
+        self._set_cookies(context_)
+        if profile is not None:
+            profile.responding()
+
+        try:
+            await self._start_response(
+                send,
+                context_.response_status,
+                context_.response_headers.items()
+            )
+
+            if buffer is not None:
+                await send({
+                    'type': 'http.response.body',
+                    'body': context_.encode_response(buffer),
+                    'more_body': True,
+                })
+
+            if isinstance(response_iterable, types.AsyncGeneratorType):
+                async for chunk in response_iterable:
+                    await send({
+                        'type': 'http.response.body',
+                        'body': context_.encode_response(chunk),
+                        'more_body': True,
+                    })
+
+            elif response_iterable:
+                for chunk in response_iterable:
+                    await send({
+                        'type': 'http.response.body',
+                        'body': context_.encode_response(chunk),
+                        'more_body': True,
+                    })
+
+            await send({'type': 'http.response.body', 'body': b''})
+
+        except Exception as ex:
+            self.__logger__.exception(
+                'Exception while serving the response.'
+            )
+            if settings.debug:
+                await send({
+                    'type': 'http.response.body',
+                    'body': str(ex).encode(),
+                })
+            raise
+
+        finally:
+            self._finish_profile(context_, context_.response_status)
+            self._hook('end_response')
+            context.__exit__(*sys.exc_info())
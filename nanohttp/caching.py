@@ -0,0 +1,369 @@
+import os
+import time
+import types
+import shutil
+import hashlib
+import tempfile
+import functools
+import threading
+from inspect import isawaitable
+from collections import OrderedDict
+
+import ujson
+
+from .contexts import context
+from .exceptions import HTTPNotModified
+from .helpers import is_not_modified
+
+
+#: Response headers which are not cached
+UNCACHED_HEADERS = frozenset(('set-cookie', ))
+
+#: The requests with these headers are not cached, unless the headers are
+#: a part of the key.
+CREDENTIAL_HEADERS = ('HTTP_AUTHORIZATION', 'HTTP_COOKIE')
+
+
+def normalize_path(path):
+    return path.rstrip('/') or '/'
+
+
+class CachedResponse:
+    """A response which is stored in the cache
+    """
+
+    __slots__ = ('status', 'headers', 'body', 'etag', 'created', 'expires')
+
+    def __init__(self, status, headers, body, ttl):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.created = time.time()
+        self.expires = self.created + ttl
+
+    def to_dict(self):
+        """Everything except the body, to be stored as JSON
+        """
+        return dict(
+            status=self.status,
+            headers=self.headers,
+            etag=self.etag,
+            created=self.created,
+            expires=self.expires,
+        )
+
+    @classmethod
+    def from_dict(cls, data, body):
+        response = cls.__new__(cls)
+        response.status = str(data['status'])
+        response.headers = [(str(k), str(v)) for k, v in data['headers']]
+        response.body = body
+        response.etag = str(data['etag'])
+        response.created = float(data['created'])
+        response.expires = float(data['expires'])
+        return response
+
+    @property
+    def size(self):
+        return len(self.body)
+
+    @property
+    def expired(self):
+        return time.time() >= self.expires
+
+
+class MemoryCache:
+    """In-process LRU cache of the responses, with a byte budget
+
+    :param max_size: Maximum bytes of the cached bodies
+    :param max_item_size: Larger responses are not cached, default is the
+                          ``max_size``.
+    """
+
+    def __init__(self, max_size=0x1000000, max_item_size=None):
+        self.max_size = max_size
+        self.max_item_size = max_item_size or max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, variant):
+        key = (path, variant)
+        with self._lock:
+            response = self.entries.get(key)
+            if response is None:
+                return None
+
+            if response.expired:
+                self._remove(key)
+                return None
+
+            self.entries.move_to_end(key)
+            return response
+
+    def set(self, path, variant, response):
+        if response.size > self.max_item_size:
+            return
+
+        key = (path, variant)
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = response
+            self.size += response.size
+            while self.size > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key).size
+
+    def invalidate(self, path=None):
+        """Remove the cached responses of the path, or all of them
+
+        :param path: Request path, all variants of the path are removed.
+        """
+        with self._lock:
+            if path is None:
+                self.entries.clear()
+                self.size = 0
+                return
+
+            path = normalize_path(path)
+            for key in [k for k in self.entries if k[0] == path]:
+                self._remove(key)
+
+
+class FileCache:
+    """Stores the responses in a local directory, so they could be shared
+    between the worker processes and survive the restarts.
+
+    Each path has it's own sub-directory, and each variant is a file, which
+    is a line of JSON, the status and the headers, followed by the body.
+
+    :param directory: Directory of the cache, it will be created if not
+                      exists.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _hash(value):
+        return hashlib.blake2b(
+            repr(value).encode(),
+            digest_size=16
+        ).hexdigest()
+
+    def _filename(self, path, variant):
+        return os.path.join(
+            self.directory,
+            self._hash(path),
+            self._hash(variant)
+        )
+
+    def get(self, path, variant):
+        filename = self._filename(path, variant)
+        try:
+            with open(filename, 'rb') as f:
+                response = CachedResponse.from_dict(
+                    ujson.decode(f.readline()),
+                    f.read()
+                )
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+        if response.expired:
+            try:
+                os.remove(filename)
+            except OSError:  # pragma: no cover
+                pass
+            return None
+
+        return response
+
+    def set(self, path, variant, response):
+        filename = self._filename(path, variant)
+        directory = os.path.dirname(filename)
+        os.makedirs(directory, exist_ok=True)
+
+        # Writing into a temporary file and renaming it, so the readers
+        # never see a partial file.
+        fd, temp = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(ujson.encode(response.to_dict()).encode())
+                f.write(b'\n')
+                f.write(response.body)
+            os.replace(temp, filename)
+        except BaseException:
+            os.remove(temp)
+            raise
+
+    def invalidate(self, path=None):
+        """Remove the cached responses of the path, or all of them
+        """
+        if path is None:
+            for name in os.listdir(self.directory):
+                shutil.rmtree(
+                    os.path.join(self.directory, name),
+                    ignore_errors=True
+                )
+            return
+
+        shutil.rmtree(
+            os.path.join(self.directory, self._hash(normalize_path(path))),
+            ignore_errors=True
+        )
+
+
+def hashable(value):
+    """The repeated query string fields are lists, which are not hashable
+    """
+    if isinstance(value, list):
+        return tuple(value)
+
+    return value
+
+
+def _encode(chunk):
+    chunk = context.encode_response(chunk)
+    if isinstance(chunk, str):
+        return chunk.encode('utf-8')
+
+    return chunk
+
+
+def cached(*args, ttl=60, query=None, headers=None, backend=None):
+    """Cache the action's response
+
+    Only the ``200 OK`` responses of the ``GET`` and ``HEAD`` requests are
+    cached, an ``ETag`` is generated from the body and the
+    ``If-None-Match`` requests are answered by ``304 Not Modified``.
+
+    The requests with the ``Authorization`` or ``Cookie`` headers are not
+    cached, so the responses of a user are not served to the others, unless
+    these headers are given in the ``headers``.
+
+    .. code-block:: python
+
+       cache = MemoryCache(max_size=64 * 1024 * 1024)
+
+       class Root(Controller):
+           @json(cache=dict(ttl=10, query=['page'], backend=cache))
+           def index(self):
+               ...
+
+           @json(verbs='post')
+           def create(self):
+               ...
+               cache.invalidate('/')
+
+    :param ttl: Seconds to keep the responses
+    :param query: The query string fields which the response depends on,
+                  default is the whole query string.
+    :param headers: The request headers which the response depends on,
+                    such as ``Accept``.
+    :param backend: Cache backend, such as the :class:`.MemoryCache` and
+                    :class:`.FileCache`, default is a new :class:`.MemoryCache`
+                    per action.
+    """
+    def decorator(func):
+        nonlocal backend
+        if backend is None:
+            backend = MemoryCache()
+
+        query_fields = None if query is None else tuple(query)
+        header_keys = tuple(
+            'HTTP_' + h.upper().replace('-', '_') for h in headers or ()
+        )
+        credential_keys = tuple(
+            k for k in CREDENTIAL_HEADERS if k not in header_keys
+        )
+
+        def get_variant(environ):
+            if query_fields is None:
+                query_values = environ.get('QUERY_STRING', '')
+            else:
+                query_string = context.query
+                query_values = tuple(
+                    hashable(query_string.get(k)) for k in query_fields
+                )
+
+            return query_values, tuple(environ.get(k) for k in header_keys)
+
+        def serve(response):
+            response_headers = context.response_headers
+            for name in {k for k, v in response.headers}:
+                del response_headers[name]
+
+            for name, value in response.headers:
+                response_headers.add_header(name, value)
+
+            response_headers['Age'] = \
+                str(max(0, int(time.time() - response.created)))
+            context.response_status = response.status
+            if is_not_modified(context.environ, response.etag, None):
+                raise HTTPNotModified()
+
+            return response.body
+
+        def store(path, variant, result):
+            if context.response_status[:3] != '200' or \
+                    'Transfer-Encoding' in context.response_headers:
+                return result
+
+            if isinstance(result, (str, bytes)):
+                body = _encode(result)
+            elif result is None:
+                body = b''
+            else:
+                body = b''.join(_encode(c) for c in result)
+
+            response = CachedResponse(context.response_status, [], body, ttl)
+            response_headers = context.response_headers
+            response_headers['ETag'] = response.etag
+            response.headers = [
+                (k, v) for k, v in response_headers.items()
+                if k.lower() not in UNCACHED_HEADERS
+            ]
+            backend.set(path, variant, response)
+            if is_not_modified(context.environ, response.etag, None):
+                raise HTTPNotModified()
+
+            return body
+
+        async def store_awaitable(path, variant, result):
+            return store(path, variant, await result)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            environ = context.environ
+            if context.method not in ('get', 'head') or \
+                    any(k in environ for k in credential_keys):
+                return func(*args, **kwargs)
+
+            path = normalize_path(context.path)
+            variant = get_variant(environ)
+            response = backend.get(path, variant)
+            if response is not None:
+                return serve(response)
+
+            result = func(*args, **kwargs)
+            if isawaitable(result):
+                return store_awaitable(path, variant, result)
+
+            if isinstance(result, types.AsyncGeneratorType):
+                return result
+
+            return store(path, variant, result)
+
+        wrapper.cache = backend
+        return wrapper
+
+    if args and callable(args[0]):
+        return decorator(args[0])
+
+    return decorator
@@ -42,6 +42,28 @@ def load_controller_from_file(specifier):
     return controller
 
 
+def load_configuration(args):
+    """Load the configuration files and the options, from scratch
+
+    :raise AttributeError: If an option is invalid
+    """
+    configure(force=True)
+
+    for f in args.config_files:
+        settings.loadfile(f)
+
+    for option in args.options:
+        key, value = option.split('=')
+        value = yaml.load(value)
+        if isinstance(value, str):
+            value = f'"{value}"'
+
+        try:
+            exec(f'settings.{key} = {value}')
+        except AttributeError:
+            raise AttributeError(key)
+
+
 def main(argv=None):
     args = parse_arguments(argv=argv)
 
@@ -57,28 +79,33 @@ def main(argv=None):
         if relpath(args.directory, '.') != '.':
             chdir(args.directory)
 
-        configure(force=True)
+        try:
+            load_configuration(args)
+        except AttributeError as ex:
+            print(f'Invalid configuration option: {ex}', file=sys.stderr)
+            return 1
 
-        for f in args.config_files:
-            settings.loadfile(f)
+        reloading = False
 
+        def create_controller():
+            # The workers are reloaded by the SIGHUP, so the configuration
+            # and the controller's module are loaded again
+            nonlocal reloading
+            if reloading:
+                load_configuration(args)
 
-        try:
-            for option in args.options:
-                key, value = option.split('=')
-                value = yaml.load(value)
-                if isinstance(value, str):
-                    value = f'"{value}"'
-
-                exec(f'settings.{key} = {value}')
-        except AttributeError:
-            print(f'Invalid configuration option: {key}', file=sys.stderr)
-            return 1
+            reloading = True
+            return load_controller_from_file(args.controller)
 
         quickstart(
-            controller=load_controller_from_file(args.controller),
+            controller_factory=create_controller,
             host=host,
-            port=int(port)
+            port=int(port),
+            workers=args.workers,
+            reuse_port=args.reuse_port,
+            threads=args.threads,
+            backlog=args.backlog,
+            queue_size=args.queue_size
         )
     except KeyboardInterrupt:  # pragma: no cover
         print('CTRL+C detected.')
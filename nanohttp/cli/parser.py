@@ -36,6 +36,46 @@ def parse_arguments(argv=None):
         help='Change to this path before starting the server default is: `.`'
     )
 
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of the worker processes to fork, the default is to serve '
+             'within the current process.'
+    )
+
+    parser.add_argument(
+        '--reuse-port',
+        default=False,
+        action='store_true',
+        help='Bind the socket of each worker using SO_REUSEPORT, '
+             'instead of sharing a single socket. Only with --workers.'
+    )
+
+    parser.add_argument(
+        '-t',
+        '--threads',
+        type=int,
+        default=None,
+        help='Serve the connections from a pool of threads with this size.'
+    )
+
+    parser.add_argument(
+        '--backlog',
+        type=int,
+        default=None,
+        help='Listen backlog. Only with --threads, default: 128'
+    )
+
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=None,
+        help='Maximum connections waiting for a thread. Only with --threads, '
+             'default is the number of threads.'
+    )
+
     parser.add_argument(
         '-V',
         '--version',
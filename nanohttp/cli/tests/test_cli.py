@@ -1,3 +1,6 @@
+import os
+import time
+import signal
 from os import path
 
 import requests
@@ -88,3 +91,45 @@ def test_cli_with_given_package_and_controller_name(clitool, controller_file):
     assert response.status_code == 200
     assert response.text == 'Index'
 
+
+
+def test_cli_with_workers(clitool, controller_file):
+    url = clitool.execute('--workers', '2', controller_file())
+    response = requests.get(url)
+    assert response.status_code == 200
+    assert response.text == 'Index'
+
+
+def test_cli_reload_workers(clitool, controller_file, make_temp_file):
+    config = make_temp_file()
+    with open(config, 'w') as f:
+        f.write('greeting: Hello')
+
+    filename = controller_file()
+    with open(filename, 'w') as f:
+        f.write(
+            'from nanohttp import Controller, action, settings\n'
+            'class Root(Controller):\n'
+            '    @action\n'
+            '    def index(self):\n'
+            '        yield f\'{settings.greeting} Index\'\n'
+        )
+
+    url = clitool.execute('--workers', '1', '-c', config, filename)
+    assert requests.get(url).text == 'Hello Index'
+
+    # The configuration and the controller's module are loaded again
+    with open(config, 'w') as f:
+        f.write('greeting: Bye')
+
+    with open(filename, 'a') as f:
+        f.write(
+            '    @action\n'
+            '    def new(self):\n'
+            '        yield \'New\'\n'
+        )
+
+    os.kill(clitool.subprocess.pid, signal.SIGHUP)
+    time.sleep(1)
+    assert requests.get(url).text == 'Bye Index'
+    assert requests.get(f'{url}/new').text == 'New'
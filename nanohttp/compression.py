@@ -0,0 +1,227 @@
+import zlib
+import types
+import functools
+from inspect import isawaitable
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+from .contexts import context
+
+
+class GzipCompressor:
+    """Streaming gzip compressor
+    """
+
+    def __init__(self, level=6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    """Streaming brotli compressor, requires the
+    `brotli <https://pypi.org/project/Brotli/>`_ package.
+    """
+
+    def __init__(self, quality=4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+#: Content-coding -> compressor factory, in order of the preference
+compressors = {}
+if brotli is not None:  # pragma: no cover
+    compressors['br'] = BrotliCompressor
+
+compressors['gzip'] = GzipCompressor
+
+
+def parse_accept_encoding(header):
+    """Parse the ``Accept-Encoding`` header
+
+    :return: A dictionary of content-coding -> quality
+    """
+    result = {}
+    for item in header.split(','):
+        coding, _, parameters = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.
+        name, _, value = parameters.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.
+
+        result[coding] = quality
+
+    return result
+
+
+def acceptable_encodings(header, available):
+    """Select the content-codings which are acceptable by the client
+
+    :param header: The ``Accept-Encoding`` header
+    :param available: Iterable of the available content-codings, in order of
+                      the server's preference.
+    :return: List of the acceptable content-codings, the most preferred first.
+    """
+    if not header:
+        return []
+
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.)
+    qualities = [
+        (accepted.get(coding, wildcard), index, coding)
+        for index, coding in enumerate(available)
+    ]
+    qualities.sort(key=lambda q: (-q[0], q[1]))
+    return [coding for quality, index, coding in qualities if quality > 0]
+
+
+def _encode(chunk):
+    if isinstance(chunk, str):
+        return chunk.encode(context.response_encoding or 'utf-8')
+
+    return chunk
+
+
+def _compress_iterable(iterable, compressor, flush):
+    for chunk in iterable:
+        chunk = compressor.compress(_encode(chunk))
+        if flush:
+            chunk += compressor.flush()
+
+        # Empty chunks are ambiguous for the chunked transfer encoding
+        if chunk:
+            yield chunk
+
+    yield compressor.finish()
+
+
+async def _compress_async_iterable(iterable, compressor, flush):
+    async for chunk in iterable:
+        chunk = compressor.compress(_encode(chunk))
+        if flush:
+            chunk += compressor.flush()
+
+        if chunk:
+            yield chunk
+
+    yield compressor.finish()
+
+
+def _compress_result(result, encodings, minimum_size, flush, level):
+    if result is None:
+        return result
+
+    if isinstance(result, (str, bytes)) and len(result) < minimum_size:
+        return result
+
+    encoding = next(iter(acceptable_encodings(
+        context.environ.get('HTTP_ACCEPT_ENCODING'),
+        encodings
+    )), None)
+    if encoding is None:
+        return result
+
+    compressor = compressors[encoding]() if level is None \
+        else compressors[encoding](level)
+
+    headers = context.response_headers
+    headers.add_header('Content-Encoding', encoding)
+    del headers['Content-Length']
+
+    if isinstance(result, (str, bytes)):
+        return compressor.compress(_encode(result)) + compressor.finish()
+
+    if isinstance(result, types.AsyncGeneratorType):
+        return _compress_async_iterable(result, compressor, flush)
+
+    return _compress_iterable(result, compressor, flush)
+
+
+def compressed(*args, encodings=None, minimum_size=256, flush=False,
+               level=None):
+    """Compress the action's response, with respect to the client's
+    ``Accept-Encoding`` header.
+
+    The response could be a string, bytes, a generator or an iterable, the
+    generators will be compressed incrementally, so it could be used under
+    the :func:`.chunked` decorator:
+
+    .. code-block:: python
+
+       @action
+       @chunked
+       @compressed(flush=True)
+       def stream(self):
+           yield 'first'
+           yield 'second'
+
+    :param encodings: Allowed content-codings, in order of the preference,
+                      default: all of the :data:`.compressors`.
+    :param minimum_size: Smaller string and bytes responses are not
+                         compressed.
+    :param flush: Flush the compressor after each chunk, so the client
+                  receives each chunk as soon as possible.
+    :param level: Compression level, default is the compressor's default.
+    """
+    def decorator(func):
+        available = [
+            e for e in (encodings or compressors) if e in compressors
+        ]
+
+        async def compress_awaitable(result):
+            return _compress_result(
+                await result,
+                available,
+                minimum_size,
+                flush,
+                level
+            )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            context.response_headers.add_header('Vary', 'Accept-Encoding')
+            result = func(*args, **kwargs)
+
+            # Async actions
+            if isawaitable(result):
+                return compress_awaitable(result)
+
+            return _compress_result(
+                result,
+                available,
+                minimum_size,
+                flush,
+                level
+            )
+
+        return wrapper
+
+    if args and callable(args[0]):
+        return decorator(args[0])
+
+    return decorator
@@ -11,6 +11,33 @@ domain:
 cookie:
   http_only: false
   secure: false
+
+form:
+  # Bytes to read from the input at once
+  chunk_size: 65536
+  # Maximum bytes of the url-encoded and multipart bodies, null: unlimited
+  max_body_size:
+  # Maximum bytes of a non-file field
+  max_field_size: 1048576
+  # Maximum bytes of an uploaded file, null: unlimited
+  max_file_size:
+  # Uploaded files larger than this are written to the disk
+  spool_size: 524288
+
+json:
+  # Indentation of the JSON responses, only when the debug is enabled
+  indent: 4
+  # Maximum bytes of the JSON request bodies, null: unlimited
+  max_body_size:
+
+diagnostics:
+  # Enables the DiagnosticController, keep it disabled in production unless
+  # the controller is guarded
+  enabled: false
+  # Maximum number of the requests to profile at once
+  max_requests: 1000
+  # Maximum seconds of the stack sampling
+  max_duration: 60
 """
 
 
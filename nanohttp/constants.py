@@ -2,6 +2,15 @@
 
 UNLIMITED = -1
 HTTP_DATETIME_FORMAT = '%a, %d %b %Y %H:%M:%S GMT'
+HTTP_METHODS = frozenset((
+    'get',
+    'head',
+    'post',
+    'put',
+    'patch',
+    'delete',
+    'options',
+))
 NO_CONTENT_STATUSES = [
     '304',
     '204',
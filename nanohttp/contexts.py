@@ -1,26 +1,22 @@
 import io
-import threading
 import wsgiref.util
 import wsgiref.headers
 
 from typing import Union
+from contextvars import ContextVar
 from urllib.parse import parse_qs
 from http.cookies import SimpleCookie
 
 from nanohttp import exceptions
+from .configuration import settings
 from .helpers import LazyAttribute, parse_any_form
+from .forms import iter_body, iter_json_array, BodyStream
 
 
 class ContextIsNotInitializedError(Exception):
     pass
 
 
-class ContextStack(list):
-
-    def push(self, item):
-        self.append(item)
-
-
 class Context:
     """A Global context for Request and Response.
 
@@ -30,6 +26,9 @@ class Context:
     Context also supports to use stack nested (>=0.16.6), its useful on
     testing.
 
+    The current context is stored in a :class:`contextvars.ContextVar`, so
+    each thread and each asyncio task sees it's own context.
+
     .. code-block:: python
 
         def sample:
@@ -46,22 +45,19 @@ class Context:
     #: Response encoding
     response_encoding = None
 
-    #: Thread local variable contexts stored in
-    thread_local = threading.local()
+    #: Response status, for the responses without raising an
+    #: :class:`.HTTPStatus`
+    response_status = '200 OK'
+
+    #: Context variable the current context is stored in
+    context_var = ContextVar('nanohttp_context')
 
     #: Current :class:`.Application` instance
     application = None
 
-    @property
-    def __stack__(self):
-        """Nested contexts stack
-        """
-        THREADLOCAL_STACK_ATTRIBUTE = 'nanohttp_context_stack'
-        if not hasattr(self.thread_local, THREADLOCAL_STACK_ATTRIBUTE):
-            setattr(
-                self.thread_local, THREADLOCAL_STACK_ATTRIBUTE, ContextStack()
-            )
-        return getattr(self.thread_local, THREADLOCAL_STACK_ATTRIBUTE)
+    #: The :class:`.RequestProfile` of the current request, if the
+    #: application's profiler is enabled
+    profile = None
 
     def __init__(self, environ, application=None):
         """
@@ -73,17 +69,12 @@ class Context:
         self.response_headers = wsgiref.headers.Headers()
 
     def __enter__(self):
-        # Backing up the current context
-        if hasattr(self.thread_local, 'nanohttp_context'):
-            self.__stack__.push(self.thread_local.nanohttp_context)
-
-        self.thread_local.nanohttp_context = self
+        # The token is used to restore the previous context, if any
+        self._token = self.context_var.set(self)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        del self.thread_local.nanohttp_context
-        if self.__stack__:
-            self.thread_local.nanohttp_context = self.__stack__.pop()
+        self.context_var.reset(self._token)
 
     @LazyAttribute
     def request_content_length(self) -> Union[int, None]:
@@ -125,11 +116,12 @@ class Context:
             Not initialized context raises
             :class:`.ContextIsNotInitializedError`,
         """
-        if not hasattr(cls.thread_local, 'nanohttp_context'):
+        current = cls.context_var.get(None)
+        if current is None:
             raise ContextIsNotInitializedError(
                 "Context is not initialized yet."
             )
-        return cls.thread_local.nanohttp_context
+        return current
 
     @LazyAttribute
     def method(self):
@@ -180,7 +172,7 @@ class Context:
         """Request form values
 
         .. note:: if using `multipart/form-data` uploaded file will reproduce
-         as ``cgi.FieldStorage``.
+         as :class:`.FilePart`.
         """
         return parse_any_form(
             self.environ,
@@ -188,6 +180,64 @@ class Context:
             content_type=self.request_content_type
         )
 
+    def iter_body(self, chunk_size=0x10000, max_size=None):
+        """Iterate over the request body, chunk by chunk, see
+        :func:`.forms.iter_body`.
+
+        Both the ``Content-Length`` and the ``chunked`` bodies are supported,
+        so the body could be piped to a storage without holding it in the
+        memory.
+
+        .. note:: The body could be read once, so it's not available anymore
+                  after accessing the :attr:`.form`, and vice versa.
+
+        :param chunk_size: Maximum bytes of each chunk
+        :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if the
+                         body is larger.
+        """
+        return iter_body(
+            self.environ,
+            self.request_content_length,
+            chunk_size,
+            max_size
+        )
+
+    def iter_json_array(self, chunk_size=0x10000, max_size=None,
+                        max_item_size=None):
+        """Decode the request body as a JSON array, incrementally
+
+        .. code-block:: python
+
+           @json(verbs='post')
+           def bulk(self):
+               for item in context.iter_json_array(max_item_size=0x1000):
+                   insert(item)
+
+        :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if the
+                         body is larger, default: the ``json.max_body_size``
+                         setting.
+        :param max_item_size: Maximum characters of each item
+        :return: A generator of the items
+        """
+        if max_size is None:
+            max_size = settings.json.max_body_size
+
+        return iter_json_array(
+            self.iter_body(chunk_size, max_size),
+            max_item_size
+        )
+
+    @LazyAttribute
+    def body_stream(self) -> BodyStream:
+        """Request body as a readonly file-like object
+
+        .. code-block:: python
+
+           shutil.copyfileobj(context.body_stream, f)
+
+        """
+        return BodyStream(self.iter_body())
+
     @LazyAttribute
     def cookies(self) -> 'SimpleCookie':
         """Cookies
@@ -228,14 +278,32 @@ class ContextProxy(Context):
         # noinspection PyTypeChecker
         return object.__new__(type_proxy)
 
-    def __getattr__(self, key):
-        return getattr(Context.get_current(), key)
+    # The ``get`` keyword argument is bound once, to look up the current
+    # context with a single ``ContextVar.get`` call per attribute access.
 
-    def __setattr__(self, key, value):
-        setattr(Context.get_current(), key, value)
+    def __getattr__(self, key, get=Context.context_var.get):
+        current = get(None)
+        if current is None:
+            raise ContextIsNotInitializedError(
+                "Context is not initialized yet."
+            )
+        return getattr(current, key)
 
-    def __delattr__(self, key):
-        delattr(Context.get_current(), key)
+    def __setattr__(self, key, value, get=Context.context_var.get):
+        current = get(None)
+        if current is None:
+            raise ContextIsNotInitializedError(
+                "Context is not initialized yet."
+            )
+        setattr(current, key, value)
+
+    def __delattr__(self, key, get=Context.context_var.get):
+        current = get(None)
+        if current is None:
+            raise ContextIsNotInitializedError(
+                "Context is not initialized yet."
+            )
+        delattr(current, key)
 
 
 context = ContextProxy()
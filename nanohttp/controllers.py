@@ -2,24 +2,36 @@
 import time
 import os
 import re
+import uuid
 import logging
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
 from os.path import isdir, join, relpath, pardir, exists
 from mimetypes import guess_type
 
 from .exceptions import HTTPNotFound, HTTPMethodNotAllowed, HTTPForbidden, \
-    HTTPStatus
+    HTTPStatus, HTTPNotModified, HTTPPartialContent, HTTPRangeNotSatisfiable
 from .contexts import context
-from .constants import HTTP_DATETIME_FORMAT, UNLIMITED
+from .constants import HTTP_DATETIME_FORMAT, HTTP_METHODS, UNLIMITED
+from .helpers import is_not_modified, parse_range_header
+from .compression import acceptable_encodings
+from .manifest import Manifest, get_manifest
+from .decorators import action
 
 
 logging.basicConfig(level=logging.INFO)
 
 
+#: A route which starts with a literal path segment, such as ``/foos/...``
+LITERAL_SEGMENT_PATTERN = re.compile(r'\^?/([\w\-~]*)(?:/|\$|\\Z)')
+
+
 class Controller(object):
     """Base Controller
     """
 
-    __nanohttp__ = dict(
+    __nanohttp__ = Manifest(
         verbs=['any'],
         encoding='utf8',
         default_action='index',
@@ -27,9 +39,14 @@ class Controller(object):
         maximum_allowed_arguments=UNLIMITED
     )
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        manifest = cls.__dict__.get('__nanohttp__')
+        if isinstance(manifest, dict):
+            cls.__nanohttp__ = Manifest(manifest)
+
     def _get_default_handler(self, remaining_paths):
-        default_action = self.__nanohttp__['default_action']
-        handler = getattr(self, default_action, None)
+        handler = getattr(self, self.__nanohttp__.default_action, None)
         if not handler:
             raise HTTPNotFound()
 
@@ -47,18 +64,26 @@ class Controller(object):
             raise HTTPNotFound()
 
         manifest = handler.__nanohttp__
-        min_arguments = manifest.get('minimum_allowed_arguments')
-        max_arguments = manifest.get('maximum_allowed_arguments')
-        args_len = len(remaining_paths)
-        verbs = manifest.get('verbs', 'any')
+        if type(manifest) is dict:
+            manifest = get_manifest(handler)
 
-        if min_arguments > args_len or \
+        args_len = len(remaining_paths)
+        max_arguments = manifest.maximum_allowed_arguments
+        if manifest.minimum_allowed_arguments > args_len or \
                 (max_arguments != UNLIMITED and max_arguments < args_len):
             raise HTTPNotFound()
 
-        if verbs != ['any'] and context.method not in verbs:
-            raise HTTPMethodNotAllowed()
+        if manifest.verb_set is not None and \
+                context.method not in manifest.verb_set:
+            raise HTTPMethodNotAllowed(allow=manifest.allow)
 
+        if manifest.form_checks:
+            self._validate_form(manifest)
+
+        return handler, remaining_paths
+
+    @staticmethod
+    def _validate_form(manifest):
         prevent_empty_form = manifest.get('prevent_empty_form')
         if prevent_empty_form and len(context.form) <= 0:
             raise HTTPStatus(
@@ -87,21 +112,52 @@ class Controller(object):
                         status or f'400 Field: {k} Not Allowed'
                     )
 
-        return handler, remaining_paths
-
     def _serve_handler(self, handler, remaining_paths):
-        context.response_encoding = handler.__nanohttp__.get('encoding', None)
-        context.response_content_type = \
-            handler.__nanohttp__.get('content_type', None)
+        manifest = handler.__nanohttp__
+        if type(manifest) is dict:
+            manifest = get_manifest(handler)
+
+        context.response_encoding = manifest.encoding
+        context.response_content_type = manifest.content_type
+        if not manifest.keywordonly_arguments:
+            return handler(*remaining_paths)
 
         kwargs = {}
-        for k, v in handler.__nanohttp__.get('keywordonly_arguments', []):
-            value = context.query.get(k)
+        query = context.query
+        for k, v in manifest.keywordonly_arguments:
+            value = query.get(k)
             if value:
                 kwargs[k] = value
 
         return handler(*remaining_paths, **kwargs)
 
+    def _call_profiled(self, profile, remaining_paths):
+        """Same as the :meth:`__call__`, but records the timings in the
+        ``profile``, and passes it down to the nested controllers.
+        """
+        start = time.perf_counter()
+        handler, remaining_paths = self._find_handler(remaining_paths)
+        found = time.perf_counter()
+        profile.routing += found - start
+
+        handler, remaining_paths = \
+            self._validate_handler(handler, remaining_paths)
+        profile.validation += time.perf_counter() - found
+
+        profile.enter(handler)
+        if is_profilable(handler):
+            controller = handler
+
+            def handler(*remaining_paths):
+                return controller._call_profiled(
+                    profile,
+                    list(remaining_paths)
+                )
+
+            handler.__nanohttp__ = controller.__nanohttp__
+
+        return self._serve_handler(handler, remaining_paths)
+
     def __call__(self, *remaining_paths):
         handler, remaining_paths = self._find_handler(list(remaining_paths))
         handler, remaining_paths = \
@@ -109,22 +165,190 @@ class Controller(object):
         return self._serve_handler(handler, remaining_paths)
 
 
+def is_profilable(handler):
+    """Indicates the handler is a controller which is dispatched by the
+    :meth:`.Controller.__call__`, so it could be profiled by its
+    ``_call_profiled`` method.
+
+    Controllers which override the ``__call__`` are profiled as a single
+    handler.
+    """
+    return type(handler).__call__ is Controller.__call__
+
+
 class RestController(Controller):
     """HTTP method oriented controller
+
+    The handlers are indexed when the class is created, so the dispatching
+    does not need the reflection:
+
+    - ``OPTIONS`` requests are answered by the ``Allow`` header, unless the
+      ``options`` handler is overridden.
+    - ``HEAD`` requests are served by the ``get`` handler, if there is no
+      ``head`` handler.
+    - ``405 Method Not Allowed`` responses have the ``Allow`` header.
     """
+
+    #: Handlers by the path segment, the raw class attributes and whether
+    #: they should be bound to the instance, ``None`` if the attributes are
+    #: dynamic
+    __handlers__ = None
+
+    #: Handlers by the verb, ``None`` if the attributes are dynamic
+    __verb_handlers__ = None
+
+    #: Verbs of the controller, the actions which are named by the HTTP
+    #: methods, or by a verb which is declared in their manifest.
+    __verbs__ = frozenset(('options', ))
+
+    #: Handlers which are reachable by the verb only, not by the path
+    __verb_only__ = frozenset(('options', ))
+
+    #: Value of the ``Allow`` header
+    __allow__ = 'OPTIONS'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        verbs = set()
+        attributes = {}
+        for name in dir(cls):
+            value = getattr(cls, name, None)
+            if not name.startswith('_') and callable(value) and \
+                    not isinstance(value, (type, Controller)) and \
+                    hasattr(value, '__nanohttp__') and \
+                    cls._is_verb(name, value.__nanohttp__):
+                verbs.add(name)
+
+            for klass in cls.__mro__:
+                if name in klass.__dict__:
+                    value = klass.__dict__[name]
+                    attributes[name] = value, hasattr(type(value), '__get__')
+                    break
+
+        if 'get' in verbs:
+            verbs.add('head')
+
+        # The default ``options`` handler must not hide the paths
+        cls.__verb_only__ = frozenset(('options', )) \
+            if cls.options is RestController.options else frozenset()
+        cls.__verbs__ = frozenset(verbs)
+        cls.__allow__ = ', '.join(sorted(v.upper() for v in verbs))
+
+        if hasattr(cls, '__getattr__'):
+            cls.__handlers__ = cls.__verb_handlers__ = None
+            return
+
+        verb_handlers = dict(attributes)
+        if 'head' not in attributes and 'get' in attributes:
+            verb_handlers['head'] = attributes['get']
+
+        cls.__handlers__ = MappingProxyType(attributes)
+        cls.__verb_handlers__ = MappingProxyType(verb_handlers)
+
+    @staticmethod
+    def _is_verb(name, manifest):
+        if name in HTTP_METHODS:
+            return True
+
+        verbs = manifest.get('verbs') or ()
+        if isinstance(verbs, str):
+            verbs = [verbs]
+
+        return name in verbs
+
+    def _lookup(self, handlers, name):
+        if handlers is None:
+            return getattr(self, name, None)
+
+        # Instance attributes, such as the sub-controllers which are created
+        # in the ``__init__``
+        instance_attributes = self.__dict__
+        if name in instance_attributes:
+            return instance_attributes[name]
+
+        entry = handlers.get(name)
+        if entry is None:
+            return None
+
+        value, bind = entry
+        return value.__get__(self, type(self)) if bind else value
+
     def _find_handler(self, remaining_paths):
-        if remaining_paths and hasattr(self, remaining_paths[0]):
-            return getattr(self, remaining_paths[0], None), remaining_paths[1:]
+        if remaining_paths and remaining_paths[0] not in self.__verb_only__:
+            handler = self._lookup(self.__handlers__, remaining_paths[0])
+            if handler is not None:
+                return handler, remaining_paths[1:]
 
         # Handler is not found, trying verb
-        if not hasattr(self, context.method):
-            raise HTTPMethodNotAllowed()
+        method = context.method
+        handler = self._lookup(self.__verb_handlers__, method)
+        if handler is None and method == 'head':
+            handler = self._lookup(self.__verb_handlers__, 'get')
+
+        if handler is None:
+            raise HTTPMethodNotAllowed(allow=self.__allow__)
+
+        return handler, remaining_paths
 
-        return getattr(self, context.method), remaining_paths
+    @action(verbs='options')
+    def options(self, *args):
+        context.response_headers['Allow'] = self.__allow__
+        return ''
+
+
+class StaticFile:
+    """A file which is served by the :class:`.Static` controller, holds the
+    precomputed headers and the content of the cached files.
+    """
+
+    __slots__ = (
+        'path',
+        'content',
+        'encoding',
+        'content_type',
+        'size',
+        'mtime',
+        'etag',
+        'last_modified',
+        'signature',
+        'checked',
+    )
+
+    def __init__(self, path, stat, content=None, encoding=None,
+                 original_path=None):
+        self.path = path
+        self.content = content
+        self.encoding = encoding
+        self.content_type = guess_type(original_path or path)[0] or \
+            'application/octet-stream'
+        self.size = stat.st_size if content is None else len(content)
+        self.mtime = int(stat.st_mtime)
+        self.etag = '"%x-%x%s"' % (
+            stat.st_mtime_ns,
+            stat.st_size,
+            f'-{encoding}' if encoding else ''
+        )
+        self.last_modified = \
+            time.strftime(HTTP_DATETIME_FORMAT, time.gmtime(stat.st_mtime))
+        self.signature = self.get_signature(stat)
+        self.checked = time.monotonic()
+
+    @staticmethod
+    def get_signature(stat):
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
 
 
 class Static(Controller):
     """Serves static files
+
+    Small files could be kept in memory by giving the ``cache_size``, the
+    cached files are served without touching the filesystem, until the
+    ``revalidate_interval`` is elapsed, then their modification time, inode
+    and size will be checked to detect the changes.
+
+    When ``precompressed`` is enabled, the ``.br`` and ``.gz`` siblings of the
+    requested file are served, if the client accepts them.
     """
     __nanohttp__ = dict(
         verbs=['any'],
@@ -136,16 +360,114 @@ class Static(Controller):
 
     __chunk_size__ = 0x4000
 
-    def __init__(self, directory='.', default_document='index.html'):
+    #: Maximum number of the byte ranges in a single request, the whole file
+    #: will be served for the requests with more ranges.
+    __max_ranges__ = 16
+
+    #: Content-coding -> file name suffix of the precompressed files, in order
+    #: of the preference
+    __precompressed__ = {
+        'br': '.br',
+        'gzip': '.gz',
+    }
+
+    def __init__(self, directory='.', default_document='index.html',
+                 cache_size=0, max_cached_file_size=0x10000,
+                 revalidate_interval=1, precompressed=False):
         """
         :param directory: Directory path to server
         :param default_document: Default document to serve as index
+        :param cache_size: Maximum total bytes of the cached files, ``0``
+                           disables the cache.
+        :param max_cached_file_size: Larger files will not be cached
+        :param revalidate_interval: Seconds to serve a cached file, before
+                                    checking it for changes.
+        :param precompressed: Serve the precompressed siblings of the files.
         """
         self.default_document = default_document
         self.directory = directory
+        self.cache_size = cache_size
+        self.max_cached_file_size = max_cached_file_size
+        self.revalidate_interval = revalidate_interval
+        self.precompressed = precompressed
+        self.cache = OrderedDict()
+        self.cache_used = 0
+        self.cache_lock = threading.Lock()
 
     def __call__(self, *remaining_paths):
+        encodings = None
+        key = remaining_paths
+        if self.precompressed:
+            context.response_headers.add_header('Vary', 'Accept-Encoding')
+            encodings = tuple(acceptable_encodings(
+                context.environ.get('HTTP_ACCEPT_ENCODING'),
+                self.__precompressed__
+            ))
+            if encodings:
+                key = (encodings, remaining_paths)
+
+        file = self._get_cached(key) if self.cache_size else None
+        if file is not None:
+            return self._serve(file)
+
+        physical_path = self._find_file(remaining_paths)
+        if context.method == 'head':
+            # The headers are made of the file's status, no need to open it
+            path, stat, encoding = self._stat(physical_path, encodings)
+            return self._serve(
+                StaticFile(path, stat, None, encoding, physical_path)
+            )
+
+        f, stat, encoding = self._open(physical_path, encodings)
+
+        if not self.cache_size or stat.st_size > self.max_cached_file_size:
+            return self._serve(
+                StaticFile(f.name, stat, None, encoding, physical_path),
+                f
+            )
+
+        with f:
+            file = StaticFile(f.name, stat, f.read(), encoding, physical_path)
+
+        self._cache(key, file)
+        return self._serve(file)
+
+    def _open(self, physical_path, encodings=None):
+        """Open the file or it's most preferred precompressed sibling
+        """
+        for encoding in encodings or ():
+            try:
+                f = open(
+                    physical_path + self.__precompressed__[encoding],
+                    mode='rb'
+                )
+            except OSError:
+                continue
+
+            return f, os.fstat(f.fileno()), encoding
+
+        try:
+            f = open(physical_path, mode='rb')
+            return f, os.fstat(f.fileno()), None
+        except OSError:
+            raise HTTPNotFound()
+
+    def _stat(self, physical_path, encodings=None):
+        """Status of the file or it's most preferred precompressed sibling
+        """
+        for encoding in encodings or ():
+            path = physical_path + self.__precompressed__[encoding]
+            try:
+                return path, os.stat(path), encoding
+            except OSError:
+                continue
+
+        try:
+            return physical_path, os.stat(physical_path), None
+        except OSError:
+            raise HTTPNotFound()
 
+    def _find_file(self, remaining_paths):
         # Find the physical path of the given path parts
         physical_path = join(self.directory, *remaining_paths)
 
@@ -162,29 +484,215 @@ class Static(Controller):
             if not (self.default_document and exists(physical_path)):
                 raise HTTPNotFound()
 
+        return physical_path
+
+    def _get_cached(self, key):
+        with self.cache_lock:
+            file = self.cache.get(key)
+            if file is None:
+                return None
+
+            self.cache.move_to_end(key)
+
+        now = time.monotonic()
+        if now - file.checked < self.revalidate_interval:
+            return file
+
+        try:
+            signature = StaticFile.get_signature(os.stat(file.path))
+        except OSError:
+            signature = None
+
+        if signature == file.signature:
+            file.checked = now
+            return file
+
+        with self.cache_lock:
+            if self.cache.get(key) is file:
+                del self.cache[key]
+                self.cache_used -= file.size
+
+        return None
+
+    def _cache(self, key, file):
+        if file.size > self.cache_size:
+            return
+
+        with self.cache_lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self.cache_used -= previous.size
+
+            # Evicting the least recently used files
+            while self.cache and self.cache_used + file.size > self.cache_size:
+                self.cache_used -= self.cache.popitem(last=False)[1].size
+
+            self.cache[key] = file
+            self.cache_used += file.size
+
+    def _serve(self, file, f=None):
+        """Serve the given file, from the memory if ``f`` is not given.
+        """
         context.response_headers.add_header(
-            'Content-Type',
-            guess_type(physical_path)[0] or 'application/octet-stream'
+            'Last-Modified',
+            file.last_modified
         )
+        context.response_headers.add_header('ETag', file.etag)
+        context.response_headers.add_header('Accept-Ranges', 'bytes')
+        if file.encoding:
+            context.response_headers.add_header(
+                'Content-Encoding',
+                file.encoding
+            )
 
         try:
-            f = open(physical_path, mode='rb')
-            stat = os.fstat(f.fileno())
-            context.response_headers.add_header('Content-Length', str(stat[6]))
+            if context.method in ('get', 'head') and is_not_modified(
+                context.environ,
+                file.etag,
+                file.mtime
+            ):
+                raise HTTPNotModified()
+
+            ranges = self._get_ranges(file.size, file.etag, file.last_modified)
+        except HTTPStatus:
+            if f is not None:
+                f.close()
+            raise
+
+        if ranges is None:
             context.response_headers.add_header(
-                'Last-Modified',
-                time.strftime(HTTP_DATETIME_FORMAT, time.gmtime(stat.st_mtime))
+                'Content-Type',
+                file.content_type
             )
+            context.response_headers.add_header(
+                'Content-Length',
+                str(file.size)
+            )
+            if f is None:
+                return file.content
 
-            with f:
-                while True:
-                    r = f.read(self.__chunk_size__)
-                    if not r:
-                        break
-                    yield r
+            # Let the server to transmit the file efficiently, if supported.
+            file_wrapper = context.environ.get('wsgi.file_wrapper')
+            if file_wrapper is not None:
+                return file_wrapper(f, self.__chunk_size__)
 
-        except OSError:
-            raise HTTPNotFound()
+            return self._read(f)
+
+        context.response_status = HTTPPartialContent.status
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            context.response_headers.add_header(
+                'Content-Type',
+                file.content_type
+            )
+            context.response_headers.add_header(
+                'Content-Range',
+                f'bytes {start}-{end}/{file.size}'
+            )
+            context.response_headers.add_header(
+                'Content-Length',
+                str(end - start + 1)
+            )
+            if f is None:
+                return file.content[start:end + 1]
+
+            return self._read(f, start, end - start + 1)
+
+        return self._read_multipart(file, f, ranges)
+
+    def _get_ranges(self, size, etag, last_modified):
+        """Requested byte ranges, or ``None`` to serve the whole file
+        """
+        if context.method != 'get':
+            return None
+
+        header = context.environ.get('HTTP_RANGE')
+        if not header:
+            return None
+
+        if_range = context.environ.get('HTTP_IF_RANGE')
+        if if_range and if_range not in (etag, last_modified):
+            return None
+
+        ranges = parse_range_header(header, size)
+        if ranges is None or len(ranges) > self.__max_ranges__:
+            return None
+
+        if not ranges:
+            context.response_headers.add_header(
+                'Content-Range',
+                f'bytes */{size}'
+            )
+            raise HTTPRangeNotSatisfiable()
+
+        return ranges
+
+    def _read(self, f, start=0, length=None):
+        with f:
+            if start:
+                f.seek(start)
+
+            while length is None or length > 0:
+                chunk_size = self.__chunk_size__ if length is None \
+                    else min(length, self.__chunk_size__)
+                r = f.read(chunk_size)
+                if not r:
+                    break
+
+                if length is not None:
+                    length -= len(r)
+
+                yield r
+
+    def _read_multipart(self, file, f, ranges):
+        boundary = uuid.uuid4().hex
+        headers = [(
+            f'--{boundary}\r\n'
+            f'Content-Type: {file.content_type}\r\n'
+            f'Content-Range: bytes {start}-{end}/{file.size}\r\n'
+            f'\r\n'
+        ).encode() for start, end in ranges]
+        closing = f'--{boundary}--\r\n'.encode()
+
+        context.response_headers.add_header(
+            'Content-Type',
+            f'multipart/byteranges; boundary={boundary}'
+        )
+        context.response_headers.add_header(
+            'Content-Length',
+            str(
+                sum(len(h) + end - start + 3 for h, (start, end) in \
+                    zip(headers, ranges)) + len(closing)
+            )
+        )
+
+        def read():
+            try:
+                for header, (start, end) in zip(headers, ranges):
+                    yield header
+                    if f is None:
+                        yield file.content[start:end + 1]
+
+                    else:
+                        f.seek(start)
+                        length = end - start + 1
+                        while length > 0:
+                            r = f.read(min(length, self.__chunk_size__))
+                            if not r:
+                                break
+
+                            length -= len(r)
+                            yield r
+
+                    yield b'\r\n'
+
+                yield closing
+
+            finally:
+                if f is not None:
+                    f.close()
+
+        return read()
 
 
 class RegexRouteController(Controller):
@@ -198,25 +706,131 @@ class RegexRouteController(Controller):
                super().__init__((
                    (r'/installations/(?P<installation_id>\\d+)/access_tokens',
                    self.access_tokens),
+                   (r'/users/(?P<id>\\d+)', self.users, dict(id=int)),
                ))
 
            @json
            def access_tokens(self, installation_id: int):
                return dict(installationId=installation_id)
 
+           @json
+           def users(self, id):
+               assert isinstance(id, int)
+               ...
+
+    The routes are indexed by their first path segment, if it's literal,
+    such as ``/foos`` in ``/foos/(?P<id>\\d+)``, so only the routes with
+    the same first segment and the routes which are not started with a
+    literal segment are tried, in order.
+
+    The optional third element of the routes is a dictionary of the group
+    name or number to a converter, such as ``int``, the groups are numbered
+    from ``1``, as the :meth:`re.Match.group` does. The converters may raise
+    ``ValueError`` or ``TypeError`` to respond ``404 Not Found``.
+
+    .. note:: The routes are indexed in the constructor, call the
+              :meth:`.compile` after changing the ``routes``.
     """
 
     def __init__(self, routes):
         """
-        :param routes: Routes list in (regex, method) format
+        :param routes: Routes list in (regex, method[, converters]) format
         """
-        self.routes = [(re.compile(p), a) for p, a in routes]
+        self.routes = [
+            (re.compile(route[0]), ) + tuple(route[1:]) for route in routes
+        ]
+        self.compile()
+
+    @staticmethod
+    def _index_converters(pattern, converters):
+        """
+        :return: Tuple of the ``(index of the argument, converter)``
+        :raise ValueError: If a group does not exist in the pattern
+        """
+        if not converters:
+            return None
+
+        result = []
+        for key, converter in converters.items():
+            number = pattern.groupindex.get(key) if isinstance(key, str) \
+                else key
+            if not isinstance(number, int) or \
+                    not 1 <= number <= pattern.groups:
+                raise ValueError(
+                    f'Invalid group: {key!r} of the route: {pattern.pattern}'
+                )
+
+            result.append((number - 1, converter))
+
+        return tuple(result)
+
+    @staticmethod
+    def get_literal_segment(pattern):
+        """
+        :return: The first path segment of the pattern, if it's literal,
+                 otherwise ``None``.
+        """
+        # The global inline flags, such as (?i), are in the pattern.flags
+        if pattern.flags & re.IGNORECASE or '|' in pattern.pattern:
+            return None
+
+        match = LITERAL_SEGMENT_PATTERN.match(pattern.pattern)
+        return match.group(1) if match else None
+
+    def compile(self):
+        """Index the routes by their first literal path segment
+        """
+        routes = []
+        for route in self.routes:
+            pattern = re.compile(route[0])
+            converters = route[2] if len(route) > 2 else None
+            routes.append((
+                pattern,
+                route[1],
+                self._index_converters(pattern, converters)
+            ))
+
+        segments = [self.get_literal_segment(r[0]) for r in routes]
+
+        self._wildcards = tuple(
+            route for route, segment in zip(routes, segments)
+            if segment is None
+        )
+        self._index = {
+            segment: tuple(
+                route for route, s in zip(routes, segments)
+                if s is None or s == segment
+            )
+            for segment in set(segments) if segment is not None
+        }
+
+    @staticmethod
+    def _convert(arguments, converters):
+        arguments = list(arguments)
+        for index, converter in converters:
+            if arguments[index] is None:
+                continue
+
+            try:
+                arguments[index] = converter(arguments[index])
+            except (ValueError, TypeError):
+                raise HTTPNotFound()
+
+        return arguments
 
     def _find_handler(self, remaining_paths):
+        candidates = self._index.get(
+            remaining_paths[0] if remaining_paths else '',
+            self._wildcards
+        )
         path = '/' + '/'.join(remaining_paths)
-        for pattern, handler in self.routes:
+        for pattern, handler, converters in candidates:
             match = pattern.match(path)
             if match:
-                return handler, match.groups()
-        raise HTTPNotFound()
+                arguments = match.groups()
+                if converters:
+                    arguments = self._convert(arguments, converters)
 
+                return handler, arguments
+
+        raise HTTPNotFound()
@@ -1,16 +1,21 @@
+import types
 import functools
-from inspect import signature, Parameter
+from inspect import signature, Parameter, isawaitable
 from typing import Union
 
 import ujson
 
 from .contexts import context
+from .configuration import settings
 from .constants import UNLIMITED
+from .compression import compressed
+from .caching import cached
+from .manifest import Manifest
 
 
 def action(*args, verbs='any', encoding='utf-8', content_type=None,
            inner_decorator=None, prevent_empty_form=None, prevent_form=None,
-           form_whitelist=None, **kwargs):
+           form_whitelist=None, compress=None, cache=None, **kwargs):
     """
     Base action decorator
 
@@ -30,6 +35,10 @@ def action(*args, verbs='any', encoding='utf-8', content_type=None,
                          raised, otherwise :class:`.HTTPBadRequest`.
     :param form_whitelist: A list of allowed form fields. or a
                            tuple(list, httpstatus)
+    :param compress: Boolean or a list of content-codings, indicates to
+                     compress the response, see :func:`.compressed`.
+    :param cache: Seconds to cache the response, or a dictionary of the
+                  :func:`.cached` arguments.
     """
     def decorator(func):
         nonlocal verbs
@@ -37,6 +46,32 @@ def action(*args, verbs='any', encoding='utf-8', content_type=None,
         if inner_decorator is not None:
             func = inner_decorator(func, *args, **kwargs)
 
+        if compress:
+            compress_encodings = None if compress is True else compress
+            chunked_action = getattr(func, '__chunked__', None)
+            if chunked_action is not None:
+                # Compressing the payload inside the chunk framing
+                inner, trailer_field, trailer_value = chunked_action
+                func = chunked(trailer_field, trailer_value)(compressed(
+                    inner,
+                    encodings=compress_encodings,
+                    flush=True
+                ))
+            else:
+                func = compressed(func, encodings=compress_encodings)
+
+        if cache:
+            cache_options = dict(cache) if isinstance(cache, dict) \
+                else dict(ttl=cache)
+
+            # Compressed responses depend on the client's accepted encodings
+            if compress:
+                cache_options['headers'] = \
+                    list(cache_options.get('headers') or ()) + \
+                    ['Accept-Encoding']
+
+            func = cached(func, **cache_options)
+
         # Examining the signature,
         # and counting the optional and positional arguments.
         positional_arguments, optional_arguments, keywordonly_arguments = \
@@ -64,7 +99,7 @@ def action(*args, verbs='any', encoding='utf-8', content_type=None,
             else:
                 optional_arguments.append((parameter.name, parameter.default))
 
-        func.__nanohttp__ = dict(
+        func.__nanohttp__ = Manifest(
             verbs=[verbs] if isinstance(verbs, str) else verbs,
             encoding=encoding,
             content_type=content_type,
@@ -99,11 +134,14 @@ def chunked(trailer_field=None, trailer_value=None):
             context.response_headers.add_header('Transfer-Encoding', 'chunked')
             if trailer_field:
                 context.response_headers.add_header('Trailer', trailer_field)
-            result = func(*args, **kwargs)
+            result = iter(func(*args, **kwargs))
             try:
                 while True:
-                    chunk = next(result)
-                    yield f'{len(chunk)}\r\n{chunk}\r\n'
+                    chunk = context.encode_response(next(result))
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+
+                    yield b'%x\r\n%s\r\n' % (len(chunk), chunk)
 
             except StopIteration:
                 yield '0\r\n'
@@ -112,10 +150,12 @@ def chunked(trailer_field=None, trailer_value=None):
                 yield '\r\n'
 
             except Exception as ex:
-                exstr = str(ex)
-                yield f'{len(exstr)}\r\n{exstr}'
+                exstr = str(ex).encode()
+                yield b'%x\r\n%s' % (len(exstr), exstr)
                 yield '0\r\n\r\n'
 
+        # To compress the chunks, using the compress argument of the action
+        wrapper.__chunked__ = (func, trailer_field, trailer_value)
         return wrapper
 
     if callable(trailer_field):
@@ -126,20 +166,88 @@ def chunked(trailer_field=None, trailer_value=None):
     return decorator
 
 
-def jsonify(func):
+def dump_json(obj):
+    """Default JSON encoder of the :func:`.jsonify`
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        result = func(*args, **kwargs)
+    Responses are compact, unless the ``debug`` is enabled, then they will be
+    indented using the ``json.indent`` setting.
+    """
+    if settings.debug:
+        return ujson.dumps(obj, indent=settings.json.indent)
+
+    return ujson.dumps(obj)
+
+
+def jsonify(func, encoder=None, chunk_size=0x4000):
+    """Encode the result of the handler as JSON
+
+    Accepts ``None``, list, tuple, dict, int, float, bool, str or objects
+    have ``to_dict`` method. bytes are assumed to be encoded already.
+
+    Generators are encoded incrementally as a JSON array, items will be
+    buffered up to ``chunk_size`` bytes.
+
+    :param encoder: A callable which returns the encoded object as str or
+                    bytes, such as ``orjson.dumps``, default:
+                    :func:`.dump_json`.
+    :param chunk_size: Buffer size of the streaming responses
+    """
+    encoder = encoder or dump_json
+
+    def prepare(result):
         if hasattr(result, 'to_dict'):
-            result = result.to_dict()
-        elif (
-            result is not None and
-            not isinstance(result, (list, dict, int, str))
+            return result.to_dict()
+
+        if result is not None and not isinstance(
+            result,
+            (list, tuple, dict, int, float, str)
         ):
             raise ValueError('Cannot encode to json: %s' % type(result))
 
-        return ujson.dumps(result, indent=4)
+        return result
+
+    def encode_generator(result):
+        buffer = [b'[']
+        buffered = 1
+        separator = b''
+        for item in result:
+            item = encoder(prepare(item))
+            if isinstance(item, str):
+                item = item.encode()
+
+            buffer.append(separator)
+            buffer.append(item)
+            separator = b','
+            buffered += len(item) + 1
+            if buffered >= chunk_size:
+                yield b''.join(buffer)
+                buffer = []
+                buffered = 0
+
+        buffer.append(b']')
+        yield b''.join(buffer)
+
+    def encode(result):
+        if isinstance(result, bytes):
+            return result
+
+        if isinstance(result, types.GeneratorType):
+            return encode_generator(result)
+
+        return encoder(prepare(result))
+
+    async def encode_awaitable(result):
+        return encode(await result)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+
+        # Async actions
+        if isawaitable(result):
+            return encode_awaitable(result)
+
+        return encode(result)
 
     return wrapper
 
@@ -152,7 +260,8 @@ text = functools.partial(action, content_type='text/plain')
 
 #: JSON action decorator
 #:
-#: accepts list, dict, int, str or objects have ``to_dict`` method.
+#: See :func:`.jsonify` for the accepted results and the ``encoder``
+#: argument.
 json = functools.partial(
     action,
     content_type='application/json',
@@ -0,0 +1,243 @@
+import io
+import sys
+import time
+import pstats
+import marshal
+import cProfile
+import threading
+from collections import Counter
+
+from .configuration import settings
+from .contexts import context
+from .controllers import Controller
+from .decorators import action, text
+from .exceptions import HTTPNotFound, HTTPBadRequest
+
+
+#: Allowed sort keys of the profiling results
+SORT_KEYS = frozenset((
+    'calls', 'cumulative', 'cumtime', 'filename', 'line', 'name', 'ncalls',
+    'pcalls', 'stdname', 'time', 'tottime',
+))
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+def sample_stacks(duration, interval):
+    """Sample the stacks of all threads, except the current one
+
+    :param duration: Seconds to sample
+    :param interval: Seconds between the samples
+    :return: A :class:`collections.Counter` of the collapsed stacks, each
+             stack is the thread name and the frames, from the outermost to
+             the innermost, joined by ``;``.
+    """
+    current = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + duration
+    while True:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+
+            frames = []
+            while frame is not None:
+                frames.append(format_frame(frame))
+                frame = frame.f_back
+
+            frames.append(names.get(ident, str(ident)))
+            stacks[';'.join(reversed(frames))] += 1
+
+        if time.monotonic() + interval > deadline:
+            return stacks
+
+        time.sleep(interval)
+
+
+def get_number_argument(name, default, maximum, type_=int):
+    value = context.query.get(name)
+    if value is None:
+        return default
+
+    try:
+        value = type_(value)
+    except ValueError:
+        raise HTTPBadRequest(f'Invalid {name}')
+
+    if value <= 0:
+        raise HTTPBadRequest(f'Invalid {name}')
+
+    return min(value, maximum)
+
+
+class DiagnosticController(Controller):
+    """Profiles the live application, to diagnose the latency spikes
+    without restarting it.
+
+    .. code-block:: python
+
+       class Root(Controller):
+           diagnostics = DiagnosticController()
+
+    - ``POST /diagnostics/profile?requests=N``: Profile the next ``N``
+      requests using the :mod:`cProfile`, the results are accumulated. A
+      single request is profiled at a time, the concurrent requests are
+      served without profiling.
+    - ``GET /diagnostics/profile?sort=cumulative&limit=50``: The results as
+      text, or as a file which is readable by :class:`pstats.Stats` with
+      ``format=pstats``.
+    - ``GET /diagnostics/sample?seconds=T&interval=I``: Sample the stacks of
+      all threads for ``T`` seconds and respond the collapsed stacks, which
+      is the input of the `flamegraph
+      <https://github.com/brendangregg/FlameGraph>`_ tools.
+
+    The controller responds ``404 Not Found`` unless the
+    ``diagnostics.enabled`` setting is set, it must be guarded against the
+    public access anyway.
+
+    .. note:: Requests are profiled using the ``begin_request`` and
+              ``end_response`` hooks of the application, the asyncio tasks
+              which are served concurrently by the
+              :class:`.AsyncApplication` in a single thread cannot be
+              profiled separately.
+    """
+
+    def __init__(self):
+        self.remaining = 0
+        self.active = False
+        self.stats = None
+        self._lock = threading.Lock()
+        self._applications = set()
+
+    def _install_hooks(self, application):
+        """Chain the profiling to the ``begin_request`` and ``end_response``
+        hooks of the application, once.
+        """
+        if id(application) in self._applications:
+            return
+
+        begin_request = getattr(application, 'begin_request', None)
+        end_response = getattr(application, 'end_response', None)
+
+        def begin_request_hook():
+            if begin_request is not None:
+                begin_request()
+
+            self._begin()
+
+        def end_response_hook():
+            self._end()
+            if end_response is not None:
+                end_response()
+
+        application.begin_request = begin_request_hook
+        application.end_response = end_response_hook
+        self._applications.add(id(application))
+
+    def _begin(self):
+        if not self.remaining or self.active:
+            return
+
+        # Only one profiler could be active at a time, the concurrent
+        # requests are not profiled.
+        with self._lock:
+            if not self.remaining or self.active:
+                return
+
+            self.active = True
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active
+            self.active = False
+            return
+
+        with self._lock:
+            self.remaining -= 1
+
+        context.diagnostic_profiler = profiler
+
+    def _end(self):
+        profiler = getattr(context, 'diagnostic_profiler', None)
+        if profiler is None:
+            return
+
+        profiler.disable()
+        del context.diagnostic_profiler
+        with self._lock:
+            self.active = False
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+    def __call__(self, *remaining_paths):
+        if not settings.diagnostics.enabled:
+            raise HTTPNotFound()
+
+        return super().__call__(*remaining_paths)
+
+    @action(verbs=['get', 'post'])
+    def profile(self):
+        if context.method == 'post':
+            return self._start_profiling()
+
+        sort = context.query.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            raise HTTPBadRequest('Invalid sort')
+
+        limit = get_number_argument('limit', 50, 10000)
+        with self._lock:
+            if self.stats is None:
+                raise HTTPNotFound('Nothing is profiled')
+
+            if context.query.get('format') == 'pstats':
+                context.response_headers['Content-Type'] = \
+                    'application/octet-stream'
+                return marshal.dumps(self.stats.stats)
+
+            output = io.StringIO()
+            self.stats.stream = output
+            self.stats.sort_stats(sort).print_stats(limit)
+
+        context.response_headers['Content-Type'] = \
+            'text/plain; charset=utf-8'
+        context.response_headers['X-Remaining-Requests'] = \
+            str(self.remaining)
+        return output.getvalue()
+
+    def _start_profiling(self):
+        requests = get_number_argument(
+            'requests',
+            10,
+            settings.diagnostics.max_requests
+        )
+        self._install_hooks(context.application)
+        with self._lock:
+            self.stats = None
+            self.remaining = requests
+
+        context.response_status = '202 Accepted'
+        context.response_headers['Content-Type'] = \
+            'text/plain; charset=utf-8'
+        return f'Profiling the next {requests} requests'
+
+    @text
+    def sample(self):
+        duration = get_number_argument(
+            'seconds',
+            1.,
+            settings.diagnostics.max_duration,
+            type_=float
+        )
+        interval = get_number_argument('interval', .005, 1., type_=float)
+        stacks = sample_stacks(duration, interval)
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in sorted(stacks.items())
+        )
@@ -52,6 +52,36 @@ class HTTPBadRequest(HTTPKnownStatus):
     status = '400 Bad Request'
 
 
+class HTTPValidationErrors(HTTPBadRequest):
+    """Multiple validation errors, which are rendered as JSON:
+
+    .. code-block:: json
+
+       {
+           "errors": [
+               {"field": "title", "statusCode": 400, "statusText": "..."}
+           ]
+       }
+
+    """
+
+    def __init__(self, errors):
+        """
+        :param errors: List of dictionaries, with ``field``, ``statusCode``
+                       and ``statusText`` keys.
+        """
+        self.errors = errors
+        super().__init__()
+
+    def render(self):
+        context.response_encoding = 'utf-8'
+        return ujson.encode(dict(errors=self.errors))
+
+    @property
+    def headers(self):
+        return [('Content-Type', 'application/json; charset=utf-8')]
+
+
 class HTTPUnauthorized(HTTPKnownStatus):
     status = '401 Unauthorized'
 
@@ -67,6 +97,21 @@ class HTTPNotFound(HTTPKnownStatus):
 class HTTPMethodNotAllowed(HTTPKnownStatus):
     status = '405 Method Not Allowed'
 
+    def __init__(self, status_text=None, allow=None):
+        """
+        :param allow: Value of the ``Allow`` header, such as ``GET, POST``
+        """
+        self.allow = allow
+        super().__init__(status_text)
+
+    @property
+    def headers(self):
+        headers = super().headers
+        if self.allow:
+            headers.append(('Allow', self.allow))
+
+        return headers
+
 
 class HTTPConflict(HTTPKnownStatus):
     status = '409 Conflict'
@@ -80,6 +125,10 @@ class HTTPPreconditionFailed(HTTPKnownStatus):
     status = '412 Precondition Failed'
 
 
+class HTTPRequestEntityTooLarge(HTTPKnownStatus):
+    status = '413 Request Entity Too Large'
+
+
 class HTTPRedirect(HTTPKnownStatus):
     """
     This is an abstract class for all redirects.
@@ -103,7 +152,11 @@ class HTTPFound(HTTPRedirect):
     status = '302 Found'
 
 
-class HTTPNotModified(HTTPKnownStatus):
+class HTTPRangeNotSatisfiable(KeepResponseHeadersMixin, HTTPKnownStatus):
+    status = '416 Range Not Satisfiable'
+
+
+class HTTPNotModified(KeepResponseHeadersMixin, HTTPKnownStatus):
     status = '304 Not Modified'
 
 
@@ -0,0 +1,526 @@
+import io
+import re
+import json
+import codecs
+import tempfile
+from itertools import chain
+from urllib.parse import parse_qsl
+
+from . import exceptions
+
+
+#: Maximum bytes of the headers of a multipart part
+MAX_PART_HEADERS_SIZE = 0x4000
+
+#: Maximum bytes of a chunk-size line of the chunked transfer encoding
+MAX_CHUNK_HEADER_SIZE = 0x400
+
+HEADER_PARAMETER_PATTERN = re.compile(
+    r';\s*([^\s=;]+)\s*=\s*("(?:\\.|[^"\\])*"|[^;]*)'
+)
+
+BOUNDARY_PATTERN = re.compile(r'^[ -~]{0,200}[!-~]$')
+
+
+class FilePart:
+    """An uploaded file of the ``multipart/form-data`` request
+
+    The content is spooled into memory, and will be rolled over to a
+    temporary file on the disk when it's larger than the ``spool_size``.
+    """
+
+    __slots__ = ('name', 'filename', 'type', 'headers', 'file', 'size')
+
+    def __init__(self, name, filename, type_=None, headers=None,
+                 spool_size=0):
+        self.name = name
+        self.filename = filename
+        self.type = type_
+        self.headers = headers or {}
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self.size = 0
+
+    @property
+    def value(self):
+        """The whole content of the file, as bytes
+        """
+        self.file.seek(0)
+        try:
+            return self.file.read()
+        finally:
+            self.file.seek(0)
+
+    def write(self, data):
+        self.size += len(data)
+        self.file.write(data)
+
+    def __repr__(self):
+        return f'FilePart({self.name!r}, {self.filename!r}, {self.size})'
+
+
+def parse_header(line):
+    """Parse a header's value with parameters, such as the
+    ``Content-Type`` and ``Content-Disposition``
+
+    :return: A tuple of the value and a dictionary of the parameters
+    """
+    value, _, parameters = line.partition(';')
+    result = {}
+    for name, v in HEADER_PARAMETER_PATTERN.findall(';' + parameters):
+        v = v.strip()
+        if len(v) >= 2 and v[0] == v[-1] == '"':
+            v = re.sub(r'\\(.)', r'\1', v[1:-1])
+
+        result[name.lower()] = v
+
+    return value.strip().lower(), result
+
+
+def read_chunks(fp, length, chunk_size=0x10000, max_size=None):
+    """Read the given number of bytes from the file-like object, chunk by
+    chunk.
+
+    :param length: Bytes to read, ``None`` to read until the end of the file.
+    :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if exceeded
+    """
+    if max_size is not None and length is not None and length > max_size:
+        raise exceptions.HTTPRequestEntityTooLarge()
+
+    remaining = length
+    total = 0
+    while remaining is None or remaining > 0:
+        chunk = fp.read(
+            chunk_size if remaining is None else min(chunk_size, remaining)
+        )
+        if not chunk:
+            break
+
+        total += len(chunk)
+        if max_size is not None and total > max_size:
+            raise exceptions.HTTPRequestEntityTooLarge()
+
+        if remaining is not None:
+            remaining -= len(chunk)
+
+        yield chunk
+
+
+def read_chunked(fp, chunk_size=0x10000, max_size=None):
+    """Decode a request body of the ``Transfer-Encoding: chunked``, chunk by
+    chunk, the trailers are ignored.
+
+    :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if exceeded
+    """
+    total = 0
+    while True:
+        line = fp.readline(MAX_CHUNK_HEADER_SIZE)
+        try:
+            size = int(line.split(b';', 1)[0], 16)
+        except ValueError:
+            raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+        if size < 0 or not line.endswith(b'\n'):
+            raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+        if not size:
+            # Trailers
+            while line not in (b'\r\n', b'\n', b''):
+                line = fp.readline(MAX_CHUNK_HEADER_SIZE)
+
+            return
+
+        total += size
+        if max_size is not None and total > max_size:
+            raise exceptions.HTTPRequestEntityTooLarge()
+
+        while size > 0:
+            chunk = fp.read(min(chunk_size, size))
+            if not chunk:
+                raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+            size -= len(chunk)
+            yield chunk
+
+        if fp.readline(MAX_CHUNK_HEADER_SIZE).strip():
+            raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+
+def iter_body(environ, content_length=None, chunk_size=0x10000,
+              max_size=None):
+    """Iterate over the request body, chunk by chunk
+
+    The body is delimited by the ``Content-Length``, or the server, if the
+    ``wsgi.input_terminated`` is set. Otherwise the ``chunked`` transfer
+    encoding will be decoded, if the request is so.
+
+    .. note:: The body could be read once.
+
+    :param content_length: The request's content length, if any
+    :param max_size: Raise :class:`.HTTPRequestEntityTooLarge` if exceeded
+    """
+    fp = environ['wsgi.input']
+    if content_length is not None:
+        return read_chunks(fp, content_length, chunk_size, max_size)
+
+    if environ.get('wsgi.input_terminated'):
+        return read_chunks(fp, None, chunk_size, max_size)
+
+    if is_chunked(environ):
+        return read_chunked(fp, chunk_size, max_size)
+
+    return iter(())
+
+
+def is_chunked(environ):
+    """Check the request's body is in the chunked transfer encoding
+    """
+    return 'chunked' in environ.get('HTTP_TRANSFER_ENCODING', '').lower()
+
+
+def iter_json_array(chunks, max_item_size=None):
+    """Decode a JSON array incrementally
+
+    The items are yielded as soon as they are arrived, so the large arrays
+    could be processed without holding the whole body in the memory.
+
+    :param chunks: Iterable of the body's chunks
+    :param max_item_size: Raise :class:`.HTTPRequestEntityTooLarge` if an
+                          item is larger than this number of characters.
+    :return: A generator of the items
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    exhausted = False
+
+    def fill(size):
+        """Read at least ``size`` characters after the position, if
+        available.
+        """
+        nonlocal buffer, position, exhausted
+
+        # Dropping the consumed characters
+        if position > len(buffer) // 2:
+            buffer = buffer[position:]
+            position = 0
+
+        while not exhausted and len(buffer) - position < size:
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                buffer += text_decoder.decode(b'', final=True)
+            else:
+                buffer += text_decoder.decode(chunk)
+
+        return len(buffer) - position >= size
+
+    def expect(characters):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+
+            if position < len(buffer):
+                break
+
+            if not fill(1):
+                raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+        character = buffer[position]
+        if character not in characters:
+            raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+        position += 1
+        return character
+
+    def expect_end():
+        """Only the whitespaces are allowed after the array
+        """
+        nonlocal position
+        while True:
+            while position < len(buffer):
+                if not buffer[position].isspace():
+                    raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+                position += 1
+
+            if not fill(1):
+                return
+
+    item_starts = '{["-0123456789tfn'
+    expect('[')
+    if expect(item_starts + ']') == ']':
+        expect_end()
+        return
+
+    position -= 1
+    while True:
+        # Decoding the item, the incomplete items are retried with doubled
+        # buffer, and the item which is ended at the end of the buffer is
+        # not reliable, such as numbers.
+        size = 0x1000
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or exhausted:
+                    break
+
+            except ValueError:
+                if exhausted:
+                    raise exceptions.HTTPBadRequest(
+                        'Cannot parse the request'
+                    )
+
+            if max_item_size is not None and \
+                    len(buffer) - position > max_item_size:
+                raise exceptions.HTTPRequestEntityTooLarge()
+
+            size = max(size, len(buffer) - position) * 2
+            fill(size)
+
+        if max_item_size is not None and end - position > max_item_size:
+            raise exceptions.HTTPRequestEntityTooLarge()
+
+        position = end
+        yield item
+
+        if expect(',]') == ']':
+            expect_end()
+            return
+
+        expect(item_starts)
+        position -= 1
+
+
+class BodyStream(io.RawIOBase):
+    """A readonly file-like object over the chunks of the request body
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if not self._buffer:
+            self._buffer = next(self._chunks, b'')
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def parse_urlencoded(chunks, encoding='utf-8', max_field_size=None):
+    """Parse an ``application/x-www-form-urlencoded`` body
+
+    :param chunks: Iterable of the body's chunks
+    :return: List of the (name, value) pairs
+    """
+    pairs = parse_qsl(
+        b''.join(chunks).decode(encoding, 'replace'),
+        keep_blank_values=True,
+        encoding=encoding,
+        errors='replace'
+    )
+    if max_field_size is not None:
+        for name, value in pairs:
+            if len(value) > max_field_size:
+                raise exceptions.HTTPRequestEntityTooLarge()
+
+    return pairs
+
+
+def parse_multipart(chunks, boundary, encoding='utf-8', max_field_size=None,
+                    max_file_size=None, spool_size=0x80000):
+    """Parse a ``multipart/form-data`` body incrementally
+
+    Each part is read chunk by chunk, files are written into a
+    :class:`.FilePart` and the other fields are decoded as str.
+
+    :param chunks: Iterable of the body's chunks
+    :param boundary: The boundary parameter of the ``Content-Type`` header
+    :param max_field_size: Maximum bytes of a non-file field
+    :param max_file_size: Maximum bytes of a file
+    :param spool_size: Files larger than this are written to the disk
+    :return: A generator of the (name, value) pairs
+    """
+    if not BOUNDARY_PATTERN.match(boundary):
+        raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+    chunks = iter(chunks)
+    buffer = bytearray()
+    delimiter = b'--' + boundary.encode('latin1')
+    separator = b'\r\n' + delimiter
+
+    def fill():
+        chunk = next(chunks, None)
+        if not chunk:
+            raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+        buffer.extend(chunk)
+
+    # Empty body
+    buffer.extend(next(chunks, b''))
+    if not buffer:
+        return
+
+    # Skipping the preamble
+    while True:
+        index = buffer.find(delimiter)
+        if index >= 0:
+            del buffer[:index + len(delimiter)]
+            break
+
+        del buffer[:-len(delimiter)]
+        fill()
+
+    while True:
+        while len(buffer) < 2:
+            fill()
+
+        if buffer.startswith(b'--'):
+            # Closing delimiter, the epilogue is ignored
+            return
+
+        # Headers
+        while True:
+            index = buffer.find(b'\r\n\r\n')
+            if index >= 0:
+                break
+
+            if len(buffer) > MAX_PART_HEADERS_SIZE:
+                raise exceptions.HTTPBadRequest('Cannot parse the request')
+
+            fill()
+
+        headers = {}
+        for line in buffer[:index].decode(encoding, 'replace').split('\r\n'):
+            name, _, value = line.partition(':')
+            if name.strip():
+                headers[name.strip().lower()] = value.strip()
+
+        del buffer[:index + 4]
+
+        disposition, parameters = parse_header(
+            headers.get('content-disposition', '')
+        )
+        name = parameters.get('name')
+        filename = parameters.get('filename')
+
+        if filename is None:
+            part = bytearray()
+            write = part.extend
+            limit = max_field_size
+        else:
+            part = FilePart(
+                name,
+                filename,
+                headers.get('content-type'),
+                headers,
+                spool_size
+            )
+            write = part.write
+            limit = max_file_size
+
+        # Body, keeping the tail which may be a part of the separator
+        size = 0
+        while True:
+            index = buffer.find(separator)
+            safe = index if index >= 0 else len(buffer) - len(separator) + 1
+            if safe > 0:
+                size += safe
+                if limit is not None and size > limit:
+                    raise exceptions.HTTPRequestEntityTooLarge()
+
+                write(buffer[:safe])
+                del buffer[:safe]
+
+            if index >= 0:
+                del buffer[:len(separator)]
+                break
+
+            fill()
+
+        if name is None:
+            continue
+
+        if filename is None:
+            yield name, part.decode(encoding, 'replace')
+        else:
+            part.file.seek(0)
+            yield name, part
+
+
+def parse_form(environ, content_length=None, content_type=None,
+               encoding='utf-8', chunk_size=0x10000, max_body_size=None,
+               max_field_size=None, max_file_size=None, spool_size=0x80000):
+    """Parse the query string, ``application/x-www-form-urlencoded`` and
+    ``multipart/form-data`` requests.
+
+    For the ``GET`` and ``HEAD`` requests, the query string will be parsed,
+    otherwise the fields of the query string are appended to the fields of
+    the body.
+
+    :return: A dictionary of the fields, duplicate fields will be a list.
+    """
+    query = environ.get('QUERY_STRING', '')
+    method = environ.get('REQUEST_METHOD', 'GET')
+    pairs = []
+
+    if method in ('GET', 'HEAD'):
+        pairs = parse_qsl(query, keep_blank_values=True)
+        query = None
+
+    else:
+        if content_type is None and method == 'POST':
+            content_type = 'application/x-www-form-urlencoded'
+
+        if content_type == 'application/x-www-form-urlencoded':
+            chunks = iter_body(
+                environ,
+                content_length,
+                chunk_size,
+                max_body_size
+            )
+            pairs = parse_urlencoded(chunks, encoding, max_field_size)
+
+        elif content_type == 'multipart/form-data':
+            content_type, parameters = parse_header(environ['CONTENT_TYPE'])
+            chunks = iter_body(
+                environ,
+                content_length,
+                chunk_size,
+                max_body_size
+            )
+            pairs = parse_multipart(
+                chunks,
+                parameters.get('boundary', ''),
+                encoding,
+                max_field_size,
+                max_file_size,
+                spool_size
+            )
+
+        else:
+            return {}
+
+    if query:
+        pairs = chain(pairs, parse_qsl(query, keep_blank_values=True))
+
+    result = {}
+    for name, value in pairs:
+        if name not in result:
+            result[name] = value
+
+        elif isinstance(result[name], list):
+            result[name].append(value)
+
+        else:
+            result[name] = [result[name], value]
+
+    return result
@@ -1,11 +1,12 @@
-import cgi
 import threading
+from email.utils import parsedate_to_datetime
 
 import pymlconf
 import ujson
 
 from . import exceptions
 from .configuration import settings, configure
+from .forms import parse_form, iter_body, is_chunked
 
 
 class LazyAttribute:
@@ -42,7 +43,17 @@ class LazyAttribute:
 
 
 def quickstart(controller=None, application=None, host='localhost', port=8080,
-               block=True, config=None):
+               block=True, config=None, workers=None, reuse_port=False,
+               threads=None, backlog=None, queue_size=None,
+               controller_factory=None):
+    """Serve the controller or the application
+
+    :param controller_factory: A callable which returns the root controller,
+                               instead of the ``controller``. With the
+                               ``workers``, it's called again on each reload,
+                               so it could load the code and the
+                               configuration again.
+    """
     from wsgiref.simple_server import make_server
 
     try:
@@ -53,17 +64,52 @@ def quickstart(controller=None, application=None, host='localhost', port=8080,
     if config:
         settings.merge(config)
 
-    if application is not None:
-        app = application
-    elif controller is None:
-        from wsgiref.simple_server import demo_app
-        app = demo_app
-    else:
+    def create_application():
+        if application is not None:
+            return application
+
+        root = controller
+        if controller_factory is not None:
+            root = controller_factory()
+
+        if root is None:
+            from wsgiref.simple_server import demo_app
+            return demo_app
+
         from nanohttp.application import Application
-        app = Application(root=controller)
+        return Application(root=root)
 
     port = int(port)
-    httpd = make_server(host, port, app)
+    if workers:
+        from nanohttp.server import PreforkServer
+        httpd = PreforkServer(
+            create_application,
+            host,
+            port,
+            workers=workers,
+            reuse_port=reuse_port,
+            threads=threads,
+            backlog=backlog,
+            queue_size=queue_size
+        )
+    elif threads:
+        from nanohttp.server import make_threadpool_server
+        httpd = make_threadpool_server(
+            host,
+            port,
+            create_application(),
+            threads=threads,
+            backlog=backlog,
+            queue_size=queue_size
+        )
+    else:
+        from nanohttp.server import RequestHandler
+        httpd = make_server(
+            host,
+            port,
+            create_application(),
+            handler_class=RequestHandler
+        )
 
     print("Serving http://%s:%d" % (host or 'localhost', port))
     if block:  # pragma: no cover
@@ -74,54 +120,122 @@ def quickstart(controller=None, application=None, host='localhost', port=8080,
 
         def shutdown():
             httpd.shutdown()
-            httpd.server_close()
+            if not workers:
+                httpd.server_close()
             t.join()
 
         return shutdown
 
 
-def get_cgi_field_value(field):
-    # noinspection PyProtectedMember
-    return field.value if isinstance(field, cgi.MiniFieldStorage) \
-        or (isinstance(field, cgi.FieldStorage) and not field._binary_file) \
-        else field
-
-
 def parse_any_form(environ, content_length=None, content_type=None):
     if content_type == 'application/json':
-        if content_length is None:
+        if content_length is None and not (
+            environ.get('wsgi.input_terminated') or is_chunked(environ)
+        ):
             raise exceptions.HTTPBadRequest('Content-Length required')
 
-        fp = environ['wsgi.input']
-        data = fp.read(content_length)
+        data = b''.join(iter_body(
+            environ,
+            content_length,
+            settings.form.chunk_size,
+            settings.json.max_body_size
+        ))
         try:
             return ujson.decode(data)
         except (ValueError, TypeError):
             raise exceptions.HTTPBadRequest('Cannot parse the request')
 
-    try:
-        storage = cgi.FieldStorage(
-            fp=environ['wsgi.input'],
-            environ=environ,
-            strict_parsing=False,
-            keep_blank_values=True
-        )
-    except (TypeError, ValueError):
-        raise exceptions.HTTPBadRequest('Cannot parse the request')
+    return parse_form(
+        environ,
+        content_length=content_length,
+        content_type=content_type,
+        chunk_size=settings.form.chunk_size,
+        max_body_size=settings.form.max_body_size,
+        max_field_size=settings.form.max_field_size,
+        max_file_size=settings.form.max_file_size,
+        spool_size=settings.form.spool_size
+    )
+
+
+def is_not_modified(environ, etag, last_modified):
+    """Evaluates the ``If-None-Match`` and ``If-Modified-Since`` request
+    headers.
+
+    :param environ: WSGI environ dictionary
+    :param etag: Current entity tag of the resource, including quotes
+    :param last_modified: Modification time of the resource, as timestamp
+    :return: ``True`` if the client's cached version is still valid
+    """
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+
+        # Weak comparison
+        etag = etag[2:] if etag.startswith('W/') else etag
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if (tag[2:] if tag.startswith('W/') else tag) == etag:
+                return True
+
+        # If-Modified-Since must be ignored, when If-None-Match is given
+        return False
+
+    if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return False
+
+        return last_modified <= since
+
+    return False
+
+
+def parse_range_header(header, size):
+    """Parses the ``Range`` request header
+
+    :param header: The header's value, for example: ``bytes=0-499``
+    :param size: Length of the resource
+    :return: List of inclusive ``(start, end)`` tuples for the satisfiable
+             ranges, or ``None`` if the header is invalid and must be
+             ignored.
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+
+    ranges = []
+    for spec in specs.split(','):
+        start, sep, end = spec.strip().partition('-')
+        if not sep:
+            return None
+
+        try:
+            if not start:
+                # Suffix, the last N bytes
+                length = int(end)
+                if length == 0:
+                    continue
+
+                start, end = max(size - length, 0), size - 1
+
+            else:
+                start = int(start)
+                end = int(end) if end else None
+                if end is not None and end < start:
+                    return None
 
-    result = {}
-    if storage.list is None or not len(storage.list):
-        return result
+                end = size - 1 if end is None else min(end, size - 1)
 
-    for k in storage:
-        v = storage[k]
+        except ValueError:
+            return None
 
-        if isinstance(v, list):
-            result[k] = [get_cgi_field_value(i) for i in v]
-        else:
-            result[k] = get_cgi_field_value(v)
+        if start < size:
+            ranges.append((start, end))
 
-    return result
+    return ranges
 
 
 def int_or_notfound(id):
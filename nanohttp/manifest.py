@@ -0,0 +1,157 @@
+from .constants import UNLIMITED
+
+
+class Manifest:
+    """The ``__nanohttp__`` attribute of the actions and controllers
+
+    Holds the options of the handler, and the flags which are precomputed
+    from them, so the dispatcher skips the features which are not used by
+    the handler.
+
+    For the backward compatibility, it could be used as a dictionary too:
+
+    .. code-block:: python
+
+       manifest = Manifest(verbs=['get'])
+       assert manifest['verbs'] == ['get']
+       assert manifest.get('content_type') is None
+
+    Unknown keys are kept in the ``extra`` dictionary, and the precomputed
+    flags are:
+
+    - ``verb_set``: Allowed verbs as a :class:`frozenset`, ``None`` means any
+      verb. The ``head`` is allowed wherever the ``get`` is.
+    - ``form_checks``: Indicates the form must be checked before calling the
+      handler.
+    """
+
+    __slots__ = (
+        'verbs',
+        'encoding',
+        'content_type',
+        'default_action',
+        'minimum_allowed_arguments',
+        'maximum_allowed_arguments',
+        'keywordonly_arguments',
+        'prevent_empty_form',
+        'prevent_form',
+        'form_whitelist',
+        'extra',
+
+        # Precomputed
+        'verb_set',
+        'form_checks',
+    )
+
+    #: Options and their default values
+    __defaults__ = dict(
+        verbs=['any'],
+        encoding=None,
+        content_type=None,
+        default_action='index',
+        minimum_allowed_arguments=0,
+        maximum_allowed_arguments=UNLIMITED,
+        keywordonly_arguments=[],
+        prevent_empty_form=None,
+        prevent_form=None,
+        form_whitelist=None,
+    )
+
+    def __init__(self, *args, **kwargs):
+        options = dict(self.__defaults__)
+        options.update(*args, **kwargs)
+        self.extra = {}
+        for key, value in options.items():
+            self._set(key, value)
+
+        self._precompute()
+
+    def _set(self, key, value):
+        if key in self.__defaults__:
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+    def _precompute(self):
+        verbs = self.verbs
+        if isinstance(verbs, str):
+            verbs = [verbs]
+
+        if 'any' in verbs:
+            self.verb_set = None
+        elif 'get' in verbs:
+            self.verb_set = frozenset(verbs) | {'head'}
+        else:
+            self.verb_set = frozenset(verbs)
+
+        self.form_checks = bool(
+            self.prevent_empty_form or
+            self.prevent_form or
+            self.form_whitelist
+        )
+
+    @property
+    def allow(self):
+        """Value of the ``Allow`` header, ``None`` for any verb
+        """
+        if self.verb_set is None:
+            return None
+
+        return ', '.join(sorted(v.upper() for v in self.verb_set))
+
+    def __getitem__(self, key):
+        if key in self.__defaults__:
+            return getattr(self, key)
+
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+        self._precompute()
+
+    def __contains__(self, key):
+        return key in self.__defaults__ or key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.__defaults__) + list(self.extra)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def copy(self):
+        return Manifest(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Manifest, dict)):
+            return dict(self.items()) == dict(other.items())
+
+        return NotImplemented
+
+    def __repr__(self):
+        return f'Manifest({dict(self.items())!r})'
+
+
+def get_manifest(handler):
+    """Get the :class:`.Manifest` of the handler
+
+    The dictionary manifests are converted once, and the result replaces the
+    dictionary of the handler, or of its function for the bound methods.
+    """
+    manifest = handler.__nanohttp__
+    if type(manifest) is not dict:
+        return manifest
+
+    manifest = Manifest(manifest)
+    try:
+        getattr(handler, '__func__', handler).__nanohttp__ = manifest
+    except AttributeError:  # pragma: no cover
+        # Read-only handlers are converted per call
+        pass
+
+    return manifest
@@ -0,0 +1,181 @@
+import time
+import threading
+
+from .constants import HTTP_METHODS
+from .contexts import context
+from .controllers import Controller
+from .decorators import action
+from .profiling import Histogram, DEFAULT_BUCKETS
+
+
+#: Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def format_labels(names, values, **extra):
+    labels = [
+        f'{name}="{escape_label(value)}"'
+        for name, value in zip(names, values)
+    ]
+    labels.extend(f'{k}="{escape_label(v)}"' for k, v in extra.items())
+    return '{%s}' % ','.join(labels) if labels else ''
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Collects the metrics of the requests, and renders them in the
+    `Prometheus text format
+    <https://prometheus.io/docs/instrumenting/exposition_formats/>`_.
+
+    The metrics are:
+
+    - ``<prefix>_requests_total``: Counter of the requests, by the route,
+      method and status code.
+    - ``<prefix>_request_duration_seconds``: Histogram of the time taken to
+      serve the whole response, by the route and method.
+    - ``<prefix>_requests_in_flight``: Number of the requests which are
+      being served.
+
+    The routes are the ``__qualname__`` of the handlers, as the
+    :class:`.Profiler` does, and ``unknown`` for the requests which are not
+    reached any handler. The methods other than the ``methods`` are labeled
+    as ``OTHER``, so the clients could not create unbounded series.
+
+    .. code-block:: python
+
+       metrics = MetricsRegistry()
+
+       class Root(Controller):
+           metrics = MetricsController(metrics)
+
+       app = Application(Root(), metrics=metrics)
+
+    :param prefix: Prefix of the metric names
+    :param buckets: Upper bounds of the duration histogram buckets, in
+                    seconds.
+    :param methods: The request methods which are labeled as is, default is
+                    the standard methods.
+    """
+
+    def __init__(self, prefix='nanohttp', buckets=DEFAULT_BUCKETS,
+                 methods=None):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.methods = frozenset(
+            m.upper() for m in (methods or HTTP_METHODS)
+        )
+        self.requests = {}
+        self.durations = {}
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Count a new request as in-flight
+        """
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, profile, method, status):
+        """Record the finished request
+
+        :param profile: The :class:`.RequestProfile` of the request
+        :param method: Request method
+        :param status: Response status, such as ``200 OK``
+        """
+        duration = time.perf_counter() - profile.start
+        route = profile.route or 'unknown'
+        method = method.upper()
+        if method not in self.methods:
+            method = 'OTHER'
+
+        key = (route, method)
+        with self._lock:
+            self.in_flight -= 1
+            counter_key = key + (status[:3], )
+            self.requests[counter_key] = self.requests.get(counter_key, 0) + 1
+
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = Histogram(self.buckets)
+
+            histogram.observe(duration)
+
+    def render(self):
+        """Render the metrics in the Prometheus text format
+        """
+        prefix = self.prefix
+        with self._lock:
+            requests = sorted(self.requests.items())
+            durations = [
+                (key, histogram.cumulative(), histogram.sum, histogram.count)
+                for key, histogram in sorted(self.durations.items())
+            ]
+            in_flight = self.in_flight
+
+        lines = [
+            f'# HELP {prefix}_requests_total Total number of the requests.',
+            f'# TYPE {prefix}_requests_total counter',
+        ]
+        for labels, count in requests:
+            lines.append(
+                f'{prefix}_requests_total'
+                f'{format_labels(("route", "method", "status"), labels)} '
+                f'{count}'
+            )
+
+        name = f'{prefix}_request_duration_seconds'
+        lines.extend((
+            f'# HELP {name} Time taken to serve the requests.',
+            f'# TYPE {name} histogram',
+        ))
+        names = ('route', 'method')
+        for labels, buckets, sum_, count in durations:
+            for bound, bucket_count in buckets:
+                le = format_value(bound)
+                lines.append(
+                    f'{name}_bucket{format_labels(names, labels, le=le)} '
+                    f'{bucket_count}'
+                )
+
+            labels = format_labels(names, labels)
+            lines.append(f'{name}_sum{labels} {format_value(sum_)}')
+            lines.append(f'{name}_count{labels} {count}')
+
+        lines.extend((
+            f'# HELP {prefix}_requests_in_flight Number of the requests '
+            f'which are being served.',
+            f'# TYPE {prefix}_requests_in_flight gauge',
+            f'{prefix}_requests_in_flight {in_flight}',
+        ))
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsController(Controller):
+    """Serves the metrics of a :class:`.MetricsRegistry` in the Prometheus
+    text format.
+
+    .. code-block:: python
+
+       class Root(Controller):
+           metrics = MetricsController(registry)
+
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    @action(verbs='get')
+    def index(self):
+        context.response_headers['Content-Type'] = CONTENT_TYPE
+        return self.registry.render()
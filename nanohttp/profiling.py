@@ -0,0 +1,226 @@
+import time
+import threading
+from bisect import bisect_left
+
+from .controllers import Controller
+from .decorators import json
+
+
+#: Default histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    .0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.,
+    2.5, 5., 10.
+)
+
+#: Phases of a request which are profiled
+PHASES = ('routing', 'validation', 'handler', 'first_byte', 'body')
+
+
+class Histogram:
+    """Histogram with fixed buckets
+
+    Each bucket counts the observations which are less than or equal to it's
+    upper bound, the last bucket is unbounded.
+
+    .. note:: The histogram is not thread-safe, the owner must serialize the
+              observations.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Cumulative counts of the buckets
+
+        :return: List of ``(upper bound, count)``, the last upper bound is
+                 ``float('inf')``.
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'), ), self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def quantile(self, q):
+        """Estimate the quantile, as the upper bound of the bucket which it
+        falls in.
+
+        :param q: Quantile, between ``0`` and ``1``
+        :return: The upper bound, or ``None`` if nothing is observed.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        for bound, count in self.cumulative():
+            if count >= rank:
+                return bound
+
+    def to_dict(self):
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            p50=self.quantile(.5),
+            p90=self.quantile(.9),
+            p99=self.quantile(.99),
+        )
+
+
+class RequestProfile:
+    """Timings of the current request, which are collected by the
+    :class:`.Application` and the controllers while serving the request.
+
+    Available as ``context.profile``, when profiling is enabled.
+    """
+
+    __slots__ = (
+        'start',
+        'route',
+        'routing',
+        'validation',
+        'handler_start',
+        'handler',
+        'first_byte',
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.route = None
+        self.routing = 0.
+        self.validation = 0.
+        self.handler_start = None
+        self.handler = None
+        self.first_byte = None
+
+    def enter(self, handler):
+        """Start the handler phase
+
+        Nested controllers call it again for their own handlers, so the
+        innermost handler is the profiled route.
+        """
+        self.route = getattr(handler, '__qualname__', None) or \
+            type(handler).__qualname__
+        self.handler_start = time.perf_counter()
+
+    def dispatched(self):
+        """End the handler phase
+        """
+        if self.handler_start is not None and self.handler is None:
+            self.handler = time.perf_counter() - self.handler_start
+
+    def responding(self):
+        """Mark the response's headers and first chunk are ready
+        """
+        self.first_byte = time.perf_counter() - self.start
+
+
+class Profiler:
+    """Records the timings of each phase of the requests, per route into
+    :class:`.Histogram` objects.
+
+    The phases are:
+
+    - ``routing``: Finding the handler
+    - ``validation``: Checking the verb, arguments and form of the handler
+    - ``handler``: Calling the handler, for generators until the generator
+      is created
+    - ``first_byte``: From the beginning of the request until the status and
+      the first chunk of the body are ready
+    - ``body``: From the beginning of the request until the whole body is
+      served
+
+    The routes are the ``__qualname__`` of the innermost handlers which are
+    reached, nested controllers are named by their class. Requests which are
+    failed before reaching any handler are not recorded.
+
+    .. code-block:: python
+
+       profiler = Profiler()
+       app = Application(Root(), profiler=profiler)
+
+    :param buckets: Upper bounds of the histogram buckets, in seconds
+    :param callback: A ``callable(route, timings: dict)``, to be called after
+                     each request.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, callback=None):
+        self.buckets = buckets
+        self.callback = callback
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def finish(self, profile):
+        """Record the timings of the finished request
+        """
+        if profile.route is None:
+            return
+
+        body = time.perf_counter() - profile.start
+        timings = dict(
+            routing=profile.routing,
+            validation=profile.validation,
+            handler=profile.handler or 0.,
+            first_byte=body if profile.first_byte is None
+            else profile.first_byte,
+            body=body,
+        )
+
+        with self._lock:
+            histograms = self.histograms.get(profile.route)
+            if histograms is None:
+                histograms = self.histograms[profile.route] = {
+                    phase: Histogram(self.buckets) for phase in PHASES
+                }
+
+            for phase, value in timings.items():
+                histograms[phase].observe(value)
+
+        if self.callback is not None:
+            self.callback(profile.route, timings)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def to_dict(self):
+        """
+        :return: Dictionary of route -> phase -> summary of the histogram
+        """
+        with self._lock:
+            return {
+                route: {
+                    phase: histogram.to_dict()
+                    for phase, histogram in histograms.items()
+                }
+                for route, histograms in self.histograms.items()
+            }
+
+
+class ProfilerController(Controller):
+    """Serves the summary of the :class:`.Profiler`'s histograms as JSON
+
+    .. code-block:: python
+
+       class Root(Controller):
+           profile = ProfilerController(profiler)
+
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    @json
+    def index(self):
+        return self.profiler.to_dict()
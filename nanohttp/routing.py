@@ -0,0 +1,226 @@
+import time
+
+from .contexts import context
+from .controllers import Controller, is_profilable
+from .manifest import get_manifest
+from .constants import UNLIMITED
+from .exceptions import HTTPNotFound, HTTPMethodNotAllowed
+
+
+#: Controller methods which must be untouched to let the controller compiled
+DISPATCH_METHODS = (
+    '__call__',
+    '_find_handler',
+    '_get_default_handler',
+    '_validate_handler',
+    '_serve_handler',
+)
+
+
+class Route:
+    """A handler and it's precomputed manifest
+
+    Both the actions and the controllers which cannot be compiled, are
+    represented by this class. so the dispatching will be fallen back to the
+    controller itself when it's reached.
+    """
+
+    __slots__ = (
+        'handler',
+        'manifest',
+        'verbs',
+        'minimum_arguments',
+        'maximum_arguments',
+        'keywordonly_arguments',
+        'encoding',
+        'content_type',
+        'form_checks',
+    )
+
+    #: Segment -> :class:`.Route` table, ``None`` for leaves
+    children = None
+
+    def __init__(self, handler):
+        manifest = get_manifest(handler)
+
+        self.handler = handler
+        self.manifest = manifest
+        self.verbs = manifest.verb_set
+        self.minimum_arguments = manifest.minimum_allowed_arguments
+        self.maximum_arguments = manifest.maximum_allowed_arguments
+        self.keywordonly_arguments = manifest.keywordonly_arguments
+        self.encoding = manifest.encoding
+        self.content_type = manifest.content_type
+        self.form_checks = manifest.form_checks
+
+    def validate(self, remaining_paths):
+        args_len = len(remaining_paths)
+        if self.minimum_arguments > args_len or (
+                self.maximum_arguments != UNLIMITED and
+                self.maximum_arguments < args_len
+        ):
+            raise HTTPNotFound()
+
+        if self.verbs is not None and context.method not in self.verbs:
+            raise HTTPMethodNotAllowed(allow=self.manifest.allow)
+
+        if self.form_checks:
+            Controller._validate_form(self.manifest)
+
+    def serve(self, remaining_paths):
+        context.response_encoding = self.encoding
+        context.response_content_type = self.content_type
+
+        kwargs = {}
+        if self.keywordonly_arguments:
+            query = context.query
+            for k, v in self.keywordonly_arguments:
+                value = query.get(k)
+                if value:
+                    kwargs[k] = value
+
+        return self.handler(*remaining_paths, **kwargs)
+
+
+class RouteNode(Route):
+    """A compiled :class:`.Controller`
+    """
+
+    __slots__ = ('children', 'default')
+
+    def __init__(self, controller):
+        super().__init__(controller)
+        self.children = {}
+        self.default = None
+
+
+class DispatchTree:
+    """Precompiled dispatch tree for the object dispatcher.
+
+    Walks the controllers graph once and builds a trie of the path segments,
+    so dispatching a request costs a dictionary lookup per segment instead of
+    the repeated ``hasattr`` and ``getattr`` calls of
+    :meth:`.Controller.__call__`.
+
+    Controllers which are customizing the dispatching, such as
+    :class:`.RestController` and :class:`.Static` are not compiled and the
+    dispatching will be delegated to them when reached.
+
+    .. note:: Attributes which are added to the controllers after compiling,
+              are not visible to the dispatch tree.
+    """
+
+    def __init__(self, root):
+        self._nodes = {}
+        self.root = self._compile(root)
+
+    @staticmethod
+    def is_compilable(controller):
+        type_ = type(controller)
+        if not isinstance(controller, Controller) or \
+                hasattr(type_, '__getattr__'):
+            return False
+
+        for name in DISPATCH_METHODS:
+            if getattr(type_, name) is not getattr(Controller, name):
+                return False
+
+        # Properties may return different values per request
+        for name in dir(type_):
+            if isinstance(getattr(type_, name, None), property):
+                return False
+
+        return True
+
+    @staticmethod
+    def is_handler(value):
+        return callable(value) and not isinstance(value, type) and \
+            hasattr(value, '__nanohttp__')
+
+    def _compile(self, controller):
+        if id(controller) in self._nodes:
+            return self._nodes[id(controller)]
+
+        if not self.is_compilable(controller):
+            return Route(controller)
+
+        node = self._nodes[id(controller)] = RouteNode(controller)
+        for name in dir(controller):
+            value = getattr(controller, name, None)
+            node.children[name] = self._compile_handler(value)
+
+        default_action = controller.__nanohttp__.get('default_action')
+        node.default = self._compile_handler(
+            getattr(controller, default_action, None)
+        )
+        return node
+
+    def _compile_handler(self, value):
+        if not self.is_handler(value):
+            return None
+
+        if isinstance(value, Controller):
+            return self._compile(value)
+
+        return Route(value)
+
+    def _call_profiled(self, profile, remaining_paths):
+        """Same as the :meth:`__call__`, but records the timings in the
+        ``profile``.
+        """
+        node = self.root
+        if node.children is None:
+            if is_profilable(node.handler):
+                return node.handler._call_profiled(profile, remaining_paths)
+
+            return node.handler(*remaining_paths)
+
+        while True:
+            start = time.perf_counter()
+            if remaining_paths and remaining_paths[0] in node.children:
+                route = node.children[remaining_paths[0]]
+                remaining_paths = remaining_paths[1:]
+            else:
+                route = node.default
+
+            if route is None:
+                raise HTTPNotFound()
+
+            found = time.perf_counter()
+            profile.routing += found - start
+            route.validate(remaining_paths)
+            profile.validation += time.perf_counter() - found
+            profile.enter(route.handler)
+            if route.children is None:
+                if is_profilable(route.handler):
+                    context.response_encoding = route.encoding
+                    context.response_content_type = route.content_type
+                    return route.handler._call_profiled(
+                        profile,
+                        remaining_paths
+                    )
+
+                return route.serve(remaining_paths)
+
+            node = route
+
+    def __call__(self, remaining_paths):
+        node = self.root
+        if node.children is None:
+            return node.handler(*remaining_paths)
+
+        while True:
+            if remaining_paths and remaining_paths[0] in node.children:
+                route = node.children[remaining_paths[0]]
+                remaining_paths = remaining_paths[1:]
+            else:
+                route = node.default
+
+            if route is None:
+                raise HTTPNotFound()
+
+            route.validate(remaining_paths)
+            if route.children is None:
+                return route.serve(remaining_paths)
+
+            node = route
@@ -0,0 +1,485 @@
+import os
+import time
+import queue
+import signal
+import socket
+import logging
+import functools
+import threading
+from wsgiref.simple_server import make_server, WSGIServer, \
+    WSGIRequestHandler, ServerHandler
+
+
+logger = logging.getLogger('nanohttp')
+
+
+class SendfileServerHandler(ServerHandler):
+    """Transmits the ``wsgi.file_wrapper`` responses using the
+    :meth:`socket.socket.sendfile`, so the file's content is not copied
+    into the user space where the platform supports it.
+    """
+
+    def sendfile(self):
+        filelike = self.result.filelike
+        if not hasattr(filelike, 'fileno'):
+            return False
+
+        if not self.headers_sent:
+            self.bytes_sent = 0
+            self.send_headers()
+
+        self._flush()
+        self.bytes_sent += self.request_handler.connection.sendfile(
+            filelike,
+            offset=filelike.tell()
+        )
+        return True
+
+
+class RequestHandler(WSGIRequestHandler):
+    """WSGI request handler which uses the :class:`.SendfileServerHandler`
+    """
+
+    #: Class of the handler which runs the application per request
+    server_handler_class = SendfileServerHandler
+
+    multithread = False
+
+    def handle(self):
+        """Handle a single HTTP request
+
+        The :meth:`wsgiref.simple_server.WSGIRequestHandler.handle` creates
+        its ``ServerHandler`` inline, so the request line is read as it does,
+        and only the handler is replaced.
+        """
+        self.raw_requestline = self.rfile.readline(65537)
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+
+        if not self.parse_request():  # An error code has been sent, just exit
+            return
+
+        handler = self.server_handler_class(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=self.multithread,
+        )
+        handler.request_handler = self      # backpointer for logging
+        handler.run(self.server.get_app())
+
+
+class ThreadPoolWSGIServer(WSGIServer):
+    """WSGI server which serves the connections from a bounded pool of
+    threads.
+
+    Accepted connections are queued for the threads, when the queue is full,
+    accepting new connections is blocked and they remain in the listen
+    backlog.
+
+    The time each connection was waiting in the queue is available as
+    ``environ['nanohttp.queue_wait']`` in seconds, and the server keeps
+    ``queue_wait_count``, ``queue_wait_total`` and ``queue_wait_max`` to size
+    the pool.
+    """
+
+    #: Listen backlog
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, threads=8,
+                 backlog=None, queue_size=None, bind_and_activate=True):
+        """
+        :param threads: Number of the threads
+        :param backlog: Listen backlog, default: 128
+        :param queue_size: Maximum connections waiting for a thread, the
+                           default is the number of threads.
+        """
+        self.threads = threads
+        if backlog is not None:
+            self.request_queue_size = backlog
+
+        self.queue = queue.Queue(queue_size or threads)
+        self.workers = None
+        self.local = threading.local()
+        self.queue_wait_lock = threading.Lock()
+        self.queue_wait_count = 0
+        self.queue_wait_total = 0.
+        self.queue_wait_max = 0.
+        super().__init__(server_address, handler_class, bind_and_activate)
+
+    def _start_workers(self):
+        # Threads are started lazily, so the server could be created before
+        # forking.
+        self.workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for i in range(self.threads)
+        ]
+        for t in self.workers:
+            t.start()
+
+    def _record_queue_wait(self, wait):
+        with self.queue_wait_lock:
+            self.queue_wait_count += 1
+            self.queue_wait_total += wait
+            if wait > self.queue_wait_max:
+                self.queue_wait_max = wait
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            request, client_address, enqueued = item
+            self.local.queue_wait = time.monotonic() - enqueued
+            self._record_queue_wait(self.local.queue_wait)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        if self.workers is None:
+            self._start_workers()
+
+        self.queue.put((request, client_address, time.monotonic()))
+
+    def server_close(self):
+        super().server_close()
+        if self.workers is None:
+            return
+
+        for t in self.workers:
+            self.queue.put(None)
+
+        for t in self.workers:
+            t.join()
+
+        self.workers = None
+
+
+class ThreadPoolRequestHandler(RequestHandler):
+    multithread = True
+
+    def get_environ(self):
+        environ = super().get_environ()
+        environ['nanohttp.queue_wait'] = self.server.local.queue_wait
+        return environ
+
+
+def make_threadpool_server(host, port, application, threads=8, backlog=None,
+                           queue_size=None, server_class=ThreadPoolWSGIServer):
+    """Create a :class:`.ThreadPoolWSGIServer`
+
+    Arguments are the same as :func:`wsgiref.simple_server.make_server`, and
+    the :class:`.ThreadPoolWSGIServer`.
+    """
+    return make_server(
+        host,
+        port,
+        application,
+        server_class=functools.partial(
+            server_class,
+            threads=threads,
+            backlog=backlog,
+            queue_size=queue_size
+        ),
+        handler_class=ThreadPoolRequestHandler
+    )
+
+
+class ReusePortMixin:
+    """Binds the server's socket using ``SO_REUSEPORT``, so many processes
+    can listen on the same address and the kernel balances the connections
+    between them.
+    """
+
+    def server_bind(self):
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+class ReusePortWSGIServer(ReusePortMixin, WSGIServer):
+    pass
+
+
+class ReusePortThreadPoolWSGIServer(ReusePortMixin, ThreadPoolWSGIServer):
+    pass
+
+
+class SharedSocketMixin:
+    """Makes the listening socket non-blocking, so it could be shared
+    between the processes. All of them are woken up by a new connection, the
+    ones which lose the race to accept it go back to wait, instead of
+    blocking in the ``accept()``.
+    """
+
+    def server_activate(self):
+        super().server_activate()
+        self.socket.setblocking(False)
+
+    def get_request(self):
+        # The BlockingIOError is an OSError, which is ignored by the
+        # socketserver.
+        request, client_address = super().get_request()
+        request.setblocking(True)
+        return request, client_address
+
+
+class SharedSocketWSGIServer(SharedSocketMixin, WSGIServer):
+    pass
+
+
+class SharedSocketThreadPoolWSGIServer(SharedSocketMixin,
+                                       ThreadPoolWSGIServer):
+    pass
+
+
+class PreforkServer:
+    """Pre-fork WSGI server
+
+    Binds the socket once and serves the application by the given number of
+    forked worker processes, dead workers will be restarted.
+
+    Signals:
+
+    - ``SIGHUP``: Graceful reload, the application will be created again using
+      the factory and a new set of workers will replace the old ones, after
+      they have finished their current request. The factory is responsible
+      to load the code and the configuration again, if required, the workers
+      are forked from the master process. The current workers are kept if
+      the factory fails.
+    - ``SIGTERM`` and ``SIGINT``: Graceful shutdown.
+
+    .. code-block:: python
+
+       server = PreforkServer(lambda: Application(Root()), port=8080)
+       server.serve_forever()
+
+    """
+
+    #: Seconds to wait for the workers to exit gracefully, before killing them
+    __shutdown_timeout__ = 10
+
+    #: Seconds to wait for a new request, before checking the worker state
+    __poll_interval__ = .5
+
+    def __init__(self, factory, host='', port=8080, workers=2,
+                 reuse_port=False, threads=None, backlog=None,
+                 queue_size=None):
+        """
+        :param factory: A callable which returns the WSGI application, it
+                        will be called on start and on each reload.
+        :param host: Address to bind
+        :param port: Port to bind
+        :param workers: Number of the worker processes
+        :param reuse_port: If ``True``, each worker binds it's own socket
+                           using ``SO_REUSEPORT`` instead of sharing the
+                           socket which bound by the master process.
+        :param threads: If given, each worker serves the connections from a
+                        pool of threads, see :class:`.ThreadPoolWSGIServer`.
+        :param backlog: Listen backlog, only with ``threads``.
+        :param queue_size: Thread pool's queue size, only with ``threads``.
+        """
+        self.factory = factory
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.threads = threads
+        self.backlog = backlog
+        self.queue_size = queue_size
+        self.application = None
+        self.httpd = None
+        self.children = set()
+        self.retiring = set()
+        self.running = False
+        self.reload_requested = False
+
+    def _create_server(self):
+        if self.threads:
+            return make_threadpool_server(
+                self.host,
+                self.port,
+                None,
+                threads=self.threads,
+                backlog=self.backlog,
+                queue_size=self.queue_size,
+                server_class=ReusePortThreadPoolWSGIServer \
+                    if self.reuse_port else SharedSocketThreadPoolWSGIServer
+            )
+
+        return make_server(
+            self.host,
+            self.port,
+            None,
+            server_class=ReusePortWSGIServer if self.reuse_port \
+                else SharedSocketWSGIServer,
+            handler_class=RequestHandler
+        )
+
+    def _serve_worker(self):
+        running = True
+
+        def stop(signum, frame):
+            nonlocal running
+            running = False
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, stop)
+
+        httpd = self.httpd or self._create_server()
+        httpd.set_app(self.application)
+        httpd.timeout = self.__poll_interval__
+
+        # The current request will be finished before exiting
+        while running:
+            httpd.handle_request()
+
+        httpd.server_close()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            status = 0
+            try:
+                self._serve_worker()
+            except BaseException:
+                logger.exception('Worker %d failed', os.getpid())
+                status = 1
+            finally:
+                os._exit(status)
+
+        self.children.add(pid)
+        return pid
+
+    def _reap(self):
+        """Collect the exited workers and restart them, if required.
+
+        :return: ``True`` if any worker is exited
+        """
+        reaped = False
+        for pid in list(self.children | self.retiring):
+            try:
+                exited, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                exited, status = pid, 0
+
+            if not exited:
+                continue
+
+            reaped = True
+            if pid in self.retiring:
+                self.retiring.remove(pid)
+                continue
+
+            self.children.remove(pid)
+            if self.running:
+                logger.warning(
+                    'Worker %d exited with status %d, restarting.',
+                    pid,
+                    status
+                )
+                self._spawn()
+
+        return reaped
+
+    def _kill(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:  # pragma: no cover
+                pass
+
+    def _reload(self):
+        self.reload_requested = False
+        logger.info('Reloading workers')
+        try:
+            self.application = self.factory()
+        except Exception:
+            logger.exception('Cannot reload, keeping the current workers')
+            return
+
+        old_workers = self.children
+        self.children = set()
+        for i in range(self.workers):
+            self._spawn()
+
+        self.retiring |= old_workers
+        self._kill(old_workers, signal.SIGTERM)
+
+    def _stop_workers(self):
+        self.retiring |= self.children
+        self.children = set()
+        self._kill(self.retiring, signal.SIGTERM)
+        deadline = time.monotonic() + self.__shutdown_timeout__
+        while self.retiring and time.monotonic() < deadline:
+            if not self._reap():
+                time.sleep(.05)
+
+        # Killing the stubborn workers
+        self._kill(self.retiring, signal.SIGKILL)
+        for pid in self.retiring:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:  # pragma: no cover
+                pass
+
+        self.retiring = set()
+
+    def reload(self):
+        """Request a graceful reload of the workers
+        """
+        self.reload_requested = True
+
+    def shutdown(self):
+        """Request a graceful shutdown
+        """
+        self.running = False
+
+    def _install_signals(self):
+        handlers = {
+            signal.SIGHUP: lambda s, f: self.reload(),
+            signal.SIGTERM: lambda s, f: self.shutdown(),
+            signal.SIGINT: lambda s, f: self.shutdown(),
+        }
+        return {s: signal.signal(s, h) for s, h in handlers.items()}
+
+    def serve_forever(self):
+        """Bind the socket, start the workers and supervise them until the
+        shutdown.
+        """
+        # Signals are only available in the main thread
+        previous_signals = None
+        if threading.current_thread() is threading.main_thread():
+            previous_signals = self._install_signals()
+
+        if not self.reuse_port:
+            self.httpd = self._create_server()
+
+        self.application = self.factory()
+        self.running = True
+        try:
+            for i in range(self.workers):
+                self._spawn()
+
+            while self.running:
+                if self.reload_requested:
+                    self._reload()
+
+                if not self._reap():
+                    time.sleep(.1)
+
+        finally:
+            self._stop_workers()
+            if self.httpd is not None:
+                self.httpd.server_close()
+
+            if previous_signals:
+                for s, h in previous_signals.items():
+                    signal.signal(s, h)
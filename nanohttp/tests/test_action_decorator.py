@@ -3,6 +3,7 @@ from bddrest import status, response, given
 
 from nanohttp import Controller, action, html, json, text, xml, binary, \
     RestController
+from nanohttp.manifest import Manifest
 from nanohttp.tests.helpers import Given, when
 
 
@@ -192,6 +193,63 @@ def test_json_decorator():
         assert response.json == 123
 
 
+def test_json_decorator_encoding():
+    class Root(Controller):
+        @json
+        def index(self):
+            return dict(a=1, b=[1.5, True])
+
+        @json
+        def stream(self, count):
+            for i in range(int(count)):
+                yield dict(id=i)
+
+        @json
+        def encoded(self):
+            return b'{"a": 1}'
+
+        @json(encoder=lambda o: f'<{o}>'.encode())
+        def custom(self):
+            return (1, 2)
+
+        @json(chunk_size=1)
+        def chunks(self):
+            yield 1
+            yield 2
+
+    with Given(Root(), configuration='debug: false'):
+        assert status == 200
+        assert response.text == '{"a":1,"b":[1.5,true]}'
+
+        when('/stream/3')
+        assert status == 200
+        assert response.text == '[{"id":0},{"id":1},{"id":2}]'
+
+        when('/stream/0')
+        assert status == 200
+        assert response.json == []
+
+        when('/stream/2000')
+        assert status == 200
+        assert response.json == [dict(id=i) for i in range(2000)]
+
+        when('/encoded')
+        assert status == 200
+        assert response.text == '{"a": 1}'
+
+        when('/custom')
+        assert status == 200
+        assert response.text == '<(1, 2)>'
+
+        when('/chunks')
+        assert status == 200
+        assert response.json == [1, 2]
+
+    with Given(Root()):
+        assert status == 200
+        assert response.text.startswith('{\n    "a": 1')
+
+
 def test_text_decorator():
     class Root(Controller):
         @text
@@ -230,3 +288,74 @@ def test_binary_decorator():
         assert response.content_type == 'application/octet'
         assert response.encoding is None
 
+
+
+def test_action_manifest():
+    class Root(Controller):
+        @action(verbs=['get', 'post'], form_whitelist=['a'])
+        def index(self, a, *, b=None):
+            return a
+
+        @action
+        def plain(self):
+            return 'plain'
+
+    manifest = Root.index.__nanohttp__
+    assert isinstance(manifest, Manifest)
+    assert manifest.verb_set == {'get', 'head', 'post'}
+    assert manifest['verbs'] == ['get', 'post']
+    assert manifest.form_checks
+    assert manifest.get('minimum_allowed_arguments') == 1
+    assert manifest.get('nonexistent', 'default') == 'default'
+    assert 'encoding' in manifest
+
+    manifest = Root.plain.__nanohttp__
+    assert manifest.verb_set is None
+    assert not manifest.form_checks
+
+    manifest['verbs'] = 'put'
+    manifest['custom'] = 1
+    assert manifest.verb_set == {'put'}
+    assert manifest['custom'] == 1
+    assert manifest.copy() == dict(manifest.items())
+
+    # Dictionary manifests of the controllers are converted
+    class Child(Controller):
+        __nanohttp__ = dict(verbs=['get'], default_action='default')
+
+        @action
+        def default(self):
+            return 'default'
+
+    assert isinstance(Child.__nanohttp__, Manifest)
+    assert Child.__nanohttp__.verb_set == {'get', 'head'}
+
+    # Dictionary manifests of the handlers are still supported
+    def legacy(*args):
+        return 'legacy'
+
+    legacy.__nanohttp__ = dict(
+        verbs=['get'],
+        encoding='utf-8',
+        content_type='text/plain'
+    )
+    Root.child = Child()
+    Root.legacy = staticmethod(legacy)
+
+    with Given(Root(), '/child'):
+        assert status == 200
+        assert response.text == 'default'
+
+        when(verb='POST')
+        assert status == 405
+
+        when('/legacy')
+        assert status == 200
+        assert response.text == 'legacy'
+
+        when('/legacy', verb='POST')
+        assert status == 405
+
+    # Converted once
+    assert isinstance(legacy.__nanohttp__, Manifest)
+    assert legacy.__nanohttp__.content_type == 'text/plain'
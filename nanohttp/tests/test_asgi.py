@@ -0,0 +1,291 @@
+import gzip
+import asyncio
+
+from nanohttp import AsyncApplication, Controller, action, json, context, \
+    configure, HTTPBadRequest, MetricsRegistry
+
+
+def request(app, path='/', verb='GET', query=b'', body=b'', headers=None):
+    scope = dict(
+        type='http',
+        http_version='1.1',
+        method=verb,
+        path=path,
+        query_string=query,
+        headers=headers or [],
+        server=('localhost', 8080),
+        client=('127.0.0.1', 1234),
+    )
+
+    async def receive():
+        return dict(type='http.request', body=body, more_body=False)
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    return scope, receive, send, messages
+
+
+def call(app, *args, **kwargs):
+    scope, receive, send, messages = request(app, *args, **kwargs)
+    asyncio.get_event_loop().run_until_complete(app(scope, receive, send))
+    start, *body = messages
+    return start['status'], dict(start['headers']), \
+        b''.join(m['body'] for m in body)
+
+
+def test_async_application():
+    class Root(Controller):
+        @action
+        async def index(self):
+            await asyncio.sleep(0)
+            return f'Index: {context.method}'
+
+        @action
+        async def stream(self):
+            yield 'a'
+            await asyncio.sleep(0)
+            yield 'b'
+
+        @action
+        async def counted(self):
+            context.response_headers['X-Count'] = '2'
+            yield 'a'
+            yield 'b'
+
+        @action
+        def sync(self, a):
+            yield f'Sync: {a}'
+
+        @json(verbs='post')
+        async def echo(self):
+            return context.form
+
+        @action
+        async def bad(self):
+            raise HTTPBadRequest()
+
+        @action(compress=True)
+        async def large(self):
+            return 'a' * 1000
+
+    configure(force=True)
+    app = AsyncApplication(Root())
+
+    status, headers, body = call(app)
+    assert status == 200
+    assert body == b'Index: get'
+
+    status, headers, body = call(app, '/stream')
+    assert status == 200
+    assert body == b'ab'
+
+    status, headers, body = call(app, '/sync/1')
+    assert status == 200
+    assert body == b'Sync: 1'
+
+    status, headers, body = call(
+        app,
+        '/echo',
+        verb='POST',
+        body=b'{"a": 1}',
+        headers=[
+            (b'content-type', b'application/json'),
+            (b'content-length', b'8'),
+        ]
+    )
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json; charset=utf-8'
+    assert body.replace(b' ', b'').replace(b'\n', b'') == b'{"a":1}'
+
+    status, headers, body = call(app, '/echo')
+    assert status == 405
+
+    status, headers, body = call(app, '/bad')
+    assert status == 400
+
+    status, headers, body = call(app, '/notexists/1/2')
+    assert status == 404
+
+    status, headers, body = call(
+        app,
+        '/large',
+        headers=[(b'accept-encoding', b'gzip')]
+    )
+    assert status == 200
+    assert headers[b'content-encoding'] == b'gzip'
+    assert gzip.decompress(body) == b'a' * 1000
+
+    status, headers, body = call(
+        app,
+        '/large',
+        verb='HEAD',
+        headers=[(b'accept-encoding', b'gzip')]
+    )
+    assert status == 200
+    assert headers[b'content-encoding'] == b'gzip'
+    assert int(headers[b'content-length']) == len(gzip.compress(b'a' * 1000))
+    assert body == b''
+
+    status, headers, body = call(app, '/stream', verb='HEAD')
+    assert status == 200
+    assert body == b''
+
+    status, headers, body = call(app, '/counted', verb='HEAD')
+    assert status == 200
+    assert headers[b'x-count'] == b'2'
+    assert body == b''
+
+    status, headers, body = call(app, '/bad', verb='HEAD')
+    assert status == 400
+    assert body == b''
+
+
+def test_async_application_max_body_size():
+    class Root(Controller):
+        @json(verbs='post')
+        def index(self):
+            return context.form
+
+    hooks = []
+
+    class Application(AsyncApplication):
+        def begin_request(self):
+            hooks.append('begin_request')
+
+        def end_response(self):
+            hooks.append('end_response')
+
+    configure(
+        'json: {max_body_size: 10}\nform: {max_body_size: 20}',
+        force=True
+    )
+    app = Application(Root())
+    json_headers = [(b'content-type', b'application/json')]
+
+    status, headers, body = call(
+        app,
+        verb='POST',
+        body=b'{"a": 1}',
+        headers=json_headers + [(b'content-length', b'8')]
+    )
+    assert status == 200
+
+    # Rejected before receiving the body, by the Content-Length
+    status, headers, body = call(
+        app,
+        verb='POST',
+        body=b'',
+        headers=json_headers + [(b'content-length', b'11')]
+    )
+    assert status == 413
+    assert hooks == ['begin_request', 'end_response'] * 2
+
+    status, headers, body = call(
+        app,
+        verb='POST',
+        headers=[(b'content-length', b'21')]
+    )
+    assert status == 413
+
+    status, headers, body = call(
+        app,
+        verb='POST',
+        headers=[(b'content-length', b'x')]
+    )
+    assert status == 400
+    assert hooks == ['begin_request', 'end_response'] * 4
+
+    # Without the Content-Length, the received bytes are counted
+    scope, _, send, messages = request(app, verb='POST', headers=json_headers)
+    received = []
+
+    async def receive():
+        received.append(1)
+        return dict(type='http.request', body=b'[1, 2, 3]', more_body=True)
+
+    asyncio.get_event_loop().run_until_complete(app(scope, receive, send))
+    assert messages[0]['status'] == 413
+    assert len(received) == 2
+
+    # The client is disconnected while sending the body
+    del hooks[:]
+    scope, _, send, messages = request(app, verb='POST')
+
+    async def receive():
+        return dict(type='http.disconnect')
+
+    asyncio.get_event_loop().run_until_complete(app(scope, receive, send))
+    assert messages == []
+    assert hooks == ['begin_request', 'end_response']
+
+
+def test_async_application_concurrency():
+    class Root(Controller):
+        @action
+        async def index(self, delay):
+            await asyncio.sleep(float(delay))
+            return context.query['name']
+
+    configure(force=True)
+    app = AsyncApplication(Root())
+    requests = [
+        request(app, '/0.02', query=b'name=first'),
+        request(app, '/0', query=b'name=second'),
+    ]
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(asyncio.gather(
+        *(app(scope, receive, send) for scope, receive, send, _ in requests)
+    ))
+
+    assert requests[0][3][1]['body'] == b'first'
+    assert requests[1][3][1]['body'] == b'second'
+
+
+def test_async_application_lifespan():
+    messages = [
+        dict(type='lifespan.startup'),
+        dict(type='lifespan.shutdown'),
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    app = AsyncApplication(Controller())
+    asyncio.get_event_loop().run_until_complete(
+        app(dict(type='lifespan'), receive, send)
+    )
+    assert sent == [
+        'lifespan.startup.complete',
+        'lifespan.shutdown.complete'
+    ]
+
+
+def test_async_application_metrics():
+    registry = MetricsRegistry()
+
+    class Root(Controller):
+        @action
+        async def index(self):
+            await asyncio.sleep(0)
+            return 'index'
+
+        @action
+        async def bad(self):
+            raise HTTPBadRequest()
+
+    app = AsyncApplication(Root(), metrics=registry)
+    assert call(app)[0] == 200
+    assert call(app, '/bad')[0] == 400
+
+    text = registry.render()
+    assert 'Root.index",method="GET",status="200"} 1' in text
+    assert 'Root.bad",method="GET",status="400"} 1' in text
+    assert registry.in_flight == 0
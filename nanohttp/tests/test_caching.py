@@ -0,0 +1,233 @@
+import gzip
+
+import pytest
+from bddrest import status, response
+
+from nanohttp import Controller, json, text, context, MemoryCache, \
+    FileCache, HTTPBadRequest
+from nanohttp.caching import CachedResponse
+from nanohttp.tests.helpers import Given, when
+
+
+def test_memory_cache():
+    cache = MemoryCache(max_size=10, max_item_size=6)
+    cache.set('/a', 1, CachedResponse('200 OK', [], b'12345', 60))
+    cache.set('/a', 2, CachedResponse('200 OK', [], b'12345', 60))
+    assert cache.size == 10
+
+    # Too large
+    cache.set('/b', 1, CachedResponse('200 OK', [], b'1234567', 60))
+    assert cache.get('/b', 1) is None
+
+    # Least recently used is evicted
+    assert cache.get('/a', 1).body == b'12345'
+    cache.set('/c', 1, CachedResponse('200 OK', [], b'123', 60))
+    assert cache.get('/a', 2) is None
+    assert cache.get('/a', 1) is not None
+    assert cache.size == 8
+
+    # Expired
+    cache.set('/d', 1, CachedResponse('200 OK', [], b'', -1))
+    assert cache.get('/d', 1) is None
+
+    cache.invalidate('/a/')
+    assert cache.get('/a', 1) is None
+    assert cache.get('/c', 1) is not None
+
+    cache.invalidate()
+    assert cache.get('/c', 1) is None
+    assert cache.size == 0
+
+
+def test_file_cache(tmpdir):
+    cache = FileCache(str(tmpdir.join('cache')))
+    cache.set('/a', ('x', ), CachedResponse('200 OK', [('A', 'B')], b'1', 60))
+    cache.set('/a', ('y', ), CachedResponse('200 OK', [], b'2', 60))
+    cache.set('/b', ('x', ), CachedResponse('200 OK', [], b'3', -1))
+
+    response = FileCache(cache.directory).get('/a', ('x', ))
+    assert response.body == b'1'
+    assert response.headers == [('A', 'B')]
+    assert response.etag.startswith('"')
+
+    assert cache.get('/b', ('x', )) is None
+    assert cache.get('/c', ('x', )) is None
+
+    cache.invalidate('/a')
+    assert cache.get('/a', ('x', )) is None
+
+    cache.set('/a', ('x', ), CachedResponse('200 OK', [], b'1', 60))
+    cache.invalidate()
+    assert cache.get('/a', ('x', )) is None
+
+    # The files are not unpickled, the invalid ones are ignored
+    cache.set('/a', ('x', ), CachedResponse('200 OK', [], b'1\n2', 60))
+    filename = cache._filename('/a', ('x', ))
+    with open(filename, 'rb') as f:
+        assert f.read().endswith(b'}\n1\n2')
+
+    assert cache.get('/a', ('x', )).body == b'1\n2'
+    for invalid in (b'', b'\x80\x04\x95', b'{}\n', b'[1]\nbody'):
+        with open(filename, 'wb') as f:
+            f.write(invalid)
+
+        assert cache.get('/a', ('x', )) is None
+
+
+@pytest.mark.parametrize('backend', ['memory', 'file'])
+def test_cached_action(backend, tmpdir):
+    calls = []
+    backend = MemoryCache() if backend == 'memory' \
+        else FileCache(str(tmpdir))
+
+    class Root(Controller):
+        @json(cache=dict(ttl=60, query=['page'], backend=backend))
+        def index(self):
+            calls.append('index')
+            context.cookies['a'] = 'b'
+            context.response_headers['X-Foo'] = 'bar'
+            return dict(page=context.query.get('page'))
+
+        @text(cache=dict(headers=['Accept'], backend=backend))
+        def items(self, id):
+            calls.append(id)
+            yield f'item {id}'
+            yield context.environ.get('HTTP_ACCEPT', '')
+
+        @text(cache=60, compress=True)
+        def large(self):
+            calls.append('large')
+            return 'a' * 1000
+
+        @text(cache=dict(backend=backend), verbs=['get', 'post'])
+        def bad(self):
+            calls.append('bad')
+            if context.method == 'get':
+                raise HTTPBadRequest()
+
+            return 'posted'
+
+        @json(verbs='post')
+        def create(self):
+            backend.invalidate('/')
+            return dict()
+
+    with Given(Root(), query=dict(page='1')):
+        assert status == 200
+        assert response.json == dict(page='1')
+        assert 'Set-Cookie' in response.headers
+        etag = response.headers['ETag']
+        assert calls == ['index']
+
+        when(query=dict(page='1', other='x'))
+        assert status == 200
+        assert response.json == dict(page='1')
+        assert response.headers['ETag'] == etag
+        assert response.headers['X-Foo'] == 'bar'
+        assert response.headers['Content-Type'] == \
+            'application/json; charset=utf-8'
+        assert 'Age' in response.headers
+        assert 'Set-Cookie' not in response.headers
+        assert calls == ['index']
+
+        when(query=dict(page='2'))
+        assert response.json == dict(page='2')
+        assert response.headers['ETag'] != etag
+        assert calls == ['index', 'index']
+
+        # Repeated query string fields
+        when(query=[('page', '1'), ('page', '2')])
+        assert status == 200
+        assert response.json == dict(page=['1', '2'])
+        when(query=[('page', '1'), ('page', '2')])
+        assert response.json == dict(page=['1', '2'])
+        assert calls == ['index', 'index', 'index']
+
+        when(headers={'If-None-Match': etag})
+        assert status == 304
+        assert response.headers['ETag'] == etag
+        assert calls == ['index', 'index', 'index']
+
+        when('/create', verb='POST')
+        assert status == 200
+
+        when()
+        assert status == 200
+        assert calls == ['index', 'index', 'index', 'index']
+
+        calls.clear()
+        when('/items/1', query={}, headers={'Accept': 'text/plain'})
+        assert response.text == 'item 1text/plain'
+
+        when('/items/1', query={}, headers={'Accept': 'text/plain'})
+        assert response.text == 'item 1text/plain'
+
+        when('/items/2', query={}, headers={'Accept': 'text/plain'})
+        when('/items/1', query={}, headers={'Accept': 'text/html'})
+        assert response.text == 'item 1text/html'
+        assert calls == ['1', '2', '1']
+
+        # Errors and other verbs are not cached
+        calls.clear()
+        when('/bad', query={})
+        assert status == 400
+
+        when('/bad', query={})
+        assert status == 400
+
+        when('/bad', query={}, verb='POST')
+        when('/bad', query={}, verb='POST')
+        assert response.text == 'posted'
+        assert calls == ['bad', 'bad', 'bad', 'bad']
+
+        # Compressed responses vary by the accepted encodings
+        calls.clear()
+        when('/large', query={}, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.body) == b'a' * 1000
+
+        when('/large', query={}, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.body) == b'a' * 1000
+
+        when('/large', query={})
+        assert 'Content-Encoding' not in response.headers
+        assert response.text == 'a' * 1000
+        assert calls == ['large', 'large']
+
+
+def test_cached_action_credentials():
+    calls = []
+
+    class Root(Controller):
+        @text(cache=60)
+        def index(self):
+            calls.append(1)
+            return 'index'
+
+        @text(cache=dict(headers=['Authorization']))
+        def user(self):
+            calls.append(context.environ['HTTP_AUTHORIZATION'])
+            return context.environ['HTTP_AUTHORIZATION']
+
+    with Given(Root(), headers={'Authorization': 'a'}):
+        assert response.text == 'index'
+
+        when()
+        assert 'ETag' not in response.headers
+        assert calls == [1, 1]
+
+        when(headers={'Cookie': 'a=b'})
+        assert calls == [1, 1, 1]
+
+        when(headers={})
+        when(headers={})
+        assert calls == [1, 1, 1, 1]
+
+        # Credentials which are a part of the key
+        when('/user')
+        when('/user')
+        assert response.text == 'a'
+        when('/user', headers={'Authorization': 'b'})
+        assert response.text == 'b'
+        assert calls[4:] == ['a', 'b']
@@ -37,5 +37,5 @@ def test_chunked_streaming():
         when('/error')
         assert status == 200
         assert response.text == \
-            '5\r\nfirst\r\n18\r\nerror in streaming0\r\n\r\n'
+            '5\r\nfirst\r\n12\r\nerror in streaming0\r\n\r\n'
 
@@ -0,0 +1,104 @@
+import gzip
+import zlib
+
+from bddrest import status, response
+
+from nanohttp import Controller, action, json, chunked, compressed
+from nanohttp.compression import parse_accept_encoding, acceptable_encodings
+from nanohttp.tests.helpers import Given, when
+
+
+def test_compression():
+    class Root(Controller):
+        @json(compress=True)
+        def index(self):
+            return [dict(id=i, title=f'Item {i}') for i in range(100)]
+
+        @action(compress=True)
+        def small(self):
+            return 'Small'
+
+        @action
+        @compressed(minimum_size=0, encodings=['deflate', 'gzip'])
+        def stream(self):
+            yield 'first'
+            yield b'second'
+
+        @action
+        @chunked
+        @compressed(flush=True)
+        def chunks(self):
+            yield 'first'
+            yield 'second'
+
+        @action(compress=True)
+        @chunked('trailer1', 'end')
+        def compressed_chunks(self):
+            yield 'first'
+            yield 'second'
+
+    with Given(Root(), headers={'Accept-Encoding': 'gzip, deflate'}):
+        assert status == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.content_type == 'application/json'
+        payload = gzip.decompress(response.body).decode()
+        assert payload.startswith('[')
+        assert 'Item 99' in payload
+
+        when(headers={'Accept-Encoding': 'gzip;q=0, identity'})
+        assert status == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.text.startswith('[')
+
+        when(headers={})
+        assert 'Content-Encoding' not in response.headers
+
+        when('/small')
+        assert status == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.text == 'Small'
+
+        when('/stream')
+        assert status == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.body) == b'firstsecond'
+
+        for path, trailer in (('/chunks', b''), ('/compressed_chunks',
+                                                 b'trailer1: end\r\n')):
+            when(path)
+            assert status == 200
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert response.headers['Transfer-Encoding'] == 'chunked'
+
+            # Decoding the chunks one by one
+            body = response.body
+            decompressor = zlib.decompressobj(31)
+            chunks = []
+            while True:
+                size, body = body.split(b'\r\n', 1)
+                size = int(size, 16)
+                if not size:
+                    break
+
+                chunks.append(decompressor.decompress(body[:size]))
+                body = body[size + 2:]
+
+            assert chunks[:2] == [b'first', b'second']
+            assert body == trailer + b'\r\n'
+
+
+def test_accept_encoding():
+    assert parse_accept_encoding('gzip, br;q=0.5, *;q=0, x;q=a') == \
+        {'gzip': 1., 'br': .5, '*': 0., 'x': 0.}
+    assert parse_accept_encoding('') == {}
+
+    available = ['br', 'gzip']
+    assert acceptable_encodings(None, available) == []
+    assert acceptable_encodings('gzip, br', available) == ['br', 'gzip']
+    assert acceptable_encodings('gzip, br;q=0.5', available) == \
+        ['gzip', 'br']
+    assert acceptable_encodings('*', available) == ['br', 'gzip']
+    assert acceptable_encodings('*, br;q=0', available) == ['gzip']
+    assert acceptable_encodings('identity', available) == []
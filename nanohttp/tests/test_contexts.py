@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from nanohttp import context, ContextIsNotInitializedError
+from nanohttp.contexts import Context
+
+
+def test_nested_contexts():
+    with pytest.raises(ContextIsNotInitializedError):
+        context.query
+
+    with pytest.raises(ContextIsNotInitializedError):
+        context.foo = 'bar'
+
+    with Context({'QUERY_STRING': 'weather=Sunny'}) as outer:
+        assert Context.get_current() is outer
+        assert context.query['weather'] == 'Sunny'
+
+        with Context({'QUERY_STRING': 'weather=Rainy'}):
+            assert context.query['weather'] == 'Rainy'
+            context.foo = 'bar'
+            assert context.foo == 'bar'
+            del context.foo
+            assert not hasattr(context, 'foo')
+
+        assert context.query['weather'] == 'Sunny'
+
+        # Lookup errors of the attributes are not hidden
+        with pytest.raises(KeyError):
+            context.method
+
+    with pytest.raises(ContextIsNotInitializedError):
+        Context.get_current()
+
+
+def test_context_threads_isolation():
+    results = {}
+    entered = threading.Barrier(2)
+
+    def worker(weather):
+        with Context({'QUERY_STRING': f'weather={weather}'}):
+            entered.wait()
+            results[weather] = context.query['weather']
+
+    threads = [
+        threading.Thread(target=worker, args=(w, ))
+        for w in ('Sunny', 'Rainy')
+    ]
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    assert results == dict(Sunny='Sunny', Rainy='Rainy')
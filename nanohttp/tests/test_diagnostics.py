@@ -0,0 +1,170 @@
+import marshal
+import threading
+from wsgiref.util import setup_testing_defaults
+
+from bddrest import status, response
+
+from nanohttp import Application, Controller, action, DiagnosticController
+from nanohttp.tests.helpers import Given, when
+
+
+def some_expensive_function():
+    return sum(range(1000))
+
+
+def test_diagnostic_controller_disabled():
+    class Root(Controller):
+        diagnostics = DiagnosticController()
+
+    with Given(Root(), '/diagnostics/profile'):
+        assert status == 404
+
+
+def test_diagnostic_controller_profile():
+    end_response_calls = []
+
+    class Root(Controller):
+        diagnostics = DiagnosticController()
+
+        @action
+        def index(self):
+            return str(some_expensive_function())
+
+    class App(Application):
+        def end_response(self):
+            end_response_calls.append(1)
+
+    with Given(
+            App(Root()),
+            '/diagnostics/profile',
+            configuration='diagnostics: {enabled: true, max_requests: 2}'
+    ):
+        assert status == 404
+
+        when(verb='POST', query=dict(requests='x'))
+        assert status == 400
+
+        when(verb='POST', query=dict(requests=5))
+        assert status == 202
+        assert response.text == 'Profiling the next 2 requests'
+
+        when('/')
+        assert status == 200
+
+        when()
+        assert status == 200
+        assert 'some_expensive_function' in response.text
+        assert response.headers['X-Remaining-Requests'] == '0'
+
+        # The previous hooks are still called
+        assert len(end_response_calls) == 5
+
+        when(query=dict(sort='invalid'))
+        assert status == 400
+
+        when(query=dict(sort='tottime', limit=1))
+        assert status == 200
+        assert 'some_expensive_function' not in response.text
+
+        when(query=dict(format='pstats'))
+        assert status == 200
+        stats = marshal.loads(response.body)
+        assert any(
+            k[2] == 'some_expensive_function' for k in stats
+        )
+
+
+def test_diagnostic_controller_concurrent_requests():
+    entered = threading.Event()
+    release = threading.Event()
+
+    class Root(Controller):
+        diagnostics = DiagnosticController()
+
+        @action
+        def slow(self):
+            entered.set()
+            release.wait(5)
+            return 'slow'
+
+        @action
+        def fast(self):
+            return 'fast'
+
+    def request(path):
+        environ = {'PATH_INFO': path}
+        setup_testing_defaults(environ)
+        statuses = []
+        body = b''.join(app(
+            environ,
+            lambda status, headers, exc_info=None: statuses.append(status)
+        ))
+        return statuses[0], body
+
+    root = Root()
+    app = Application(root)
+    with Given(
+            app,
+            '/diagnostics/profile',
+            verb='POST',
+            query=dict(requests=2),
+            configuration='diagnostics: {enabled: true}'
+    ):
+        assert status == 202
+
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(request('/slow'))
+        )
+        thread.start()
+        try:
+            assert entered.wait(5)
+
+            # Served without profiling, while the other one is profiled
+            assert request('/fast') == ('200 OK', b'fast')
+            assert root.diagnostics.active
+            assert root.diagnostics.remaining == 1
+        finally:
+            release.set()
+            thread.join()
+
+        assert results == [('200 OK', b'slow')]
+        assert not root.diagnostics.active
+
+        when(verb='GET', query={})
+        assert status == 200
+        assert 'slow' in response.text
+
+
+def test_diagnostic_controller_sample():
+    done = threading.Event()
+
+    def waiting_for_the_event():
+        done.wait()
+
+    thread = threading.Thread(target=waiting_for_the_event, name='waiter')
+    thread.start()
+
+    class Root(Controller):
+        diagnostics = DiagnosticController()
+
+    try:
+        with Given(
+                Root(),
+                '/diagnostics/sample',
+                query=dict(seconds='.05', interval='.01'),
+                configuration='diagnostics: {enabled: true}'
+        ):
+            assert status == 200
+            lines = response.text.splitlines()
+            waiter = [
+                l.rsplit(' ', 1) for l in lines if l.startswith('waiter;')
+            ]
+            assert any('waiting_for_the_event' in s for s, c in waiter)
+            assert sum(int(c) for s, c in waiter) >= 2
+
+            when(query=dict(seconds='-1'))
+            assert status == 400
+    finally:
+        done.set()
+        thread.join()
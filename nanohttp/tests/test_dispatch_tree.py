@@ -0,0 +1,151 @@
+from bddrest import status, response
+
+from nanohttp import Application, Controller, RestController, Static, \
+    action, context, text
+from nanohttp.routing import DispatchTree, RouteNode
+from nanohttp.tests.helpers import Given, when
+
+
+def test_dispatch_tree(make_temp_directory):
+    class RegularClass:
+        pass
+
+    class ItemsController(RestController):
+        @action
+        def get(self, id=None):
+            yield f'Item: {id}'
+
+    class BarController(Controller):
+        items = ItemsController()
+        static = Static(make_temp_directory(a='A'))
+
+        @action
+        def index(self, *args):
+            yield f'Bars, {", ".join(args)}'
+
+        @text(verbs='post')
+        def create(self, *, title=None):
+            yield f'Create: {title}'
+
+        def private(self):  # pragma: no cover
+            raise Exception()
+
+    class Root(Controller):
+        bars = BarController()
+        regulars = RegularClass()
+
+        @action
+        def index(self):
+            yield 'Index'
+
+        @action
+        def foo(self, a, b=None):
+            yield f'Foo: {a}, {b}'
+
+        @action(prevent_form='400 No Form')
+        def bar(self):
+            yield 'Bar'
+
+        def private(self):  # pragma: no cover
+            raise Exception()
+
+    root = Root()
+    root.self = root
+    app = Application(root, compile_routes=True)
+    assert isinstance(app.__dispatch_tree__.root, RouteNode)
+
+    with Given(app):
+        assert status == 200
+        assert response.text == 'Index'
+
+        when('/foo')
+        assert status == 404
+
+        when('/foo/1')
+        assert status == 200
+        assert response.text == 'Foo: 1, None'
+
+        when('/foo/1/2')
+        assert status == 200
+        assert response.text == 'Foo: 1, 2'
+
+        when('/foo/1/2/3')
+        assert status == 404
+
+        when('/private')
+        assert status == 404
+
+        when('/regulars')
+        assert status == 404
+
+        when('/bar', form=dict(a='b'), verb='POST')
+        assert status == '400 No Form'
+
+        when('/bars')
+        assert status == 200
+        assert response.text == 'Bars, '
+
+        when('/bars/a/b')
+        assert status == 200
+        assert response.text == 'Bars, a, b'
+
+        when('/bars/private')
+        assert status == 404
+
+        when('/bars/create', query=dict(title='t'))
+        assert status == 405
+        assert response.headers['Allow'] == 'POST'
+
+        when('/bars/create', query=dict(title='t'), verb='POST')
+        assert status == 200
+        assert response.text == 'Create: t'
+        assert response.content_type == 'text/plain'
+
+        when('/bars/items/1')
+        assert status == 200
+        assert response.text == 'Item: 1'
+
+        when('/bars/static/a')
+        assert status == 200
+        assert response.text == 'A'
+
+        when('/self/self/foo/1')
+        assert status == 200
+        assert response.text == 'Foo: 1, None'
+
+
+def test_dispatch_tree_fallback():
+    class Root(RestController):
+        @action
+        def get(self):
+            yield context.method
+
+    tree = DispatchTree(Root())
+    assert not isinstance(tree.root, RouteNode)
+
+    with Given(Application(Root(), compile_routes=True)):
+        assert status == 200
+        assert response.text == 'get'
+
+        when(verb='POST')
+        assert status == 405
+
+
+def test_dispatch_tree_custom_controller():
+    class Dynamic(Controller):
+        def _find_handler(self, remaining_paths):
+            return self.index, remaining_paths
+
+        @action
+        def index(self, *args):
+            yield f'Dynamic: {", ".join(args)}'
+
+    class Root(Controller):
+        dynamic = Dynamic()
+
+    tree = DispatchTree(Root())
+    assert not isinstance(tree.root.children['dynamic'], RouteNode)
+
+    with Given(Application(Root(), compile_routes=True), '/dynamic/index'):
+        assert status == 200
+        assert response.text == 'Dynamic: index'
@@ -1,9 +1,11 @@
-import cgi
 import io
 
+import pytest
+
 from bddrest import status, response
 
-from nanohttp import Controller, action, context
+from nanohttp import Controller, action, context, HTTPStatus
+from nanohttp.forms import FilePart, parse_multipart, parse_header
 from nanohttp.tests.helpers import Given, when
 
 
@@ -42,7 +44,7 @@ def test_http_multipart_form():
         def index(self):
             def read_form_field(v):
                 return v.file.read().decode() \
-                    if isinstance(v, cgi.FieldStorage) else v
+                    if isinstance(v, FilePart) else v
             yield context.request_content_type
             yield ', '
             yield ', '.join(
@@ -64,6 +66,110 @@ def test_http_multipart_form():
         assert status == 200
         assert response.text == 'multipart/form-data, a=abcdef'
 
+        # Query string is merged into the form
+        when(multipart=dict(a=1), query=dict(a=2, b=3))
+        assert status == 200
+        assert response.text == 'multipart/form-data, a=[\'1\', \'2\'], b=3'
+
+
+def test_multipart_form_limits():
+    class Root(Controller):
+        @action
+        def index(self):
+            form = context.form
+            yield 'Form: '
+            for k, v in sorted(form.items()):
+                if isinstance(v, FilePart):
+                    yield f'{k}={v.filename}:{v.type}:{v.size}:{v.value}, '
+                else:
+                    yield f'{k}={v}, '
+
+    configuration = '''
+        form:
+          max_field_size: 4
+          max_file_size: 8
+    '''
+    with Given(Root(), verb='POST', configuration=configuration):
+        assert status == 200
+
+        when(multipart=dict(a='abcd', b=io.BytesIO(b'abcdefgh')))
+        assert status == 200
+        assert response.text == \
+            "Form: a=abcd, b=b:application/octet-stream:8:b'abcdefgh', "
+
+        when(multipart=dict(a='abcde'))
+        assert status == 413
+
+        when(multipart=dict(b=io.BytesIO(b'abcdefghi')))
+        assert status == 413
+
+        when(form=dict(a='abcde'))
+        assert status == 413
+
+        when(
+            body='--x\r\nContent-Disposition: form-data; name="a"\r\n\r\n1',
+            content_type='multipart/form-data; boundary=x'
+        )
+        assert status == '400 Cannot parse the request'
+
+    with Given(
+        Root(),
+        verb='POST',
+        multipart=dict(a='abcd'),
+        configuration='form: {max_body_size: 10}'
+    ):
+        assert status == 413
+
+
+def test_parse_multipart():
+    body = (
+        b'preamble\r\n'
+        b'--xyz\r\n'
+        b'Content-Disposition: form-data; name="a"\r\n'
+        b'\r\n'
+        b'first\r\n--xy\r\n'
+        b'--xyz\r\n'
+        b'Content-Disposition: form-data; name="f"; '
+        b'filename="a \\"b\\".txt"\r\n'
+        b'Content-Type: text/plain\r\n'
+        b'\r\n'
+        + b'0123456789' * 10 +
+        b'\r\n--xyz\r\n'
+        b'Content-Disposition: form-data\r\n'
+        b'\r\n'
+        b'no name\r\n'
+        b'--xyz--\r\n'
+        b'epilogue'
+    )
+
+    # Feeding the parser byte by byte, and at once
+    for size in (1, 7, len(body)):
+        chunks = (body[i:i + size] for i in range(0, len(body), size))
+        fields = list(parse_multipart(chunks, 'xyz', spool_size=10))
+        assert len(fields) == 2
+        assert fields[0] == ('a', 'first\r\n--xy')
+
+        name, part = fields[1]
+        assert name == 'f'
+        assert part.filename == 'a "b".txt'
+        assert part.type == 'text/plain'
+        assert part.size == 100
+        assert part.file.read() == b'0123456789' * 10
+
+        # Rolled over to the disk
+        assert part.file._rolled
+
+    assert list(parse_multipart([], 'xyz')) == []
+
+    with pytest.raises(HTTPStatus):
+        list(parse_multipart([b'--xyz\r\nheaders'], 'xyz'))
+
+    with pytest.raises(HTTPStatus):
+        list(parse_multipart([b'no boundary'], 'xyz'))
+
+    assert parse_header('form-data; name="a;b"; filename=c.txt') == \
+        ('form-data', dict(name='a;b', filename='c.txt'))
+
 
 def test_json_form():
     class Root(Controller):
@@ -97,6 +203,18 @@ def test_json_form():
         assert status == 400
         assert response.text == 'Cannot parse the request'
 
+    with Given(
+        Root(),
+        verb='POST',
+        json=dict(a='abcdef'),
+        configuration='json: {max_body_size: 10}'
+    ):
+        assert status == 413
+
+        when(json=dict(a=1))
+        assert status == 200
+        assert response.text == 'application/json, a=1'
+
 
 def test_invalid_form():
     class Root(Controller):
@@ -0,0 +1,123 @@
+from bddrest import status, response
+
+from nanohttp import Controller, RestController, action, json, chunked, \
+    context, HTTPNotFound
+from nanohttp.tests.helpers import Given, when
+
+
+def test_head():
+    generated = []
+    closed = []
+    items = []
+
+    class Root(Controller):
+        @action(verbs='get')
+        def index(self):
+            return 'Index'
+
+        @json(verbs=['get', 'post'])
+        def data(self):
+            return dict(a=1)
+
+        @action(verbs='get')
+        def stream(self):
+            context.response_headers['X-Stream'] = 'yes'
+
+            def generate():
+                try:
+                    generated.append(1)
+                    yield 'a'
+                    yield 'b'
+                finally:
+                    closed.append(1)
+
+            return generate()
+
+        @action(verbs='get')
+        @chunked
+        def items(self):
+            context.response_headers['X-Total'] = '2'
+            context.cookies['seen'] = '1'
+            for item in ('a', 'b'):
+                items.append(item)
+                yield item
+
+        @action(verbs='post')
+        def create(self):  # pragma: no cover
+            return 'Created'
+
+        @action(verbs='get')
+        def missing(self):
+            raise HTTPNotFound()
+
+    with Given(Root()):
+        assert status == 200
+        assert response.text == 'Index'
+        assert response.headers['Content-Length'] == '5'
+
+        when(verb='HEAD')
+        assert status == 200
+        assert response.text == ''
+        assert response.headers['Content-Length'] == '5'
+
+        when('/data')
+        length = response.headers['Content-Length']
+        assert length == str(len(response.body))
+
+        when('/data', verb='HEAD')
+        assert status == 200
+        assert response.text == ''
+        assert response.headers['Content-Type'] == \
+            'application/json; charset=utf-8'
+        assert response.headers['Content-Length'] == length
+
+        # The generator is run till the first yield, then closed
+        when('/stream', verb='HEAD')
+        assert status == 200
+        assert response.text == ''
+        assert response.headers['X-Stream'] == 'yes'
+        assert 'Content-Length' not in response.headers
+        assert generated == [1]
+        assert closed == [1]
+
+        when('/stream')
+        assert response.text == 'ab'
+        assert generated == [1, 1]
+        assert closed == [1, 1]
+
+        # Headers which are set before the first yield are the same as GET
+        when('/items')
+        assert status == 200
+        assert response.headers['X-Total'] == '2'
+        assert response.headers['Transfer-Encoding'] == 'chunked'
+        get_cookie = response.headers['Set-Cookie']
+
+        when('/items', verb='HEAD')
+        assert status == 200
+        assert response.text == ''
+        assert response.headers['X-Total'] == '2'
+        assert response.headers['Transfer-Encoding'] == 'chunked'
+        assert response.headers['Set-Cookie'] == get_cookie
+        assert items == ['a', 'b', 'a']
+
+        when('/create', verb='HEAD')
+        assert status == 405
+        assert response.headers['Allow'] == 'POST'
+
+        when('/missing', verb='HEAD')
+        assert status == 404
+        assert response.text == ''
+
+
+def test_head_rest_controller():
+    class Root(RestController):
+        @action
+        def get(self):
+            yield 'Get'
+
+    with Given(Root(), verb='HEAD'):
+        assert status == 200
+        assert response.text == ''
+
+        when(verb='OPTIONS')
+        assert response.headers['Allow'] == 'GET, HEAD, OPTIONS'
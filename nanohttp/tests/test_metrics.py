@@ -0,0 +1,70 @@
+from bddrest import status, response
+
+from nanohttp import Application, Controller, action, MetricsRegistry, \
+    MetricsController, HTTPBadRequest
+from nanohttp.metrics import format_labels
+from nanohttp.tests.helpers import Given, when
+
+
+def test_format_labels():
+    assert format_labels((), ()) == ''
+    assert format_labels(('a', 'b'), ('x', 'y\n"\\'), le='+Inf') == \
+        '{a="x",b="y\\n\\"\\\\",le="+Inf"}'
+
+
+def test_metrics():
+    registry = MetricsRegistry(buckets=(.5, 1))
+
+    class Root(Controller):
+        metrics = MetricsController(registry)
+
+        @action
+        def index(self):
+            return 'index'
+
+        @action(verbs='post')
+        def bad(self):
+            raise HTTPBadRequest()
+
+    with Given(Application(Root(), metrics=registry)):
+        assert status == 200
+
+        when()
+        when('/bad', verb='POST')
+        assert status == 400
+
+        when('/not/found')
+        assert status == 404
+
+        # Unknown methods are not labeled as is
+        when('/not/found', verb='SCAN1')
+        when('/not/found', verb='SCAN2')
+
+        when('/metrics')
+        assert status == 200
+        assert response.headers['Content-Type'] == \
+            'text/plain; version=0.0.4; charset=utf-8'
+
+        lines = [
+            line.replace('test_metrics.<locals>.', '')
+            for line in response.text.splitlines()
+        ]
+        assert 'nanohttp_requests_total{route="Root.index",method="GET",' \
+            'status="200"} 2' in lines
+        assert 'nanohttp_requests_total{route="Root.bad",method="POST",' \
+            'status="400"} 1' in lines
+        assert 'nanohttp_requests_total{route="unknown",method="GET",' \
+            'status="404"} 1' in lines
+        assert 'nanohttp_requests_total{route="unknown",method="OTHER",' \
+            'status="404"} 2' in lines
+        assert not any('SCAN' in line for line in lines)
+        assert 'nanohttp_request_duration_seconds_bucket{' \
+            'route="Root.index",method="GET",le="+Inf"} 2' in lines
+        assert 'nanohttp_request_duration_seconds_count{' \
+            'route="Root.index",method="GET"} 2' in lines
+        assert '# TYPE nanohttp_request_duration_seconds histogram' in lines
+
+        # The metrics request itself
+        assert 'nanohttp_requests_in_flight 1' in lines
+
+    assert registry.in_flight == 0
@@ -0,0 +1,106 @@
+import os
+import time
+import signal
+import threading
+
+import requests
+
+from nanohttp import Application, Controller, action
+from nanohttp.server import PreforkServer
+
+
+class Root(Controller):
+    @action
+    def index(self):
+        yield str(os.getpid())
+
+
+def get_pids(url, count=10):
+    return {requests.get(url).text for i in range(count)}
+
+
+def test_quickstart_with_workers(run_quickstart):
+    url = run_quickstart(Root(), workers=2)
+    time.sleep(.5)
+    pids = get_pids(url)
+    assert str(os.getpid()) not in pids
+
+
+def test_prefork_server(free_port):
+    server = PreforkServer(
+        lambda: Application(Root()),
+        'localhost',
+        free_port,
+        workers=2
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://localhost:{free_port}'
+    try:
+        time.sleep(.5)
+        pids = get_pids(url)
+        assert pids.issubset(str(p) for p in server.children)
+
+        # Dead workers will be restarted
+        workers = set(server.children)
+        os.kill(workers.pop(), signal.SIGKILL)
+        time.sleep(.5)
+        assert len(server.children) == 2
+        assert requests.get(url).status_code == 200
+
+        # Graceful reload
+        old_workers = set(server.children)
+        server.reload()
+        time.sleep(1)
+        assert len(server.children) == 2
+        assert not old_workers & server.children
+        assert not server.retiring
+        assert get_pids(url).isdisjoint(str(p) for p in old_workers)
+
+    finally:
+        server.shutdown()
+        thread.join()
+
+    assert not server.children
+
+
+def test_prefork_server_shared_socket(free_port):
+    for threads in (None, 2):
+        server = PreforkServer(None, 'localhost', free_port, threads=threads)
+        httpd = server._create_server()
+        try:
+            assert httpd.socket.gettimeout() == 0.
+
+            # A worker which loses the race to accept the connection, is not
+            # blocked in the accept()
+            httpd._handle_request_noblock()
+        finally:
+            httpd.server_close()
+
+
+def test_prefork_server_failed_reload(free_port):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) > 1:
+            raise ValueError()
+
+        return Application(Root())
+
+    server = PreforkServer(factory, 'localhost', free_port, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://localhost:{free_port}'
+    try:
+        time.sleep(.5)
+        workers = set(server.children)
+        server.reload()
+        time.sleep(.5)
+        assert len(calls) == 2
+        assert server.children == workers
+        assert requests.get(url).status_code == 200
+
+    finally:
+        server.shutdown()
+        thread.join()
@@ -0,0 +1,118 @@
+import pytest
+from bddrest import status, response
+
+from nanohttp import Application, Controller, RestController, action, \
+    json, Profiler, ProfilerController, Histogram, HTTPBadRequest
+from nanohttp.tests.helpers import Given, when
+
+
+def test_histogram():
+    histogram = Histogram((.1, .2, .5))
+    assert histogram.quantile(.5) is None
+
+    for value in (.05, .1, .15, .3, 1):
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(1.6)
+    assert histogram.cumulative() == [
+        (.1, 2), (.2, 3), (.5, 4), (float('inf'), 5)
+    ]
+    assert histogram.quantile(.5) == .2
+    assert histogram.quantile(.8) == .5
+    assert histogram.quantile(1) == float('inf')
+
+
+@pytest.mark.parametrize('compile_routes', [False, True])
+def test_profiler(compile_routes):
+    recorded = []
+    profiler = Profiler(callback=lambda r, t: recorded.append((r, t)))
+
+    class Child(Controller):
+        @action
+        def index(self):
+            yield 'child'
+
+    class Items(RestController):
+        @action
+        def get(self, id=None):
+            return f'item {id}'
+
+    class Root(Controller):
+        child = Child()
+        items = Items()
+        profile = ProfilerController(profiler)
+
+        @action
+        def index(self):
+            return 'index'
+
+        @action
+        def bad(self):
+            raise HTTPBadRequest()
+
+    app = Application(
+        Root(),
+        compile_routes=compile_routes,
+        profiler=profiler
+    )
+
+    with Given(app):
+        assert status == 200
+        assert recorded[-1][0].endswith('Root.index')
+        timings = recorded[-1][1]
+        assert set(timings) == \
+            {'routing', 'validation', 'handler', 'first_byte', 'body'}
+        assert timings['body'] >= timings['first_byte'] >= timings['handler']
+
+        when('/child')
+        assert status == 200
+        assert recorded[-1][0].endswith('Child.index')
+
+        when('/bad')
+        assert status == 400
+        assert recorded[-1][0].endswith('Root.bad')
+
+        # Nested controllers, which are not compiled, are profiled too
+        when('/items/1')
+        assert status == 200
+        assert response.text == 'item 1'
+        assert recorded[-1][0].endswith('Items.get')
+
+        # The innermost reached handler
+        when('/child/a/b')
+        assert status == 404
+        assert recorded[-1][0].endswith('Child')
+        assert len(recorded) == 5
+
+        # Not found requests are not recorded
+        when('/a/b')
+        assert status == 404
+        assert len(recorded) == 5
+
+        when('/profile')
+        assert status == 200
+        routes = {
+            k.rsplit('.', 2)[-2] + '.' + k.rsplit('.', 1)[-1]: v
+            for k, v in response.json.items()
+        }
+        assert set(routes) == \
+            {'Root.index', 'Child.index', 'Root.bad', '<locals>.Child',
+             'Items.get'}
+        assert routes['Root.index']['body']['count'] == 1
+        assert routes['Root.index']['routing']['p50'] is not None
+
+    profiler.reset()
+    assert profiler.to_dict() == {}
+
+
+def test_profiler_disabled():
+    class Root(Controller):
+        @json
+        def index(self):
+            from nanohttp import context
+            return dict(profile=context.profile)
+
+    with Given(Root()):
+        assert status == 200
+        assert response.json == dict(profile=None)
@@ -1,3 +1,6 @@
+import re
+
+import pytest
 from bddrest import status, response
 
 from nanohttp import RegexRouteController, action
@@ -32,3 +35,134 @@ def test_regex_controller():
         when('/foos/a/bars')
         assert status == 404
 
+
+
+def test_regex_controller_index():
+    class Root(RegexRouteController):
+        def __init__(self, *extra_routes):
+            super().__init__((
+                (r'/foos/(?P<id>\d+)/bars/(?P<bar_id>\w+)$', self.bars),
+                (r'/foos/(?P<id>\d+)$', self.foos, dict(id=int)),
+                (r'^/items/(\d+)(?:/(\w+))?$', self.items, {1: int}),
+                (r'/(?P<name>\w+)/(?P<id>\w+)$', self.any),
+                (r'/foos/(?P<id>\w+)$', self.foos),
+                (r'/(?i:upper)$', self.upper),
+                (r'/$', self.index),
+            ) + extra_routes)
+
+        @action
+        def index(self):
+            return 'index'
+
+        @action
+        def bars(self, id, bar_id):
+            return f'bars {id} {bar_id}'
+
+        @action
+        def foos(self, id):
+            return f'foos {id!r}'
+
+        @action
+        def any(self, name, id):
+            return f'any {name} {id}'
+
+        @action
+        def items(self, id, name=None):
+            return f'items {id!r} {name}'
+
+        @action
+        def upper(self):
+            return 'upper'
+
+    segment = RegexRouteController.get_literal_segment
+    assert segment(re.compile(r'/foos/(\d+)')) == 'foos'
+    assert segment(re.compile(r'^/foos$')) == 'foos'
+    assert segment(re.compile(r'/$')) == ''
+    assert segment(re.compile(r'/foos')) is None
+    assert segment(re.compile(r'/foos(\d+)')) is None
+    assert segment(re.compile(r'/foos/a|/bars')) is None
+    assert segment(re.compile(r'(?i)/foos/')) is None
+    assert segment(re.compile(r'/foos/', re.I)) is None
+    assert segment(re.compile(r'/f.o/')) is None
+
+    with Given(Root(), '/foos/1/bars/a'):
+        assert status == 200
+        assert response.text == 'bars 1 a'
+
+        when('/foos/12')
+        assert response.text == 'foos 12'
+
+        # The routes are tried in order
+        when('/foos/abc')
+        assert response.text == 'any foos abc'
+
+        when('/items/3')
+        assert response.text == 'items 3 None'
+
+        when('/items/3/x')
+        assert response.text == 'items 3 x'
+
+        when('/UPPER')
+        assert response.text == 'upper'
+
+        when('/')
+        assert response.text == 'index'
+
+        when('/nothing/a/b')
+        assert status == 404
+
+
+def test_regex_controller_converters():
+    def positive(value):
+        value = int(value)
+        if value <= 0:
+            raise ValueError()
+
+        return value
+
+    class Root(RegexRouteController):
+        def __init__(self):
+            super().__init__((
+                (r'/foos/(?P<id>-?\d+)$', self.foos, dict(id=positive)),
+            ))
+
+        @action
+        def foos(self, id):
+            return f'{id * 2}'
+
+    with Given(Root(), '/foos/2'):
+        assert status == 200
+        assert response.text == '4'
+
+        when('/foos/-1')
+        assert status == 404
+
+    # Groups are numbered from 1, and checked on construction
+    for converters in ({0: int}, {2: int}, {'bad': int}):
+        with pytest.raises(ValueError):
+            RegexRouteController(((r'/foos/(?P<id>\d+)$', None, converters), ))
+
+
+def test_regex_controller_appended_route():
+    class Root(RegexRouteController):
+        def __init__(self):
+            super().__init__(((r'/foos$', self.foos), ))
+
+        @action
+        def foos(self):
+            return 'foos'
+
+        @action
+        def bars(self, id):
+            return f'bars {id!r}'
+
+    root = Root()
+    root.routes.append((r'/bars/(\d+)$', root.bars, {1: int}))
+    root.compile()
+
+    with Given(root, '/bars/2'):
+        assert status == 200
+        assert response.text == 'bars 2'
+
+        when('/foos')
+        assert response.text == 'foos'
@@ -0,0 +1,147 @@
+import io
+import hashlib
+
+import pytest
+import requests
+from bddrest import status, response
+
+from nanohttp import Controller, action, json, context, HTTPStatus
+from nanohttp.contexts import Context
+from nanohttp.forms import iter_json_array
+from nanohttp.tests.helpers import Given, when
+
+
+def test_iter_body():
+    def read(body, chunk_size=0x10000, max_size=None, **environ):
+        environ['wsgi.input'] = io.BytesIO(body)
+        with Context(environ) as context_:
+            return list(context_.iter_body(chunk_size, max_size))
+
+    assert read(b'abcdef', 4, CONTENT_LENGTH='5') == [b'abcd', b'e']
+    assert read(b'abcdef') == []
+    assert read(b'abcdef', 4, **{'wsgi.input_terminated': True}) == \
+        [b'abcd', b'ef']
+
+    with pytest.raises(HTTPStatus):
+        read(b'abcdef', max_size=4, CONTENT_LENGTH='5')
+
+    with pytest.raises(HTTPStatus):
+        read(b'abcdef', max_size=4, **{'wsgi.input_terminated': True})
+
+    chunked = dict(HTTP_TRANSFER_ENCODING='chunked')
+    body = b'3\r\nabc\r\na;ext=1\r\n0123456789\r\n0\r\nTrailer: 1\r\n\r\n'
+    assert read(body, 4, **chunked) == \
+        [b'abc', b'0123', b'4567', b'89']
+
+    with pytest.raises(HTTPStatus) as info:
+        read(body, max_size=12, **chunked)
+
+    assert info.value.status == '413 Request Entity Too Large'
+
+    for malformed in (b'x\r\nabc\r\n', b'3\r\nab', b'3\r\nabcd\r\n', b'3'):
+        with pytest.raises(HTTPStatus) as info:
+            read(malformed, **chunked)
+
+        assert info.value.status == '400 Cannot parse the request'
+
+
+def test_body_stream(run_quickstart):
+    class Root(Controller):
+        @json(verbs='post')
+        def index(self):
+            digest = hashlib.md5()
+            size = 0
+            while True:
+                chunk = context.body_stream.read(7)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                digest.update(chunk)
+
+            return dict(size=size, md5=digest.hexdigest())
+
+        @action(verbs='post')
+        def form(self):
+            form = context.form
+            yield ', '.join(f'{k}={v}' for k, v in sorted(form.items()))
+
+    body = b'0123456789' * 10000
+    expected = dict(size=len(body), md5=hashlib.md5(body).hexdigest())
+
+    with Given(Root(), verb='POST', body=body):
+        assert status == 200
+        assert response.json == expected
+
+    url = run_quickstart(Root())
+
+    def chunks():
+        for i in range(0, len(body), 999):
+            yield body[i:i + 999]
+
+    # The chunked transfer encoding
+    r = requests.post(url, data=chunks())
+    assert r.status_code == 200
+    assert r.json() == expected
+
+    r = requests.post(
+        f'{url}/form',
+        data=iter([b'a=1&', b'b=2']),
+        headers={'Content-Type': 'application/x-www-form-urlencoded'}
+    )
+    assert r.status_code == 200
+    assert r.text == 'a=1, b=2'
+
+
+def test_iter_json_array(run_quickstart):
+    body = b' [1, 22 ,{"a": [1, "\xc3\xa9"]}, "x,y", null, true, 3.5e2 ] '
+    expected = [1, 22, dict(a=[1, '\xe9']), 'x,y', None, True, 350.]
+
+    # Feeding byte by byte
+    assert list(iter_json_array(body[i:i + 1] for i in range(len(body)))) \
+        == expected
+    assert list(iter_json_array([body])) == expected
+    assert list(iter_json_array([b'[', b' ]'])) == []
+
+    for malformed in (b'', b'{}', b'[1,', b'[1 2]', b'[1,]', b'[tru]', b'[1'):
+        with pytest.raises(HTTPStatus) as info:
+            list(iter_json_array([malformed]))
+
+        assert info.value.status == '400 Cannot parse the request'
+
+    # Trailing data after the array
+    for trailing in ([b'[1,2]garbage'], [b'[]x'], [b'[1] ', b' ', b'2']):
+        with pytest.raises(HTTPStatus) as info:
+            list(iter_json_array(trailing))
+
+        assert info.value.status == '400 Cannot parse the request'
+
+    with pytest.raises(HTTPStatus) as info:
+        list(iter_json_array([b'[1, "abcdef"]'], max_item_size=5))
+
+    assert info.value.status == '413 Request Entity Too Large'
+
+    class Root(Controller):
+        @json(verbs='post')
+        def index(self):
+            items = []
+            for item in context.iter_json_array(max_item_size=100):
+                items.append(item)
+
+            return items
+
+    with Given(Root(), verb='POST', json=[dict(a=1), 2]):
+        assert status == 200
+        assert response.json == [dict(a=1), 2]
+
+        when(json=['a' * 101])
+        assert status == 413
+
+    url = run_quickstart(Root())
+    r = requests.post(
+        url,
+        data=iter([b'[{"a"', b': 1}, ', b'2]']),
+        headers={'Content-Type': 'application/json'}
+    )
+    assert r.status_code == 200
+    assert r.json() == [dict(a=1), 2]
@@ -69,3 +69,117 @@ def test_nested_rest_controllers():
         assert status == 200
         assert response.text == 'Bars, a'
 
+
+
+def test_rest_controller_verbs_table():
+    class ItemsController(RestController):
+        @action
+        def get(self, id=None):
+            return f'get {id}'
+
+        @action(verbs=['post', 'put'])
+        def post(self):
+            return 'post'
+
+        @action
+        def search(self, *args):
+            return 'search'
+
+        @action
+        def metadata(self):
+            return 'metadata'
+
+        @action(verbs='lock')
+        def lock(self):
+            return 'locked'
+
+    class Root(RestController):
+        def __init__(self):
+            self.items = ItemsController()
+
+        @action
+        def get(self):
+            return 'root'
+
+    assert ItemsController.__verbs__ == \
+        {'get', 'head', 'post', 'lock', 'options'}
+    assert ItemsController.__allow__ == 'GET, HEAD, LOCK, OPTIONS, POST'
+    assert ItemsController.__verb_handlers__['head'] == \
+        ItemsController.__handlers__['get']
+    assert 'head' not in ItemsController.__handlers__
+
+    with Given(Root(), '/items'):
+        assert status == 200
+        assert response.text == 'get None'
+
+        when('/items/1')
+        assert response.text == 'get 1'
+
+        when('/items/search', verb='GET')
+        assert response.text == 'search'
+
+        # Actions which are not verbs are still reachable by the path
+        when('/items/metadata', verb='GET')
+        assert response.text == 'metadata'
+
+        when(verb='LOCK')
+        assert response.text == 'locked'
+
+        # The default options handler is not reachable by the path
+        when('/items/options', verb='GET')
+        assert status == 200
+        assert response.text == 'get options'
+
+        when('/items/options', verb='OPTIONS')
+        assert status == 200
+        assert response.headers['Allow'] == 'GET, HEAD, LOCK, OPTIONS, POST'
+
+        when(verb='POST')
+        assert response.text == 'post'
+
+        when(verb='HEAD')
+        assert status == 200
+
+        when(verb='OPTIONS')
+        assert status == 200
+        assert response.headers['Allow'] == 'GET, HEAD, LOCK, OPTIONS, POST'
+        assert response.text == ''
+
+        when(verb='DELETE')
+        assert status == 405
+        assert response.headers['Allow'] == 'GET, HEAD, LOCK, OPTIONS, POST'
+
+        # Verbs of the action
+        when('/items/post', verb='DELETE')
+        assert status == 405
+        assert response.headers['Allow'] == 'POST, PUT'
+
+        when('/', verb='OPTIONS')
+        assert status == 200
+        assert response.headers['Allow'] == 'GET, HEAD, OPTIONS'
+
+
+def test_rest_controller_dynamic_attributes():
+    class Root(RestController):
+        @action
+        def get(self):
+            return 'get'
+
+        def __getattr__(self, name):
+            if name != 'dynamic':
+                raise AttributeError(name)
+
+            return self.get
+
+    assert Root.__handlers__ is None
+
+    with Given(Root(), '/dynamic'):
+        assert status == 200
+        assert response.text == 'get'
+
+        when('/', verb='HEAD')
+        assert status == 200
+
+        when('/', verb='DELETE')
+        assert status == 405
+        assert response.headers['Allow'] == 'GET, HEAD, OPTIONS'
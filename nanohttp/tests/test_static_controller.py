@@ -1,6 +1,13 @@
+import os
+import gzip
+from os import path
+
+import requests
 from bddrest import status, response
 
-from nanohttp import Static, Controller
+from nanohttp import Static, Controller, Application
+from nanohttp.helpers import parse_range_header
+from nanohttp.server import SendfileServerHandler
 from nanohttp.tests.helpers import Given, when
 
 
@@ -59,3 +66,357 @@ def test_nested_static_controller(make_temp_directory):
         assert status == 200
         assert response.text == 'A1'
 
+
+
+def test_static_controller_file_wrapper(run_quickstart, make_temp_directory,
+                                        monkeypatch):
+    transmitted = []
+    sendfile = SendfileServerHandler.sendfile
+
+    def sendfile_spy(self):
+        result = sendfile(self)
+        transmitted.append(self.bytes_sent)
+        return result
+
+    monkeypatch.setattr(SendfileServerHandler, 'sendfile', sendfile_spy)
+    content = 'ABCDEFGH' * 0x2000
+    url = run_quickstart(Static(make_temp_directory(a=content)))
+
+    response = requests.get(f'{url}/a')
+    assert response.status_code == 200
+    assert response.text == content
+    assert response.headers['Content-Length'] == str(len(content))
+
+    response = requests.get(f'{url}/b')
+    assert response.status_code == 404
+
+    # The first request is completely done by the server, here.
+    assert transmitted == [len(content)]
+
+
+def test_static_controller_conditional_get(make_temp_directory):
+    static = Static(make_temp_directory(a='ABCDEF'))
+
+    with Given(static, '/a'):
+        assert status == 200
+        assert response.text == 'ABCDEF'
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        assert response.headers['Accept-Ranges'] == 'bytes'
+
+        when(headers={'If-None-Match': etag})
+        assert status == 304
+        assert response.text == ''
+        assert response.headers['ETag'] == etag
+
+        when(headers={'If-None-Match': f'"foo", W/{etag}'})
+        assert status == 304
+
+        when(headers={'If-None-Match': '"foo"'})
+        assert status == 200
+
+        when(headers={'If-Modified-Since': last_modified})
+        assert status == 304
+
+        when(headers={'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'})
+        assert status == 200
+
+        when(headers={'If-Modified-Since': 'Invalid'})
+        assert status == 200
+
+        # If-Modified-Since is ignored when If-None-Match is given
+        when(headers={
+            'If-None-Match': '"foo"',
+            'If-Modified-Since': last_modified
+        })
+        assert status == 200
+
+        when(verb='POST', headers={'If-None-Match': etag})
+        assert status == 200
+
+
+def test_static_controller_range(make_temp_directory):
+    static = Static(make_temp_directory(a='ABCDEFGHIJ'))
+
+    with Given(static, '/a', headers={'Range': 'bytes=2-4'}):
+        assert status == 206
+        assert response.text == 'CDE'
+        assert response.headers['Content-Range'] == 'bytes 2-4/10'
+        assert response.headers['Content-Length'] == '3'
+        etag = response.headers['ETag']
+
+        when(headers={'Range': 'bytes=7-'})
+        assert status == 206
+        assert response.text == 'HIJ'
+        assert response.headers['Content-Range'] == 'bytes 7-9/10'
+
+        when(headers={'Range': 'bytes=-2'})
+        assert status == 206
+        assert response.text == 'IJ'
+
+        when(headers={'Range': 'bytes=8-100'})
+        assert status == 206
+        assert response.text == 'IJ'
+
+        when(headers={'Range': 'bytes=10-'})
+        assert status == 416
+        assert response.headers['Content-Range'] == 'bytes */10'
+
+        # Invalid ranges are ignored
+        when(headers={'Range': 'bytes=5-2'})
+        assert status == 200
+        assert response.text == 'ABCDEFGHIJ'
+
+        when(headers={'Range': 'lines=1-2'})
+        assert status == 200
+
+        when(headers={'Range': 'bytes=2-4', 'If-Range': etag})
+        assert status == 206
+
+        when(headers={'Range': 'bytes=2-4', 'If-Range': '"foo"'})
+        assert status == 200
+        assert response.text == 'ABCDEFGHIJ'
+
+        when(headers={'Range': 'bytes=0-1,-3'})
+        assert status == 206
+        content_type, boundary = \
+            response.headers['Content-Type'].split('; boundary=')
+        assert content_type == 'multipart/byteranges'
+        assert response.headers['Content-Length'] == \
+            str(len(response.body))
+        assert response.text == \
+            f'--{boundary}\r\n' \
+            f'Content-Type: application/octet-stream\r\n' \
+            f'Content-Range: bytes 0-1/10\r\n' \
+            f'\r\n' \
+            f'AB\r\n' \
+            f'--{boundary}\r\n' \
+            f'Content-Type: application/octet-stream\r\n' \
+            f'Content-Range: bytes 7-9/10\r\n' \
+            f'\r\n' \
+            f'HIJ\r\n' \
+            f'--{boundary}--\r\n'
+
+
+def test_static_controller_range_file_wrapper(run_quickstart,
+                                              make_temp_directory):
+    url = run_quickstart(Static(make_temp_directory(a='ABCDEFGHIJ')))
+    response = requests.get(f'{url}/a', headers={'Range': 'bytes=2-4'})
+    assert response.status_code == 206
+    assert response.text == 'CDE'
+
+
+def test_static_controller_file_wrapper_close(make_temp_directory):
+    hooks = []
+
+    class SlotsFileWrapper:
+        __slots__ = ('filelike', 'blksize')
+
+        def __init__(self, filelike, blksize=8192):
+            self.filelike = filelike
+            self.blksize = blksize
+
+        def __iter__(self):
+            return iter(lambda: self.filelike.read(self.blksize), b'')
+
+        def close(self):
+            hooks.append('close')
+            self.filelike.close()
+
+    class FinalFileWrapper(SlotsFileWrapper):
+        __slots__ = ()
+
+        def __init_subclass__(cls, **kwargs):
+            raise TypeError('Final')
+
+    class App(Application):
+        def end_response(self):
+            hooks.append('end_response')
+
+    app = App(Static(make_temp_directory(a='ABCDEF')))
+    for file_wrapper in (SlotsFileWrapper, FinalFileWrapper):
+        del hooks[:]
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': '/a',
+            'wsgi.file_wrapper': file_wrapper,
+        }
+        result = app(environ, lambda status, headers: None)
+        assert isinstance(result, SlotsFileWrapper) == \
+            (file_wrapper is SlotsFileWrapper)
+        assert b''.join(result) == b'ABCDEF'
+        assert hooks == []
+
+        result.close()
+        assert hooks == ['close', 'end_response']
+
+
+def test_static_controller_cache(make_temp_directory):
+    directory = make_temp_directory(
+        a='ABCDEF',
+        b='BBBBBB',
+        c={'index.html': 'Index'},
+        large='L' * 20
+    )
+    static = Static(
+        directory,
+        cache_size=16,
+        max_cached_file_size=10,
+        revalidate_interval=3600
+    )
+
+    with Given(static, '/a'):
+        assert status == 200
+        assert response.text == 'ABCDEF'
+        assert response.headers['Content-Length'] == '6'
+        assert response.headers['Content-Type'] == \
+            'application/octet-stream'
+        etag = response.headers['ETag']
+        assert list(static.cache) == [('a', )]
+        assert static.cache_used == 6
+
+        # Served from the memory
+        when()
+        assert status == 200
+        assert response.text == 'ABCDEF'
+        assert response.headers['ETag'] == etag
+
+        when(headers={'If-None-Match': etag})
+        assert status == 304
+
+        when(headers={'Range': 'bytes=1-2'})
+        assert status == 206
+        assert response.text == 'BC'
+
+        when(headers={'Range': 'bytes=0-0,-1'})
+        assert status == 206
+        assert 'multipart/byteranges' in response.content_type
+        assert 'A\r\n' in response.text
+        assert 'F\r\n' in response.text
+
+        when('/c')
+        assert status == 200
+        assert response.text == 'Index'
+        assert list(static.cache) == [('a', ), ('c', )]
+        assert static.cache_used == 11
+
+        # Least recently used file is evicted
+        when('/b')
+        assert status == 200
+        assert list(static.cache) == [('c', ), ('b', )]
+        assert static.cache_used == 11
+
+        # Large files are not cached
+        when('/large')
+        assert status == 200
+        assert response.text == 'L' * 20
+        assert ('large', ) not in static.cache
+
+        # Changes are ignored until the revalidation
+        filename = path.join(directory, 'b')
+        with open(filename, 'w') as f:
+            f.write('CCCCCC')
+
+        os.utime(filename, ns=(0, 0))
+        when('/b')
+        assert response.text == 'BBBBBB'
+
+        static.revalidate_interval = 0
+        when('/b')
+        assert status == 200
+        assert response.text == 'CCCCCC'
+        assert response.headers['ETag'] != etag
+
+        os.remove(filename)
+        when('/b')
+        assert status == 404
+        assert ('b', ) not in static.cache
+        assert static.cache_used == 5
+
+
+def test_static_controller_precompressed(make_temp_directory):
+    directory = make_temp_directory(**{
+        'a.css': 'A',
+        'b.css': 'B',
+    })
+    with open(path.join(directory, 'a.css.gz'), 'wb') as f:
+        f.write(gzip.compress(b'A'))
+
+    for cache_size in (0, 1024):
+        static = Static(
+            directory,
+            precompressed=True,
+            cache_size=cache_size
+        )
+
+        with Given(static, '/a.css', headers={'Accept-Encoding': 'gzip'}):
+            assert status == 200
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert response.headers['Vary'] == 'Accept-Encoding'
+            assert response.content_type == 'text/css'
+            assert gzip.decompress(response.body) == b'A'
+            etag = response.headers['ETag']
+            assert etag.endswith('-gzip"')
+
+            when(headers={
+                'Accept-Encoding': 'gzip',
+                'If-None-Match': etag
+            })
+            assert status == 304
+
+            when(headers={'Accept-Encoding': 'br'})
+            assert status == 200
+            assert 'Content-Encoding' not in response.headers
+            assert response.text == 'A'
+            assert response.headers['ETag'] != etag
+
+            when(headers={})
+            assert status == 200
+            assert 'Content-Encoding' not in response.headers
+            assert response.text == 'A'
+
+            when('/b.css')
+            assert status == 200
+            assert 'Content-Encoding' not in response.headers
+            assert response.text == 'B'
+
+
+def test_static_controller_head(make_temp_directory):
+    directory = make_temp_directory(**{'a.css': 'A' * 10})
+    with open(path.join(directory, 'a.css.gz'), 'wb') as f:
+        f.write(gzip.compress(b'A' * 10))
+
+    class NoOpenStatic(Static):
+        def _open(self, physical_path, encodings=None):  # pragma: no cover
+            raise AssertionError('The file must not be opened')
+
+    static = NoOpenStatic(directory, precompressed=True)
+    with Given(static, '/a.css', verb='HEAD'):
+        assert status == 200
+        assert response.text == ''
+        assert response.headers['Content-Length'] == '10'
+        assert response.headers['Content-Type'] == 'text/css'
+        assert response.headers['ETag']
+
+        when(headers={'Accept-Encoding': 'gzip'})
+        assert status == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Content-Length'] == \
+            str(path.getsize(path.join(directory, 'a.css.gz')))
+
+        when(headers={'Range': 'bytes=0-1'})
+        assert status == 200
+        assert response.headers['Content-Length'] == '10'
+
+        when('/b.css')
+        assert status == 404
+
+
+def test_parse_range_header():
+    assert parse_range_header('bytes=0-0', 10) == [(0, 0)]
+    assert parse_range_header('bytes=0-0,5-', 10) == [(0, 0), (5, 9)]
+    assert parse_range_header('bytes=-20', 10) == [(0, 9)]
+    assert parse_range_header('bytes=-0', 10) == []
+    assert parse_range_header('bytes=10-20', 10) == []
+    assert parse_range_header('bytes=a-b', 10) is None
+    assert parse_range_header('bytes=1', 10) is None
@@ -0,0 +1,42 @@
+import time
+import threading
+
+import requests
+
+from nanohttp import Controller, action, context
+
+
+class Root(Controller):
+    @action
+    def index(self, delay='0'):
+        time.sleep(float(delay))
+        yield f'{context.query["name"]}, ' \
+            f'{type(context.environ["nanohttp.queue_wait"]).__name__}'
+
+
+def test_quickstart_with_threads(run_quickstart):
+    url = run_quickstart(Root(), threads=4)
+    results = {}
+
+    def get(name):
+        results[name] = requests.get(f'{url}/.3', params=dict(name=name)).text
+
+    threads = [threading.Thread(target=get, args=(i, )) for i in range(4)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    # Requests are served concurrently
+    assert time.monotonic() - start < 1
+    assert results == {i: f'{i}, float' for i in range(4)}
+
+
+def test_quickstart_with_workers_and_threads(run_quickstart):
+    url = run_quickstart(Root(), workers=2, threads=2, queue_size=1)
+    time.sleep(.5)
+    response = requests.get(url, params=dict(name='foo'))
+    assert response.status_code == 200
+    assert response.text == 'foo, float'
@@ -5,8 +5,10 @@ import pytest
 from bddrest import status, response
 
 from nanohttp import RequestValidator, HTTPBadRequest, HTTPStatus, \
-    Controller, validate, action, context
-from nanohttp.tests.helpers import Given
+    Controller, validate, validate_all, action, context, json, \
+    HTTPValidationErrors
+from nanohttp.validation import Field, Criterion, compile_simple_pattern
+from nanohttp.tests.helpers import Given, when
 
 
 def test_validation_decorator():
@@ -177,6 +179,49 @@ def test_validation_pattern_compiled():
         validator(dict(a='123456'))
 
 
+def test_validation_pattern_full_match():
+    validator = RequestValidator(
+        fields=dict(
+            a=dict(pattern=r'\d{2}', full_match=True),
+            b=dict(pattern=r'[a-z]+', full_match=True),
+        )
+    )
+    assert dict(a='12', b='ab') == validator(dict(a='12', b='ab'))[0]
+
+    with pytest.raises(HTTPBadRequest):
+        validator(dict(a='123'))
+
+    with pytest.raises(HTTPBadRequest):
+        validator(dict(b='abC'))
+
+
+def test_simple_patterns():
+    patterns = [
+        'user-', '^user-', '^user-$', 'user-\\Z', '^\\d+$', '^\\d*$',
+        '\\d{3}$', '^\\d{2,}$', '^\\d{,3}\\Z', '^.{2,4}$', '^.+$', '^.*$',
+    ]
+    values = [
+        '', '\n', 'user-', 'user-\n', 'user-1', 'use', '1', '12', '123',
+        '123\n', '1234', '12\n3', '\u0661\u0662', 'abc', 'ab\n\n', 'a\nb',
+    ]
+
+    for pattern in patterns:
+        for full_match in (False, True):
+            matcher = compile_simple_pattern(pattern, full_match)
+            assert matcher is not None, pattern
+
+            regex = re.compile(pattern)
+            match = regex.fullmatch if full_match else regex.match
+            for value in values:
+                assert matcher(value) == (match(value) is not None), \
+                    (pattern, full_match, value)
+
+    assert compile_simple_pattern('^\\d+') is None
+    assert compile_simple_pattern('^[a-z]+$') is None
+    assert compile_simple_pattern('^a|b$') is None
+    assert compile_simple_pattern('^\\w{2}$') is None
+
+
 def test_validation_type():
     validator = RequestValidator(
         fields=dict(
@@ -311,3 +356,195 @@ def test_priority_validation():
         validator(dict(a='abc'))
     assert str(ctx.value) == '602 Invalid input format'
 
+
+
+def test_compiled_validation():
+    validator = RequestValidator(
+        fields=dict(
+            a=dict(type_=int, minimum=(2, '601 Too small')),
+            b=dict(type_=lambda v: None, min_length=1),
+        )
+    )
+
+    # Exceptions are not shared between the requests
+    exceptions = []
+    for i in range(2):
+        with pytest.raises(HTTPStatus) as ctx:
+            validator(dict(a='1'))
+
+        exceptions.append(ctx.value)
+
+    assert exceptions[0] is not exceptions[1]
+    assert str(exceptions[1]) == '601 Too small'
+
+    # Criteria are skipped when the value became None
+    assert validator(dict(a='3', b='x'))[0] == dict(a=3, b=None)
+
+    # Custom criteria
+    class EvenValidator(Criterion):
+        def _validate(self, value, container, field):
+            if value % 2:
+                raise self.create_exception()
+
+            return value
+
+    class EvenField(Field):
+        def __init__(self, title, **kwargs):
+            super().__init__(title, **kwargs)
+            self.criteria.append(EvenValidator((True, '602 Not even')))
+            self._validate = self.compile()
+
+    field = EvenField('a', type_=int)
+    assert field.validate(dict(a='2')) == dict(a=2)
+    with pytest.raises(HTTPStatus) as ctx:
+        field.validate(dict(a='3'))
+
+    assert str(ctx.value) == '602 Not even'
+
+
+def test_aggregate_validation():
+    validator = RequestValidator(
+        fields=dict(
+            a=dict(required='701 a is required'),
+            b=dict(type_=int, maximum=(10, '702 b is too large')),
+            c=dict(min_length=2, query=True),
+        ),
+        aggregate=True
+    )
+
+    assert validator(dict(a=1, b='3'), dict())[0] == dict(a=1, b=3)
+
+    with pytest.raises(HTTPValidationErrors) as ctx:
+        validator(dict(b='11'), dict(c='x'))
+
+    assert ctx.value.status == '400 Bad Request'
+    assert ctx.value.errors == [
+        dict(field='a', statusCode=701, statusText='a is required'),
+        dict(field='b', statusCode=702, statusText='b is too large'),
+        dict(field='c', statusCode=400, statusText='Bad request'),
+    ]
+
+    class Root(Controller):
+        @json(verbs='post')
+        @validate_all(
+            a=dict(required='701 a is required'),
+            b=dict(type_=(int, '703 b must be integer')),
+        )
+        def index(self):
+            return context.form
+
+        @json(verbs='post')
+        @validate(aggregate=dict(type_=int), b=dict(type_=int))
+        def field(self):
+            return context.form
+
+        @json(verbs='post')
+        @validate_all(aggregate=dict(type_=int), b=dict(type_=int))
+        def field_all(self):
+            return context.form
+
+    with Given(Root(), verb='POST', form=dict(b='x')):
+        assert status == 400
+        assert response.content_type == 'application/json'
+        assert response.json == dict(errors=[
+            dict(field='a', statusCode=701, statusText='a is required'),
+            dict(field='b', statusCode=703, statusText='b must be integer'),
+        ])
+
+        when(form=dict(a='1', b='2'))
+        assert status == 200
+        assert response.json == dict(a='1', b=2)
+
+        # A field named aggregate
+        when('/field', form=dict(aggregate='1', b='2'))
+        assert status == 200
+        assert response.json == dict(aggregate=1, b=2)
+
+        when('/field', form=dict(aggregate='x', b='y'))
+        assert status == 400
+        assert 'errors' not in response.json
+
+        when('/field_all', form=dict(aggregate='x', b='y'))
+        assert status == 400
+        assert [e['field'] for e in response.json['errors']] == \
+            ['aggregate', 'b']
+
+
+def test_nested_validation():
+    validator = RequestValidator(
+        fields=dict(
+            address=dict(
+                required='701 address is required',
+                fields=(dict(
+                    city=dict(required='702 city is required'),
+                    zip=dict(type_=(int, '703 zip must be integer')),
+                ), '704 address must be an object'),
+            ),
+            tags=dict(
+                items=(dict(
+                    not_none='705 tag cannot be null',
+                    max_length=(3, '706 tag is too long'),
+                ), '707 tags must be a list'),
+            ),
+            points=dict(
+                min_length=(1, '708 at least one point is required'),
+                items=dict(fields=dict(
+                    x=dict(required='709 x is required', type_=float),
+                )),
+            ),
+        )
+    )
+
+    form = dict(
+        address=dict(city='A', zip='123'),
+        tags=['a', 'bcd'],
+        points=[dict(x='1'), dict(x=2)],
+    )
+    assert validator(form)[0] == dict(
+        address=dict(city='A', zip=123),
+        tags=['a', 'bcd'],
+        points=[dict(x=1.), dict(x=2.)],
+    )
+
+    def assert_status(form, status):
+        with pytest.raises(HTTPStatus) as ctx:
+            validator(form)
+
+        assert ctx.value.status == status
+
+    assert_status(dict(), '701 address is required')
+    assert_status(dict(address='A'), '704 address must be an object')
+    assert_status(dict(address=dict()), '702 city is required')
+    assert_status(
+        dict(address=dict(city='A', zip='B')),
+        '703 zip must be integer'
+    )
+
+    address = dict(city='A')
+    assert_status(dict(address=address, tags='a'), '707 tags must be a list')
+    assert_status(dict(address=address, tags=[None]), '705 tag cannot be null')
+    assert_status(dict(address=address, tags=['abcd']), '706 tag is too long')
+    assert_status(
+        dict(address=address, points=[]),
+        '708 at least one point is required'
+    )
+    assert_status(dict(address=address, points=[dict()]), '709 x is required')
+    assert_status(dict(address=address, points=['x']), '400 Bad request')
+
+    class Root(Controller):
+        @json(verbs='post')
+        @validate(
+            items=dict(
+                required=True,
+                items=dict(fields=dict(count=dict(type_=int, minimum=1)))
+            )
+        )
+        def index(self):
+            return context.form
+
+    with Given(Root(), verb='POST', json=dict(items=[dict(count='2')])):
+        assert status == 200
+        assert response.json == dict(items=[dict(count=2)])
+
+        when(json=dict(items=[dict(count=0)]))
+        assert status == 400
@@ -3,18 +3,33 @@ import functools
 from _decimal import InvalidOperation
 
 from nanohttp import context
-from nanohttp.exceptions import HTTPStatus, HTTPBadRequest
+from nanohttp.exceptions import HTTPStatus, HTTPBadRequest, \
+    HTTPValidationErrors
 
 
 NO_EMPTY_FORM = 'NO_EMPTY_FORM'
 NO_FORM = 'NO_FORM'
 
+#: Characters which make a regular expression non-literal
+SPECIAL_CHARACTERS = frozenset('\\.^$*+?{}[]|()')
+
+SIMPLE_QUANTIFIED_PATTERN = re.compile(
+    r'(\\d|\.)(?:([+*])|\{(\d+)\}|\{(\d*),(\d*)\})'
+)
+
 
 class Field:
+    """A field to validate, and it's criteria
+
+    The criteria are compiled into a single function on construction, see
+    :meth:`.compile`.
+    """
+
     def __init__(self, title, form=True, query=False, required=None,
                  type_=None, minimum=None, maximum=None, pattern=None,
                  min_length=None, max_length=None, callback=None,
-                 not_none=None, readonly=None):
+                 not_none=None, readonly=None, full_match=False,
+                 fields=None, items=None):
         self.title = title
         self.form = form
         self.query = query
@@ -45,17 +60,85 @@ class Field:
             self.criteria.append(MaxLengthValidator(max_length))
 
         if pattern:
-            self.criteria.append(PatternValidator(pattern))
+            self.criteria.append(PatternValidator(pattern, full_match))
+
+        if fields:
+            self.criteria.append(FieldsValidator(fields))
+
+        if items:
+            self.criteria.append(ItemsValidator(items))
 
         if callback:
             self.criteria.append(CallableValidator(callback))
 
-    def validate(self, container):
+        self._validate = self.compile()
+
+    def compile(self):
+        """Compile the criteria into a function which validates the field
+        in the given container.
+
+        The presence of the field is checked once for the ``readonly``,
+        ``required`` and ``not_none`` flags, then the value is passed through
+        the compiled value criteria, skipping the rest if it becomes ``None``.
+        """
+        title = self.title
+        readonly = required = not_none = None
+        value_checks = []
+        for criterion in self.criteria:
+            type_ = type(criterion)
+            if type_ is ReadonlyValidator:
+                readonly = criterion.create_exception
+
+            elif type_ is RequiredValidator:
+                required = criterion.create_exception
+
+            elif type_ is NotNoneValidator:
+                not_none = criterion.create_exception
+
+            elif type_.validate is not Criterion.validate:
+                # A criterion with it's own semantics, which cannot be
+                # compiled
+                return self._validate_criteria
+
+            else:
+                value_checks.append(criterion.compile(self))
+
+        def validate(container):
+            if title not in container:
+                if required is not None:
+                    raise required()
+
+                return container
+
+            if readonly is not None:
+                raise readonly()
+
+            value = container[title]
+            if value is None:
+                if not_none is not None:
+                    raise not_none()
+
+                return container
+
+            for check in value_checks:
+                value = check(value, container)
+                container[title] = value
+                if value is None:
+                    break
+
+            return container
+
+        return validate
+
+    def _validate_criteria(self, container):
         for criterion in self.criteria:
             criterion.validate(self, container)
 
         return container
 
+    def validate(self, container):
+        return self._validate(container)
+
 
 class Criterion:
     def __init__(self, expression):
@@ -78,17 +161,33 @@ class Criterion:
         else:
             self.status_text = 'Bad request'
 
+        self.status = f'{self.status_code} {self.status_text}'
+
     def validate(self, field: Field, container: dict) -> None:
         value = container.get(field.title)
         if value is None:
             return
 
-        container[field.title] = self._validate(
+        container[field.title] = self.compile(field)(
             container[field.title],
-            container,
-            field
+            container
         )
 
+    def compile(self, field: Field):
+        """Create a function to validate the value of the given field
+
+        Override it to avoid the per call overhead of the :meth:`._validate`.
+
+        :return: A ``callable(value, container)`` which returns the validated
+                 value.
+        """
+        validate = self._validate
+
+        def check(value, container):
+            return validate(value, container, field)
+
+        return check
+
     def _validate(self, value, container: dict, field: Field
                   ):  # pragma: no cover
         """
@@ -109,9 +208,7 @@ class Criterion:
         if self.status_code == 400:
             return HTTPBadRequest(self.status_text)
 
-        return HTTPStatus(
-            status=f'{self.status_code} {self.status_text}'
-        )
+        return HTTPStatus(status=self.status)
 
 
 class FlagCriterion(Criterion):
@@ -151,95 +248,350 @@ class ReadonlyValidator(FlagCriterion):
 
 class TypeValidator(Criterion):
 
-    def _validate(self, value, container, field):
+    def compile(self, field):
         type_ = self.expression
-        try:
-            return type_(value)
-        except (ValueError, TypeError, InvalidOperation):
-            raise self.create_exception()
+        error = self.create_exception
+
+        def check(value, container):
+            try:
+                return type_(value)
+            except (ValueError, TypeError, InvalidOperation):
+                raise error()
+
+        return check
 
 
 class MinLengthValidator(Criterion):
 
-    def _validate(self, value, container, field):
-        if len(value) < self.expression:
-            raise self.create_exception()
+    def compile(self, field):
+        minimum = self.expression
+        error = self.create_exception
 
-        return value
+        def check(value, container):
+            if len(value) < minimum:
+                raise error()
+
+            return value
+
+        return check
 
 
 class MaxLengthValidator(Criterion):
 
-    def _validate(self, value, container, field):
-        if len(value) > self.expression:
-            raise self.create_exception()
+    def compile(self, field):
+        maximum = self.expression
+        error = self.create_exception
+
+        def check(value, container):
+            if len(value) > maximum:
+                raise error()
 
-        return value
+            return value
+
+        return check
 
 
 class MinimumValidator(Criterion):
 
-    def _validate(self, value, container, field):
-        try:
-            if value < self.expression:
-                raise self.create_exception()
-        except TypeError:
-            raise self.create_exception()
+    def compile(self, field):
+        minimum = self.expression
+        error = self.create_exception
+
+        def check(value, container):
+            try:
+                if value < minimum:
+                    raise error()
+            except TypeError:
+                raise error()
+
+            return value
 
-        return value
+        return check
 
 
 class MaximumValidator(Criterion):
 
-    def _validate(self, value, container, field):
-        try:
-            if value > self.expression:
-                raise self.create_exception()
-        except TypeError:
-            raise self.create_exception()
+    def compile(self, field):
+        maximum = self.expression
+        error = self.create_exception
+
+        def check(value, container):
+            try:
+                if value > maximum:
+                    raise error()
+            except TypeError:
+                raise error()
+
+            return value
+
+        return check
+
+
+def compile_simple_pattern(expression, full_match=False):
+    """Create a function equivalent to the given regular expression, for
+    the common patterns which could be matched faster by the string methods:
+
+    - Literal prefixes and literals, such as ``^user-`` and ``^admin$``
+    - Digits, such as ``^\\d+$`` and ``^\\d{4}$``
+    - Lengths, such as ``^.{3,20}$``
+
+    :return: A ``callable(str) -> bool``, or ``None`` if the pattern is not
+             simple.
+    """
+    body = expression[1:] if expression.startswith('^') else expression
+    end = None
+    if body.endswith('\\Z') and not body.endswith('\\\\Z'):
+        body, end = body[:-2], 'Z'
+
+    elif body.endswith('$') and not body.endswith('\\$'):
+        body, end = body[:-1], '$'
+
+    exact = full_match or end is not None
+
+    # The $ matches before the trailing newline, too
+    newline = end == '$' and not full_match
+
+    if body and not any(c in SPECIAL_CHARACTERS for c in body):
+        if not exact:
+            return lambda value: value.startswith(body)
+
+        if newline:
+            return lambda value: value == body or value == body + '\n'
+
+        return lambda value: value == body
+
+    match = SIMPLE_QUANTIFIED_PATTERN.fullmatch(body)
+    if match is None or not exact:
+        return None
+
+    character, quantifier, count, minimum, maximum = match.groups()
+    if quantifier:
+        minimum, maximum = (1 if quantifier == '+' else 0), None
+
+    elif count:
+        minimum = maximum = int(count)
+
+    else:
+        minimum = int(minimum or 0)
+        maximum = int(maximum) if maximum else None
+
+    digits = character == '\\d'
 
-        return value
+    def matcher(value):
+        if newline and value.endswith('\n'):
+            value = value[:-1]
+
+        length = len(value)
+        if length < minimum or (maximum is not None and length > maximum):
+            return False
+
+        if digits:
+            return not length or value.isdecimal()
+
+        return '\n' not in value
+
+    return matcher
 
 
 class PatternValidator(Criterion):
+    """Checks the value against a regular expression
 
-    def _validate(self, value, container, field):
-        pattern = re.compile(self.expression) \
-            if isinstance(self.expression, str) \
-            else self.expression
-        if pattern.match(value) is None:
-            raise self.create_exception()
+    String patterns are compiled once, and the common patterns are matched
+    without the regex engine, see :func:`.compile_simple_pattern`.
 
-        return value
+    :param full_match: Match the whole value, instead of matching at the
+                       beginning.
+    """
+
+    def __init__(self, expression, full_match=False):
+        super().__init__(expression)
+        self.full_match = full_match
+        self.simple_match = None
+        if isinstance(self.expression, str):
+            self.simple_match = \
+                compile_simple_pattern(self.expression, full_match)
+            self.pattern = re.compile(self.expression)
+
+        else:
+            self.pattern = self.expression
+
+    def compile(self, field):
+        match = self.pattern.fullmatch if self.full_match \
+            else self.pattern.match
+        simple_match = self.simple_match
+        error = self.create_exception
+
+        if simple_match is None:
+            def check(value, container):
+                if match(value) is None:
+                    raise error()
+
+                return value
+
+            return check
+
+        def check(value, container):
+            if not (
+                simple_match(value) if type(value) is str
+                else match(value) is not None
+            ):
+                raise error()
+
+            return value
+
+        return check
 
 
 class RequestValidator:
-    def __init__(self, fields, empty_form=None):
+    def __init__(self, fields, empty_form=None, aggregate=False):
+        """
+        :param fields: Dictionary of the field name and it's specification
+        :param aggregate: Validate all fields and raise a
+                          :class:`.HTTPValidationErrors` with all errors,
+                          instead of raising the first one.
+        """
         # Merging default specification
         self.fields = {}
         self.empty_form = empty_form
+        self.aggregate = aggregate
         for field_name, specification in fields.items():
-            kwargs = dict(callback=specification) \
-                if callable(specification) else specification
+            self.fields[field_name] = create_field(field_name, specification)
+
+        self._validate = self.compile()
+
+    def compile(self):
+        """Compile the fields into a single validation function
+        """
+        plan = tuple(
+            (
+                field.title,
+                field._validate if field.query else None,
+                field._validate if field.form else None
+            )
+            for field in self.fields.values()
+        )
+
+        def validate(form, query):
+            for title, validate_query, validate_form in plan:
+                if query and validate_query is not None:
+                    validate_query(query)
+
+                if validate_form is not None and \
+                        (query is None or title not in query):
+                    validate_form(form)
+
+            return form, query
+
+        def validate_aggregate(form, query):
+            errors = []
+            for title, validate_query, validate_form in plan:
+                try:
+                    if query and validate_query is not None:
+                        validate_query(query)
 
-            self.fields[field_name] = Field(field_name, **kwargs)
+                    if validate_form is not None and \
+                            (query is None or title not in query):
+                        validate_form(form)
+
+                except HTTPStatus as ex:
+                    code, _, text = ex.status.partition(' ')
+                    errors.append(dict(
+                        field=title,
+                        statusCode=int(code),
+                        statusText=text
+                    ))
+
+            if errors:
+                raise HTTPValidationErrors(errors)
+
+            return form, query
+
+        return validate_aggregate if self.aggregate else validate
 
     def __call__(self, form=None, query=None, *args, **kwargs):
-        for field_name, field in self.fields.items():
+        return self._validate(form, query)
 
-            if query and field.query:
-                field.validate(query)
 
-            if field.form and (query is None or field.title not in query):
-                field.validate(form)
+def create_field(title, specification):
+    """Create a :class:`.Field` from a specification, which is either the
+    keyword arguments of the field or a callback.
+    """
+    kwargs = dict(callback=specification) \
+        if callable(specification) else specification
+
+    return Field(title, **kwargs)
 
-        return form, query
+
+class FieldsValidator(Criterion):
+    """Validates the nested object's fields, the expression is a
+    dictionary of the field name and it's specification, the same as the
+    :func:`.validate`.
+
+    Non-object values are rejected.
+    """
+
+    def __init__(self, expression):
+        super().__init__(expression)
+        self.fields = [
+            create_field(title, specification)
+            for title, specification in self.expression.items()
+        ]
+
+    def compile(self, field):
+        validators = tuple(f._validate for f in self.fields)
+        error = self.create_exception
+
+        def check(value, container):
+            if not isinstance(value, dict):
+                raise error()
+
+            for validate in validators:
+                validate(value)
+
+            return value
+
+        return check
+
+
+class ItemsValidator(Criterion):
+    """Validates the items of a list, the expression is the specification
+    of each item, the same as the specification of a field.
+
+    Non-list values are rejected.
+    """
+
+    def __init__(self, expression):
+        super().__init__(expression)
+        self.field = create_field('item', self.expression)
+
+    def compile(self, field):
+        validate = self.field._validate
+        error = self.create_exception
+
+        def check(value, container):
+            if not isinstance(value, list):
+                raise error()
+
+            holder = {}
+            for index, item in enumerate(value):
+                holder['item'] = item
+                validate(holder)
+                value[index] = holder['item']
+
+            return value
+
+        return check
 
 
 class CallableValidator(Criterion):
 
-    def _validate(self, value, container, field):
-        return self.expression(value, container, field)
+    def compile(self, field):
+        callback = self.expression
+
+        def check(value, container):
+            return callback(value, container, field)
+
+        return check
 
 
 def validate(**fields):
@@ -251,6 +603,9 @@ def validate(**fields):
        def index(self, *, field1):
            ...
 
+    .. seealso:: :func:`.validate_all` to validate all fields and report
+                 the errors of all of them.
+
 
     Available parameters for validation is listed below:
 
@@ -266,12 +621,18 @@ def validate(**fields):
     :param minimum: Numeric, Minimum allowed value.
     :param maximum: Numeric, Maximum allowed value.
     :param pattern: Regex pattern to match the value.
+    :param full_match: Boolean, match the ``pattern`` against the whole
+                       value, instead of the beginning of the value.
     :param min_length: Only for strings, the minumum allowed length of the
                        value.
     :param max_length: Only for strings, the maximum allowed length of the
                        value.
     :param callback: A ``callable(value, container, field: Field)`` to be
                      called while validating the field.
+    :param fields: Dictionary of the field name and it's specification, to
+                   validate the fields of a nested object.
+    :param items: The specification of each item, to validate the items of
+                  a list.
 
 
     A detailed example:
@@ -306,14 +667,35 @@ def validate(**fields):
 
 
     """
+    return _create_decorator(RequestValidator(fields))
+
+
+def validate_all(**fields):
+    """Same as the :func:`.validate`, but all fields are validated and a
+    ``400 Bad Request`` with the errors of all fields as JSON will be
+    raised, see :class:`.HTTPValidationErrors`.
+
+    .. code-block:: python
+
+       @validate_all(
+           title=dict(required='701 Title is required'),
+           age=dict(type_=(int, '702 Age must be integer')),
+       )
+       def index(self):
+           ...
+
+    """
+    return _create_decorator(RequestValidator(fields, aggregate=True))
+
 
-    validator = RequestValidator(fields)
+def _create_decorator(request_validator):
+    validator = request_validator._validate
 
     def decorator(func):
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            validator(form=context.form, query=context.query)
+            validator(context.form, context.query)
             return func(*args, **kwargs)
 
         return wrapper
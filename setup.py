@@ -15,7 +15,8 @@ with open(
 
 dependencies = [
     'pymlconf >= 2',
-    'ujson'
+    'ujson',
+    'contextvars; python_version < "3.7"',
 ]
 
 